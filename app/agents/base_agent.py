@@ -1,9 +1,17 @@
-from typing import Any, Dict, Optional, TypeVar, Generic
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Generic
 from typing_extensions import TypedDict
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
+from app.utils.llm_cache import get_llm_cache, make_cache_key
+from app.utils.instrumentation import record_llm_call
+from app.utils.llm_clients import get_chat_model, llm_client_pool
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=BaseModel)
 
@@ -17,14 +25,15 @@ class AgentState(BaseModel):
 class BaseAgent(Generic[T]):
     """Base agent class that all other agents will inherit from"""
     
-    def __init__(self, name: str, model_name: str = "gpt-4o"):
+    def __init__(self, name: str, model_name: str = "gpt-4o", use_cache: bool = True):
         self.name = name
-        self.model = ChatOpenAI(
-            model_name=model_name,
-            temperature=0.1,
-            streaming=True
-        )
+        self.model_name = model_name
+        self.temperature = 0.1
+        # Shared per model: one connection pool, coordinated concurrency and retries
+        self.model = get_chat_model(model_name, temperature=self.temperature)
         self.output_parser = None
+        # Agents whose answers must not be replayed (e.g. chat edits) pass use_cache=False
+        self.use_cache = use_cache
     
     def set_output_parser(self, parser: PydanticOutputParser[T]):
         """Set the output parser for structured output"""
@@ -44,11 +53,54 @@ class BaseAgent(Generic[T]):
         """
         raise NotImplementedError("Child classes must implement validate_input method")
     
+    async def _invoke_model(self, messages: List[Any], parse: Optional[Callable[[str], Any]] = None, **kwargs) -> Any:
+        """Invoke the model and return the response text, served from the response cache when possible
+
+        With parse, return parse(response) instead; a response is only cached once it parsed,
+        so a malformed completion is never replayed.
+        """
+        start = time.perf_counter()
+        prompt_bytes = len(json.dumps(messages, default=str).encode())
+        cache = get_llm_cache() if self.use_cache else None
+        key = None
+        if cache is not None:
+            key = make_cache_key(self.model_name, kwargs.get("temperature", self.temperature), messages)
+            # SQLite access blocks; keep it off the event loop
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                try:
+                    result = parse(cached) if parse else cached
+                except Exception as e:
+                    # Cached before responses were checked; drop it and ask the model again
+                    logger.warning(f"{self.name}: discarding cached response that no longer parses: {str(e)}")
+                    await asyncio.to_thread(cache.delete, key)
+                else:
+                    logger.debug(f"{self.name}: LLM cache hit")
+                    record_llm_call(self.name, self.model_name, time.perf_counter() - start, prompt_bytes, cached=True)
+                    return result
+
+        response, queue_seconds = await llm_client_pool.invoke(self.model, self.model_name, messages, **kwargs)
+        content = response.content
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        record_llm_call(
+            self.name,
+            self.model_name,
+            time.perf_counter() - start,
+            prompt_bytes,
+            prompt_tokens=usage.get("input_tokens"),
+            completion_tokens=usage.get("output_tokens"),
+            queue_seconds=queue_seconds,
+        )
+
+        # Raises before caching when the response is malformed
+        result = parse(content) if parse else content
+        if cache is not None:
+            await asyncio.to_thread(cache.set, key, self.model_name, content)
+        return result
+
     async def _call_llm(self, prompt: str, structured_output: bool = True) -> Any:
         """Call the LLM with the given prompt and parse the output if structured"""
         messages = [{"role": "user", "content": prompt}]
-        response = await self.model.ainvoke(messages)
-        
-        if structured_output and self.output_parser:
-            return self.output_parser.parse(response.content)
-        return response.content 
\ No newline at end of file
+        parse = self.output_parser.parse if structured_output and self.output_parser else None
+        return await self._invoke_model(messages, parse=parse)
@@ -1,7 +1,7 @@
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from app.agents.base_agent import BaseAgent
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.vector_backend import VectorBackend, get_vector_store
 from langchain.output_parsers import PydanticOutputParser
 import json
 import logging
@@ -40,11 +40,19 @@ class ModifiedCodeResponse(BaseModel):
 
 class ChatBasedCodeModificationAgent(BaseAgent[ModifiedCodeResponse]):
     def __init__(self):
-        super().__init__("chat_based_code_modification_agent", model_name="gpt-4o")
+        # A retried chat instruction should produce a fresh edit, not a replay
+        super().__init__("chat_based_code_modification_agent", model_name="gpt-4o", use_cache=False)
         self.set_output_parser(PydanticOutputParser(pydantic_object=ModifiedCodeResponse))
-        self.vector_store = ComponentVectorStore()
+        self._vector_store = None
         logger.info("ChatBasedCodeModificationAgent initialized")
 
+    @property
+    def vector_store(self) -> VectorBackend:
+        """Opened on first use so constructing the agent stays cheap"""
+        if self._vector_store is None:
+            self._vector_store = get_vector_store()
+        return self._vector_store
+
     def build_prompt(self, request: CodeModificationRequest) -> str:
         latest_message = request.chat_history[-1]
         logger.info("Building prompt with latest message")
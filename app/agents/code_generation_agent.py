@@ -3,7 +3,7 @@ from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentState
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+from app.utils.embeddings import embedding_registry
 import json
 
 class GeneratedCode(BaseModel):
@@ -15,7 +15,7 @@ class CodeGenerationAgent(BaseAgent[GeneratedCode]):
     def __init__(self):
         super().__init__("code_generation_agent", model_name="gpt-4o")
         self.set_output_parser(PydanticOutputParser(pydantic_object=GeneratedCode))
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        self.embeddings = embedding_registry.get_langchain_embeddings()
         self.vector_store = Chroma(collection_name="components", embedding_function=self.embeddings)
 
     def validate_input(self, state: AgentState) -> bool:
@@ -11,7 +11,8 @@ class ModifiedCode(BaseModel):
 
 class CodeModificationAgent(BaseAgent[ModifiedCode]):
     def __init__(self):
-        super().__init__("code_modification_agent", model_name="gpt-4o")
+        # Edits are requested interactively; a repeated request should not replay the old answer
+        super().__init__("code_modification_agent", model_name="gpt-4o", use_cache=False)
         self.set_output_parser(PydanticOutputParser(pydantic_object=ModifiedCode))
 
     def validate_input(self, state: AgentState) -> bool:
@@ -54,8 +55,7 @@ Please modify the code according to the request and return the changes in the sp
             {"role": "user", "content": user_prompt}
         ]
 
-        response = await self.model.ainvoke(messages)
-        return self.output_parser.parse(response.content)
+        return await self._invoke_model(messages, parse=self.output_parser.parse)
 
     async def process(self, state: AgentState) -> AgentState:
         if not self.validate_input(state):
@@ -4,6 +4,7 @@ from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentState
 import base64
 from langchain_core.output_parsers import PydanticOutputParser
+from app.utils.instrumentation import timed
 
 # Recursive UIComponent
 class UIComponent(BaseModel):
@@ -42,6 +43,7 @@ class ComponentIdentificationAgent(BaseAgent[ComponentAnalysis]):
             return False
         return True
 
+    @timed("analyze_components")
     async def _analyze_components(self, image_data: str) -> ComponentAnalysis:
         system_prompt = '''
 
@@ -172,25 +174,25 @@ Respond **only** with strict JSON of the following structure:
             ]}
         ]
 
-        response = await self.model.ainvoke(messages, temperature=0)
-        raw = response.content.strip()
-        
-    
+        def parse(response: str):
+            raw = response.strip()
 
+            # parse and sanity-check
+            analysis = self.output_parser.parse(raw)
+            # ensure no unknown keys
+            extra = set(analysis.dict().keys()) - {"components","layout","theme"}
+            if extra:
+                raise ValueError(f"Unexpected top-level keys: {extra}")
+            return analysis
 
-        # parse and sanity-check
-        analysis = self.output_parser.parse(raw)
-        # ensure no unknown keys
-        extra = set(analysis.dict().keys()) - {"components","layout","theme"}
-        if extra:
-            raise ValueError(f"Unexpected top-level keys: {extra}")
-        return analysis
+        return await self._invoke_model(messages, parse=parse, temperature=0)
 
     async def process(self, state: AgentState) -> AgentState:
         if not self.validate_input(state):
             return state
 
-        image_data = state.output_data["raw_input"]["image"]
+        # Prefer the normalized image prepared by InputAgent
+        image_data = state.output_data.get("image") or state.output_data["raw_input"]["image"]
         try:
             analysis = await self._analyze_components(image_data)
         except Exception as e:
@@ -3,8 +3,8 @@ from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentState
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.embeddings import embedding_registry
+from app.utils.vector_backend import get_vector_store
 import json
 import logging
 
@@ -47,8 +47,8 @@ class ComponentMappingAgent(BaseAgent[ComponentMapping]):
     def __init__(self):
         super().__init__("component_mapping_agent", model_name="gpt-4o")
         self.set_output_parser(PydanticOutputParser(pydantic_object=ComponentMapping))
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        self.vector_store = ComponentVectorStore()
+        self.embeddings = embedding_registry.get_langchain_embeddings()
+        self.vector_store = get_vector_store()
 
     def validate_input(self, state: AgentState) -> bool:
         return "components" in state.output_data
@@ -65,12 +65,17 @@ class ComponentMappingAgent(BaseAgent[ComponentMapping]):
 
     async def _find_matching_components(self, components: List[Dict[str, Any]]) -> Dict[str, Any]:
         results = {}
+        queried, queries = [], []
         for comp in components:
             query = comp.get("suggested_component_type") or comp.get("type")
             if not query:
                 continue
-            query += " with properties: " + json.dumps(comp.get("properties", {}))
-            matches = self.vector_store.search_components(query, n_results=1)
+            queried.append(comp)
+            queries.append(query + " with properties: " + json.dumps(comp.get("properties", {})))
+
+        # One batched search for the whole tree
+        all_matches = self.vector_store.search_components_many(queries, n_results=1) if queries else []
+        for comp, matches in zip(queried, all_matches):
             if matches:
                 match = matches[0]
                 full_meta = match['full_metadata']
@@ -140,17 +145,18 @@ Input:
 """
 
         messages = [{"role": "user", "content": prompt}]
-        response = await self.model.ainvoke(messages)
+        parser = PydanticOutputParser(pydantic_object=ComponentMapping)
 
-        logger.info("Raw LLM Response:\n%s", response.content)
+        def parse(response: str):
+            logger.info("Raw LLM Response:\n%s", response)
+            try:
+                result = parser.parse(response)
+                return result.components
+            except Exception as e:
+                logger.error("Parsing failed: %s", e)
+                raise
 
-        parser = PydanticOutputParser(pydantic_object=ComponentMapping)
-        try:
-            result = parser.parse(response.content)
-            return result.components
-        except Exception as e:
-            logger.error("Parsing failed: %s", e)
-            raise
+        return await self._invoke_model(messages, parse=parse)
 
     async def _generate_theme_and_layout(self, layout_info: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, Any]]:
         prompt = f"""
@@ -2,6 +2,8 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentState
 from langchain_core.output_parsers import PydanticOutputParser
+from app.utils.instrumentation import timed
+from app.utils.prompt_serializer import CompactPromptSerializer
 import json
 import logging
 
@@ -19,6 +21,7 @@ class DetailedCodeGenerationAgent(BaseAgent[GeneratedCode]):
     def __init__(self):
         super().__init__("detailed_code_generation_agent", model_name="gpt-4o")
         self.set_output_parser(PydanticOutputParser(pydantic_object=GeneratedCode))
+        self.prompt_serializer = CompactPromptSerializer()
 
     def validate_input(self, state: AgentState) -> bool:
         """Validate that the input state contains required component mapping information"""
@@ -90,6 +93,7 @@ Return only the component code in JSX format.
 """
         return await self._call_llm(prompt, structured_output=False)
 
+    @timed("generate_main_app_code")
     async def _generate_main_app_code(self, 
                                     components: List[Dict[str, Any]],
                                     detailed_components: List[Dict[str, Any]],
@@ -122,18 +126,19 @@ Rules you must follow:
 
 Generate **only** the valid JSX of a functional `App` component with the appropriate imports.
 '''
+        context = self.prompt_serializer.serialize(components, detailed_components, detailed_icons, theme)
         user_prompt = f'''
 Component Tree:
-{json.dumps(components, indent=2)}
+{context["components"]}
 
 Available Components:
-{json.dumps(detailed_components, indent=2)}
+{context["detailed_components"]}
 
-Available Icons:
-{json.dumps(detailed_icons, indent=2)}
+Available Icons (each group lists the props shared by its icons):
+{context["detailed_icons"]}
 
 Theme:
-{json.dumps(theme, indent=2)}
+{context["theme"]}
 
 Instructions:
 - Use the data above to map each node in the component tree to a real SaltDS component.
@@ -161,8 +166,8 @@ Instructions:
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}]
-        response = await self.model.ainvoke(messages, temperature=0)
-        raw = response.content.strip()
+        response = await self._invoke_model(messages, temperature=0)
+        raw = response.strip()
         return raw
 
 
@@ -4,8 +4,14 @@ from .base_agent import BaseAgent, AgentState
 import re
 from PIL import Image
 import io
-import base64
+import os
+import logging
 from langchain_core.output_parsers import PydanticOutputParser
+from app.utils.instrumentation import timed
+from app.utils.image_processing import decode_image_bytes, normalize_image, NormalizedImage
+from app.utils.ui_validator import assess_ui_image
+
+logger = logging.getLogger(__name__)
 
 class ImageValidationResult(BaseModel):
     """Structured output for image validation"""
@@ -17,6 +23,8 @@ class InputAgent(BaseAgent[ImageValidationResult]):
     def __init__(self):
         super().__init__("input_agent", model_name="gpt-4o")
         self.figma_url_pattern = r'^https://(?:www\.)?figma\.com/file/[a-zA-Z0-9]+/.*$'
+        # "local": image heuristic, LLM only when it is ambiguous; "llm": always ask the LLM
+        self.validation_mode = os.getenv("UI_VALIDATION_MODE", "local").lower()
         
         # Set up output parser
         parser = PydanticOutputParser(pydantic_object=ImageValidationResult)
@@ -34,17 +42,8 @@ class InputAgent(BaseAgent[ImageValidationResult]):
                 return False
         elif "image" in input_data:
             try:
-                # Validate if the image data is valid
-                image_data = input_data["image"]
-                if isinstance(image_data, str):
-                    # Handle base64 encoded image
-                    # Add padding if necessary
-                    padding = 4 - (len(image_data) % 4)
-                    if padding != 4:
-                        image_data += '=' * padding
-                    image_bytes = base64.b64decode(image_data)
-                else:
-                    image_bytes = image_data
+                # Validate if the image data is valid (header only; process() does the full decode)
+                image_bytes = decode_image_bytes(input_data["image"])
                 Image.open(io.BytesIO(image_bytes))
             except Exception as e:
                 state.error = f"Invalid image data: {str(e)}"
@@ -55,7 +54,8 @@ class InputAgent(BaseAgent[ImageValidationResult]):
             
         return True
     
-    async def _validate_ui_image(self, image_data: bytes) -> ImageValidationResult:
+    @timed("validate_ui_image")
+    async def _validate_ui_image(self, image_data: str) -> ImageValidationResult:
         """Validate if the image is a valid UI design using GPT-4 Vision"""
         prompt = """
     You are an expert UI design analyzer. Given an image, your job is to determine whether the image is a UI design.
@@ -91,45 +91,64 @@ class InputAgent(BaseAgent[ImageValidationResult]):
             }
         ]
 
+        def parse(response: str) -> ImageValidationResult:
+            # Optional: Strip surrounding whitespace
+            raw_output = response.strip()
+
+            # Try parsing with detailed error feedback
+            try:
+                return self.output_parser.parse(raw_output)
+            except Exception as e:
+                raise ValueError(f"Output parsing failed: {e}\nRaw output: {raw_output}")
+
         # Get model response
-        response = await self.model.ainvoke(messages)
+        return await self._invoke_model(messages, parse=parse)
 
-        # Optional: Strip surrounding whitespace
-        raw_output = response.content.strip()
 
-        # Try parsing with detailed error feedback
-        try:
-            return self.output_parser.parse(raw_output)
-        except Exception as e:
-            raise ValueError(f"Output parsing failed: {e}\nRaw output: {raw_output}")
+    async def _validate_image(self, normalized: NormalizedImage) -> tuple[ImageValidationResult, str]:
+        """Validate locally when possible; return the result and which validator produced it"""
+        if self.validation_mode != "llm":
+            local = assess_ui_image(normalized.image)
+            if not local.ambiguous:
+                return ImageValidationResult(
+                    is_valid_ui=local.is_valid_ui,
+                    confidence=local.confidence,
+                    reason=local.reason
+                ), "local"
+            logger.info(f"Local UI validation ambiguous (score {local.score}), asking the LLM")
 
+        return await self._validate_ui_image(normalized.data_url), "llm"
     
     async def process(self, state: AgentState) -> AgentState:
         # if not self.validate_input(state):
         #     return state
             
         if "image" in state.input_data:
-            # Handle image input
-            image_data = state.input_data["image"]
-            # if isinstance(image_data, str):
-            #     image_bytes = base64.b64decode(image_data)
-            # else:
-            #     image_bytes = image_data
+            # Decode once, clamp resolution and strip metadata; every vision
+            # call downstream uses this normalized payload
+            try:
+                normalized = normalize_image(state.input_data["image"])
+            except Exception as e:
+                state.error = f"Invalid image data: {str(e)}"
+                return state
+            state.metadata["image"] = normalized.summary()
                 
             # Validate UI image
-            validation_result = await self._validate_ui_image(image_data)
+            validation_result, validation_source = await self._validate_image(normalized)
             
             if not validation_result.is_valid_ui:
                 state.error = f"Invalid UI image: {validation_result.reason}"
                 return state
             
             # Store validation metadata
-            state.metadata["validation"] = validation_result.dict()
+            state.metadata["validation"] = {**validation_result.dict(), "source": validation_source}
             
             # Process the input and prepare it for the next agent
             processed_data = {
                 "type": "image",
                 "raw_input": state.input_data,
+                "image": normalized.data_url,
+                "image_hash": normalized.content_hash,
             }
         else:
             # Handle Figma URL (placeholder for now)
@@ -2,8 +2,9 @@ from typing import Dict, Any, List, Set, Optional
 from pydantic import BaseModel, Field
 from .base_agent import BaseAgent, AgentState
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.embeddings import embedding_registry
+from app.utils.vector_backend import get_vector_store
+from app.utils.instrumentation import timed
 import json
 import logging
 from dataclasses import dataclass
@@ -61,8 +62,8 @@ class StaticComponentMapping(BaseModel):
 class StaticComponentMappingAgent(BaseAgent[StaticComponentMapping]):
     def __init__(self):
         super().__init__("static_component_mapping_agent")
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        self.vector_store = ComponentVectorStore()
+        self.embeddings = embedding_registry.get_langchain_embeddings()
+        self.vector_store = get_vector_store()
         self._component_cache = {}
         self._layout_cache = {}
         self._icon_cache = {}
@@ -137,81 +138,79 @@ class StaticComponentMappingAgent(BaseAgent[StaticComponentMapping]):
             logger.exception(f"Failed to parse component props: {e}")
         return parsed
 
+    def _component_from_match(self, match: Dict[str, Any]) -> Optional[DetailedComponent]:
+        # The full document carries import_statement and when_to_use, which
+        # are not part of the Chroma metadata
+        full_metadata = match['full_metadata'] or {}
+        metadata = full_metadata.get("metadata")
+        if not metadata:
+            return None
+
+        # Parse JSON strings for list fields
+        tags = json.loads(metadata.get('tags', '[]')) if isinstance(metadata.get('tags'), str) else metadata.get('tags', [])
+        when_to_use = json.loads(metadata.get('when_to_use', '[]')) if isinstance(metadata.get('when_to_use'), str) else metadata.get('when_to_use', [])
+        props = json.loads(metadata.get('props', '{}')) if isinstance(metadata.get('props'), str) else metadata.get('props', {})
+
+        return DetailedComponent(
+            name=metadata.get("component_name") or full_metadata.get("component_name", "Unknown"),
+            import_statement=metadata.get("import_statement") or "",
+            description=metadata.get("description") or "",
+            category=metadata.get("category") or "Uncategorized",
+            props=self.parse_component_props(props),
+            when_to_use=when_to_use,
+            tags=tags
+        )
+
     def _find_component_details(self, component_type: str) -> Optional[DetailedComponent]:
         """Find detailed component information from vector store"""
+        return self._find_components_details([component_type]).get(component_type)
+
+    @timed("find_component_details")
+    def _find_components_details(self, component_types: List[str]) -> Dict[str, Optional[DetailedComponent]]:
+        """Find detailed component information for several types with at most one semantic query"""
+        found: Dict[str, Optional[DetailedComponent]] = {}
+        matches: Dict[str, Dict[str, Any]] = {}
         try:
-            if component_type in self._component_cache:
-                logger.debug(f"Component '{component_type}' found in cache.")
-                return self._component_cache[component_type]
+            pending = []
+            for component_type in component_types:
+                if component_type in self._component_cache:
+                    logger.debug(f"Component '{component_type}' found in cache.")
+                    found[component_type] = self._component_cache[component_type]
+                    continue
+
+                # First try exact match by component name (served from the store's name index)
+                match = self.vector_store.find_by_name(component_type)
+                if match:
+                    logger.info(f"Found exact match for component: {component_type}")
+                    matches[component_type] = match
+                else:
+                    pending.append(component_type)
+
+            # If no exact match, fall back to semantic search, batched for all misses
+            if pending:
+                logger.info(f"No exact match found, trying semantic search for: {pending}")
+                for component_type, results in zip(pending, self.vector_store.search_components_many(pending, n_results=1)):
+                    if results:
+                        matches[component_type] = results[0]
+                    else:
+                        logger.warning(f"No matches found for component: {component_type}")
+        except Exception as e:
+            logger.exception(f"Failed to find component details for {component_types}: {e}")
 
-            logger.info(f"Searching for component details: {component_type}")
-            
-            # First try exact match by component name
-            results = self.vector_store.collection.get(
-                where={"component_name": component_type},
-                include=["metadatas", "documents"]
-            )
-            
-            if results and results['ids']:
-                logger.info(f"Found exact match for component: {component_type}")
-                metadata = results['metadatas'][0]
-                full_metadata = json.loads(results['documents'][0])
-                
-                # Parse JSON strings for list fields
-                tags = json.loads(metadata.get('tags', '[]')) if isinstance(metadata.get('tags'), str) else metadata.get('tags', [])
-                when_to_use = json.loads(metadata.get('when_to_use', '[]')) if isinstance(metadata.get('when_to_use'), str) else metadata.get('when_to_use', [])
-                props = json.loads(metadata.get('props', '{}')) if isinstance(metadata.get('props'), str) else metadata.get('props', {})
-                
-                component = DetailedComponent(
-                    name=metadata.get("component_name", "Unknown"),
-                    import_statement=metadata.get("import_statement") or "",
-                    description=metadata.get("description") or "",
-                    category=metadata.get("category") or "Uncategorized",
-                    props=self.parse_component_props(props),
-                    when_to_use=when_to_use,
-                    tags=tags
-                )
-                
+        for component_type, match in matches.items():
+            try:
+                component = self._component_from_match(match)
+                if component is None:
+                    logger.warning(f"No metadata found for component: {component_type}")
+                    continue
                 self._component_cache[component_type] = component
-                return component
-            
-            # If no exact match, fall back to semantic search
-            logger.info(f"No exact match found, trying semantic search for: {component_type}")
-            matches = self.vector_store.search_components(component_type, n_results=1)
-            if not matches:
-                logger.warning(f"No matches found for component: {component_type}")
-                return None
-
-            match = matches[0]
-            full_metadata = match['full_metadata']
-            metadata = full_metadata.get("metadata")
-
-            if not metadata:
-                logger.warning(f"No metadata found for component: {component_type}")
-                return None
-
-            # Parse JSON strings for list fields
-            tags = json.loads(metadata.get('tags', '[]')) if isinstance(metadata.get('tags'), str) else metadata.get('tags', [])
-            when_to_use = json.loads(metadata.get('when_to_use', '[]')) if isinstance(metadata.get('when_to_use'), str) else metadata.get('when_to_use', [])
-            props = json.loads(metadata.get('props', '{}')) if isinstance(metadata.get('props'), str) else metadata.get('props', {})
-
-            component = DetailedComponent(
-                name=metadata.get("component_name", "Unknown"),
-                import_statement=metadata.get("import_statement") or "",
-                description=metadata.get("description") or "",
-                category=metadata.get("category") or "Uncategorized",
-                props=self.parse_component_props(props),
-                when_to_use=when_to_use,
-                tags=tags
-            )
-
-            self._component_cache[component_type] = component
-            logger.info(f"Component details found and cached: {component_type}")
-            return component
-        except Exception as e:
-            logger.exception(f"Failed to find component details for '{component_type}': {e}")
-            return None
+                found[component_type] = component
+                logger.info(f"Component details found and cached: {component_type}")
+            except Exception as e:
+                logger.exception(f"Failed to find component details for '{component_type}': {e}")
+        return found
 
+    @timed("find_layout_details")
     def _find_layout_details(self, layout_type: str) -> Optional[LayoutInfo]:
         """Find layout component information from vector store"""
         try:
@@ -220,7 +219,8 @@ class StaticComponentMappingAgent(BaseAgent[StaticComponentMapping]):
                 return self._layout_cache[layout_type]
 
             logger.info(f"Searching for layout details: {layout_type}")
-            matches = self.vector_store.search_components(f"layout {layout_type}", n_results=1)
+            # Only layout components are candidates and keywords are fused in, so no "layout" prefix is needed
+            matches = self.vector_store.search_layouts(layout_type, n_results=1)
             if not matches:
                 logger.warning(f"No matches found for layout: {layout_type}")
                 return None
@@ -250,54 +250,68 @@ class StaticComponentMappingAgent(BaseAgent[StaticComponentMapping]):
             logger.exception(f"Failed to find layout details for '{layout_type}': {e}")
             return None
 
+    def _icon_from_match(self, match: Dict[str, Any]) -> IconInfo:
+        # Get metadata from the correct location in the search results
+        metadata = match.get('metadata', {})
+        full_metadata = match.get('full_metadata') or {}
+
+        # Use metadata from full_metadata if available, otherwise use metadata
+        icon_data = full_metadata.get('metadata', metadata)
+
+        return IconInfo(
+            name=icon_data.get("component_name", "Unknown"),
+            import_statement=icon_data.get("import_statement", ""),
+            description=icon_data.get("description", ""),
+            category=icon_data.get("category", "Icon"),
+            tags=icon_data.get("tags", []),
+            when_to_use=icon_data.get("when_to_use", []),
+            synonyms=icon_data.get("synonyms", []),
+            props=self.parse_component_props(icon_data.get("props", {}))
+        )
+
     def _find_icon_details(self, icon_name: str) -> Optional[IconInfo]:
         """Find icon information from vector store"""
-        try:
-            if icon_name in self._icon_cache:
-                logger.debug(f"Icon '{icon_name}' found in cache.")
-                return self._icon_cache[icon_name]
+        return self._find_icons_details([icon_name]).get(icon_name)
 
-            logger.info(f"Searching for icon details: {icon_name}")
-            
-            # Clean up icon name for search
-            search_name = icon_name.replace("Icon", "").strip()
-            
-            # Try exact search first
-            matches = self.vector_store.search_icons(search_name, n_results=1)
-            if not matches:
-                logger.warning(f"No exact matches found for icon: {icon_name}")
-                # Try with synonyms
-                matches = self.vector_store.search_icons(f"icon {search_name}", n_results=1)
-                if not matches:
-                    logger.warning(f"No matches found for icon: {icon_name}")
-                    return None
-
-            match = matches[0]
-            # Get metadata from the correct location in the search results
-            metadata = match.get('metadata', {})
-            full_metadata = match.get('full_metadata', {})
-
-            # Use metadata from full_metadata if available, otherwise use metadata
-            icon_data = full_metadata.get('metadata', metadata)
-
-
-            icon = IconInfo(
-                name=icon_data.get("component_name", "Unknown"),
-                import_statement=icon_data.get("import_statement", ""),
-                description=icon_data.get("description", ""),
-                category=icon_data.get("category", "Icon"),
-                tags=icon_data.get("tags", []),
-                when_to_use=icon_data.get("when_to_use", []),
-                synonyms=icon_data.get("synonyms", []),
-                props=self.parse_component_props(icon_data.get("props", {}))
-            )
-
-            self._icon_cache[icon_name] = icon
-            logger.info(f"Icon details found and cached: {icon_name}")
-            return icon
+    @timed("find_icon_details")
+    def _find_icons_details(self, icon_names: List[str]) -> Dict[str, Optional[IconInfo]]:
+        """Find icon information for several icons with one batched hybrid search"""
+        found: Dict[str, Optional[IconInfo]] = {}
+        matches: Dict[str, Dict[str, Any]] = {}
+        try:
+            pending = []
+            for icon_name in icon_names:
+                if icon_name in self._icon_cache:
+                    logger.debug(f"Icon '{icon_name}' found in cache.")
+                    found[icon_name] = self._icon_cache[icon_name]
+                else:
+                    pending.append(icon_name)
+
+            if pending:
+                logger.info(f"Searching for icon details: {pending}")
+
+                # Clean up icon names for search
+                search_names = {icon_name: icon_name.replace("Icon", "").strip() for icon_name in pending}
+
+                # Exact name match, else synonyms/tags and embeddings fused in a single lookup
+                results = self.vector_store.search_icons_many([search_names[n] for n in pending], n_results=1)
+                for icon_name, icon_matches in zip(pending, results):
+                    if icon_matches:
+                        matches[icon_name] = icon_matches[0]
+                    else:
+                        logger.warning(f"No matches found for icon: {icon_name}")
         except Exception as e:
-            logger.exception(f"Failed to find icon details for '{icon_name}': {e}")
-            return None
+            logger.exception(f"Failed to find icon details for {icon_names}: {e}")
+
+        for icon_name, match in matches.items():
+            try:
+                icon = self._icon_from_match(match)
+                self._icon_cache[icon_name] = icon
+                found[icon_name] = icon
+                logger.info(f"Icon details found and cached: {icon_name}")
+            except Exception as e:
+                logger.exception(f"Failed to find icon details for '{icon_name}': {e}")
+        return found
 
     async def process(self, state: AgentState) -> AgentState:
         try:
@@ -326,16 +340,14 @@ class StaticComponentMappingAgent(BaseAgent[StaticComponentMapping]):
 
             # Find details for each component
             components = []
-            for comp_type in unique_components:
-                if comp_type != "Icon":  # Skip icons as they're handled separately
-                    try:
-                        details = self._find_component_details(comp_type)
-                        if details:
-                            components.append(details)
-                        else:
-                            logger.warning(f"No details found for component: {comp_type}")
-                    except Exception as e:
-                        logger.exception(f"Error finding details for component '{comp_type}': {e}")
+            comp_types = [comp_type for comp_type in unique_components if comp_type != "Icon"]  # Skip icons as they're handled separately
+            component_details = self._find_components_details(comp_types)
+            for comp_type in comp_types:
+                details = component_details.get(comp_type)
+                if details:
+                    components.append(details)
+                else:
+                    logger.warning(f"No details found for component: {comp_type}")
 
             # Find layout details
             layouts = []
@@ -353,15 +365,14 @@ class StaticComponentMappingAgent(BaseAgent[StaticComponentMapping]):
 
             # Find icon details
             icons = []
-            for icon_name in unique_icons:
-                try:
-                    icon_details = self._find_icon_details(icon_name)
-                    if icon_details:
-                        icons.append(icon_details)
-                    else:
-                        logger.warning(f"No details found for icon: {icon_name}")
-                except Exception as e:
-                    logger.exception(f"Error finding details for icon '{icon_name}': {e}")
+            icon_names = list(unique_icons)
+            icon_details = self._find_icons_details(icon_names)
+            for icon_name in icon_names:
+                details = icon_details.get(icon_name)
+                if details:
+                    icons.append(details)
+                else:
+                    logger.warning(f"No details found for icon: {icon_name}")
 
             # Create the mapping
             try:
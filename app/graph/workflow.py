@@ -1,49 +1,100 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable
+import asyncio
+import importlib
+import logging
+import os
+import time
 from langgraph.graph import Graph, StateGraph
-from app.agents.base_agent import AgentState
-from app.agents.input_agent import InputAgent
-from app.agents.component_identification_agent import ComponentIdentificationAgent
-from app.agents.component_mapping_agent import ComponentMappingAgent
-from app.agents.code_generation_agent import CodeGenerationAgent
-from app.agents.code_modification_agent import CodeModificationAgent
-from app.agents.chat_based_code_modification_agent import ChatBasedCodeModificationAgent
-from app.agents.output_agent import OutputAgent
-from app.agents.static_component_mapping_agent import StaticComponentMappingAgent
-from app.agents.detailed_code_generation_agent import DetailedCodeGenerationAgent
+from app.agents.base_agent import AgentState, BaseAgent
+from app.utils.instrumentation import instrument_node
+
+logger = logging.getLogger(__name__)
+
+# Node name -> agent class, as an import path so that neither the module nor the
+# agent (LLM client, vector store, embedding model) is loaded until it is used
+AGENT_REGISTRY: Dict[str, str] = {
+    "input": "app.agents.input_agent:InputAgent",
+    "identify": "app.agents.component_identification_agent:ComponentIdentificationAgent",
+    "map": "app.agents.component_mapping_agent:ComponentMappingAgent",
+    "code_generation": "app.agents.code_generation_agent:CodeGenerationAgent",
+    "code_modification": "app.agents.code_modification_agent:CodeModificationAgent",
+    "chat_based_code_modification": "app.agents.chat_based_code_modification_agent:ChatBasedCodeModificationAgent",
+    "output": "app.agents.output_agent:OutputAgent",
+    "static_map": "app.agents.static_component_mapping_agent:StaticComponentMappingAgent",
+    "detailed_code_generation": "app.agents.detailed_code_generation_agent:DetailedCodeGenerationAgent",
+}
+
+# Linear pipelines selectable with WORKFLOW_TOPOLOGY; the last node's LLM
+# tokens are the generated code streamed to clients
+TOPOLOGIES: Dict[str, List[str]] = {
+    "static": ["input", "identify", "static_map", "detailed_code_generation"],
+    "semantic": ["input", "identify", "map", "code_generation"],
+}
+DEFAULT_TOPOLOGY = "static"
 
 class WorkflowGraph:
-    def __init__(self):
-        # Initialize agents
-        self.input_agent = InputAgent()
-        self.component_identification_agent = ComponentIdentificationAgent()
-        self.component_mapping_agent = ComponentMappingAgent()
-        self.code_generation_agent = CodeGenerationAgent()
-        self.code_modification_agent = CodeModificationAgent()
-        self.chat_based_code_modification_agent = ChatBasedCodeModificationAgent()
-        self.output_agent = OutputAgent()
-        self.static_component_mapping_agent = StaticComponentMappingAgent()
-        self.detailed_code_generation_agent = DetailedCodeGenerationAgent()
-        
+    def __init__(self, topology: Optional[str] = None):
+        self.topology = topology or os.getenv("WORKFLOW_TOPOLOGY", DEFAULT_TOPOLOGY)
+        if self.topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown workflow topology '{self.topology}'. Available: {', '.join(TOPOLOGIES)}")
+        self.nodes = TOPOLOGIES[self.topology]
+
+        # Agents are created on first use (or by warm_up)
+        self._agents: Dict[str, BaseAgent] = {}
+        self._agent_locks: Dict[str, asyncio.Lock] = {}
+
         # Create the graph
         self.graph = self._create_graph()
-    
+
+    async def get_agent(self, name: str) -> BaseAgent:
+        """Return the agent for a node, constructing it on first use"""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        async with self._agent_locks.setdefault(name, asyncio.Lock()):
+            agent = self._agents.get(name)
+            if agent is None:
+                # Imports, model clients, vector store and embedding model load synchronously;
+                # build in a thread so the event loop keeps serving other requests
+                agent = await asyncio.to_thread(self._construct_agent, name)
+                self._agents[name] = agent
+            return agent
+
+    def _construct_agent(self, name: str) -> BaseAgent:
+        module_path, class_name = AGENT_REGISTRY[name].split(":")
+        agent_class = getattr(importlib.import_module(module_path), class_name)
+        start = time.perf_counter()
+        agent = agent_class()
+        logger.info(f"Constructed agent '{name}' in {time.perf_counter() - start:.2f}s")
+        return agent
+
+    async def warm_up(self) -> None:
+        """Construct the agents of every wired node ahead of the first request"""
+        for name in self.nodes:
+            try:
+                await self.get_agent(name)
+            except Exception as e:
+                # Left for the first request to retry and report
+                logger.error(f"Could not construct agent '{name}' during warm-up: {str(e)}")
+
+    def _lazy_process(self, name: str) -> Callable[[AgentState], Any]:
+        async def process(state: AgentState) -> AgentState:
+            agent = await self.get_agent(name)
+            return await agent.process(state)
+        process.__name__ = f"{name}_process"
+        return process
+
     def _create_graph(self) -> Graph:
         # Create a new graph
         workflow = StateGraph(AgentState)
-        
+
         # Add nodes for each agent
-        workflow.add_node("input", self.input_agent.process)
-        workflow.add_node("identify", self.component_identification_agent.process)
-        workflow.add_node("static_map", self.static_component_mapping_agent.process)
-        workflow.add_node("detailed_code_generation", self.detailed_code_generation_agent.process)
-        # workflow.add_node("chat_based_code_modification", self.chat_based_code_modification_agent.process)
-        # workflow.add_node("output", self.output_agent.process)  # Add output node
-        
+        for name in self.nodes:
+            workflow.add_node(name, instrument_node(name, self._lazy_process(name)))
+
         # Define the edges
-        workflow.add_edge("input", "identify")
-        workflow.add_edge("identify", "static_map")
-        workflow.add_edge("static_map", "detailed_code_generation")
-        # workflow.add_edge("detailed_code_generation", "chat_based_code_modification")
+        for source, target in zip(self.nodes, self.nodes[1:]):
+            workflow.add_edge(source, target)
 
         # # Create a conditional edge for chat-based modifications
         # def should_continue_modification(state: AgentState) -> str:
@@ -51,7 +102,7 @@ class WorkflowGraph:
         #     if state.input_data.get("is_chat_modification", False):
         #         return "chat_based_code_modification"
         #     return "output"  # Fixed typo from "outpxut" to "output"
-        
+
         # # Add conditional edge
         # workflow.add_conditional_edges(
         #     "chat_based_code_modification",
@@ -61,20 +112,44 @@ class WorkflowGraph:
         #         "output": "output"
         #     }
         # )
-        
+
         # Set the entry point
-        workflow.set_entry_point("input")
+        workflow.set_entry_point(self.nodes[0])
         return workflow.compile()
-    
+
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process the input data through the workflow
         """
         # Create initial state
-        initial_state = AgentState(input_data=input_data)
-        
+        initial_state = AgentState(input_data=input_data, metadata={"submitted_at": time.time()})
+
         # Run the workflow
         final_state = await self.graph.ainvoke(initial_state)
-        
+
         # Return the final output
-        return final_state
\ No newline at end of file
+        return final_state
+
+    async def stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the workflow and yield progress events as they happen:
+        - {"event": "node", "node": name, "state": state} when a node finishes
+        - {"event": "token", "node": name, "content": text} for generated code tokens
+        - {"event": "result", "state": state} with the final state
+        """
+        initial_state = AgentState(input_data=input_data, metadata={"submitted_at": time.time()})
+        code_node = self.nodes[-1]
+
+        async for event in self.graph.astream_events(initial_state, version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chat_model_stream" and node == code_node:
+                content = event["data"]["chunk"].content
+                if content:
+                    yield {"event": "token", "node": node, "content": content}
+            elif kind == "on_chain_end" and event["name"] in self.nodes and event["name"] == node:
+                yield {"event": "node", "node": node, "state": event["data"].get("output")}
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # The root run ends last and carries the final state
+                yield {"event": "result", "state": event["data"].get("output")}
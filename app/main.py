@@ -1,17 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
 import os
 
 # Load environment variables from .env file
 load_dotenv()
 
 from app.routers import ingest, generate, modify
+from app.utils.instrumentation import render_metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the workflow's agents in the background so the first request does not pay for it
+    warm_up = asyncio.create_task(generate.workflow.warm_up())
+    yield
+    warm_up.cancel()
+    # Stop the generation workers and the scraper's shared browser
+    await generate.job_queue.stop()
+    await ingest.close_scraper()
 
 app = FastAPI(
     title="SpiceUI",
     description="Convert UI designs to React code using component libraries",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -28,6 +42,12 @@ app.include_router(ingest.router, prefix="/api/v1", tags=["Component Ingestion"]
 app.include_router(generate.router, prefix="/api/v1", tags=["Code Generation"])
 app.include_router(modify.router, prefix="/api/v1", tags=["Code Modification"])
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-stage latency, LLM tokens and vector store calls"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/")
 async def root():
     return {
@@ -37,6 +57,10 @@ async def root():
             "ingest": "/api/v1/ingest-component",
             "annotate": "/api/v1/annotate",
             "generate": "/api/v1/generate",
-            "modify": "/api/v1/modify"
+            "generate_stream": "/api/v1/generate/stream",
+            "generate_jobs": "/api/v1/generate/jobs",
+            "jobs": "/api/v1/jobs/{job_id}",
+            "modify": "/api/v1/modify",
+            "metrics": "/metrics"
         }
     } 
\ No newline at end of file
@@ -1,20 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 from app.graph.workflow import WorkflowGraph
+from app.utils.job_queue import Job, JobQueue, JobStatus, QueueFullError
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 workflow = WorkflowGraph()
 
+# Bounded worker pool shared by /generate, /generate/stream and the job API
+job_queue = JobQueue(
+    workflow.process,
+    workers=int(os.getenv("GENERATION_WORKERS", 2)),
+    max_queue_size=int(os.getenv("GENERATION_QUEUE_SIZE", 16)),
+    result_ttl_seconds=int(os.getenv("JOB_RESULT_TTL_SECONDS", 3600)),
+)
+# How often a waiting /generate request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 1.0
+
 class GenerateRequest(BaseModel):
     figma_url: Optional[str] = None
     image: Optional[str] = None  # Base64 encoded image
 
-@router.post("/generate")
-async def generate_code(request: GenerateRequest):
-    """
-    Generate React code from a Figma design or image using the LangGraph workflow
-    """
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+def _build_input_data(request: GenerateRequest) -> Dict[str, Any]:
     if not request.figma_url and not request.image:
         raise HTTPException(status_code=400, detail="Either figma_url or image must be provided")
     
@@ -23,9 +47,138 @@ async def generate_code(request: GenerateRequest):
         input_data["figma_url"] = request.figma_url
     if request.image:
         input_data["image"] = request.image
-    
+    return input_data
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+# Events never carry input_data: it echoes the uploaded base64 image back
+def _state_field(state: Any, field: str) -> Any:
+    if isinstance(state, dict):
+        return state.get(field)
+    return getattr(state, field, None)
+
+def _submit(input_data: Dict[str, Any], handler=None) -> Job:
+    try:
+        return job_queue.submit(input_data, handler)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+async def _wait_while_connected(request: Request, job: Job) -> Job:
+    """Wait for the job, cancelling it if the client disconnects first."""
+    waiter = asyncio.ensure_future(job_queue.wait(job))
     try:
-        result = await workflow.process(input_data)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        while not waiter.done():
+            await asyncio.wait({waiter}, timeout=DISCONNECT_POLL_SECONDS)
+            if not waiter.done() and await request.is_disconnected():
+                logger.info(f"Client disconnected, cancelling job {job.id}")
+                job_queue.cancel(job.id)
+                break
+        return await waiter
+    except asyncio.CancelledError:
+        job_queue.cancel(job.id)
+        raise
+
+def _stream_job(input_data: Dict[str, Any]) -> AsyncIterator[str]:
+    """Queue a streamed generation and return its SSE events.
+
+    The workflow runs on a job_queue worker like every other generation; its
+    events are handed to the response through a queue. Admission happens here,
+    so a full queue is a 429 rather than an error inside the stream.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def run(payload: Dict[str, Any]) -> None:
+        async for event in workflow.stream(payload):
+            events.put_nowait(event)
+
+    job = _submit(input_data, run)
+    # None marks the end, however the job finished (including cancelled while queued)
+    asyncio.ensure_future(job_queue.wait(job)).add_done_callback(lambda _: events.put_nowait(None))
+    return _stream_events(job, events)
+
+async def _stream_events(job: Job, events: asyncio.Queue) -> AsyncIterator[str]:
+    try:
+        while (event := await events.get()) is not None:
+            if event["event"] == "token":
+                yield _sse("token", {"node": event["node"], "content": event["content"]})
+            elif event["event"] == "node":
+                state = event["state"]
+                yield _sse("node", {
+                    "node": event["node"],
+                    "error": _state_field(state, "error"),
+                    "output_data": _state_field(state, "output_data"),
+                })
+            elif event["event"] == "result":
+                state = event["state"]
+                yield _sse("result", {
+                    "error": _state_field(state, "error"),
+                    "output_data": _state_field(state, "output_data"),
+                    "metadata": _state_field(state, "metadata"),
+                })
+        if job.status == JobStatus.FAILED:
+            logger.error(f"Streaming generation failed: {job.error}")
+            yield _sse("error", {"detail": job.error})
+        elif job.status == JobStatus.CANCELLED:
+            yield _sse("error", {"detail": "Generation was cancelled"})
+        yield _sse("done", {})
+    finally:
+        # The client went away (or the stream ended): stop the pipeline if it is still running
+        job_queue.cancel(job.id)
+
+@router.post("/generate")
+async def generate_code(request: GenerateRequest, http_request: Request):
+    """
+    Generate React code from a Figma design or image using the LangGraph workflow
+    """
+    input_data = _build_input_data(request)
+    job = await _wait_while_connected(http_request, _submit(input_data))
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=500, detail=job.error or "Generation was cancelled")
+    return job.result
+
+@router.post("/generate/jobs", response_model=JobResponse, status_code=202)
+async def submit_generation_job(request: GenerateRequest):
+    """
+    Queue a generation and return immediately; poll GET /jobs/{job_id} for the result
+    """
+    input_data = _build_input_data(request)
+    job = _submit(input_data)
+    return jsonable_encoder(job.to_dict())
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_generation_job(job_id: str):
+    """
+    Status of a generation job, with the result once it has succeeded
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return jsonable_encoder(job.to_dict())
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_generation_job(job_id: str):
+    """
+    Cancel a queued or running generation job
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has already finished")
+    return jsonable_encoder(job.to_dict())
+
+@router.post("/generate/stream")
+async def generate_code_stream(request: GenerateRequest):
+    """
+    Same as /generate, but streams progress as server-sent events:
+    `node` when each workflow stage completes, `token` for App.tsx code as it
+    is generated, then `result` with the final state (without input_data) and `done`.
+    Runs on the same bounded worker pool: 429 when the queue is full.
+    """
+    input_data = _build_input_data(request)
+    return StreamingResponse(
+        _stream_job(input_data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.component_schema import ComponentIngestRequest, ComponentIngestResponse, ComponentMetadata
 from app.utils.scraper import ComponentScraper
-from app.utils.chroma_vector_store import ComponentVectorStore
-import uuid
+from app.utils.vector_backend import get_vector_store
 import logging
 
 # Set up logging
@@ -11,7 +10,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 scraper = ComponentScraper()
-vector_store = ComponentVectorStore()      
+vector_store = get_vector_store()
+
+async def close_scraper():
+    # The scraper's browser is started by the first scrape and kept for later ones
+    await scraper.close()
 
 @router.post("/ingest-component", response_model=ComponentIngestResponse)
 async def ingest_component(request: ComponentIngestRequest):
@@ -19,10 +22,6 @@ async def ingest_component(request: ComponentIngestRequest):
     Ingest a component either from metadata or by scraping a documentation URL.
     """
     try:
-        # Generate a unique ID for the component
-        component_id = str(uuid.uuid4())
-        logger.debug(f"Generated component ID: {component_id}")
-        
         # Get component metadata
         if request.metadata:
             logger.debug("Ingesting component with metadata")
@@ -46,10 +45,10 @@ async def ingest_component(request: ComponentIngestRequest):
             )
         
         print("metadata", metadata)
-        # Add component to vector store
+        # Add component to vector store, replacing any previous version of it
         try:
-            vector_store.add_component(component_id, metadata)
-            logger.debug(f"Successfully added component to vector store: {component_id}")
+            component_id, changed = vector_store.upsert_component(metadata)
+            logger.debug(f"Component {component_id} {'stored' if changed else 'already up to date'}")
         except Exception as e:
             logger.error(f"Failed to add component to vector store: {str(e)}")
             raise HTTPException(
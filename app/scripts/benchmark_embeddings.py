@@ -0,0 +1,182 @@
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.utils.embeddings import DEFAULT_EMBEDDING_MODEL, EMBEDDING_BACKENDS, embedding_registry
+from app.utils.vector_backend import ENCODE_BATCH_SIZE, component_embedding_text, icon_embedding_text
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger('EmbeddingBenchmark')
+
+
+def load_catalog_texts(components_dir: str = "component-docs",
+                       icons_file: str = "icon-docs/icon-docs.json") -> Tuple[List[str], List[str]]:
+    """Texts the store embeds for the catalog, plus short queries like the agents send (names and synonyms)."""
+    documents, queries = [], []
+    for json_file in sorted(Path(components_dir).glob("*.json")):
+        with open(json_file, 'r') as f:
+            component = json.load(f)
+        documents.append(component_embedding_text(component))
+        queries.append(component['component_name'])
+
+    icons_path = Path(icons_file)
+    if icons_path.exists():
+        with open(icons_path, 'r') as f:
+            icons = json.load(f)
+        for icon in icons:
+            documents.append(icon_embedding_text(icon))
+            queries.append(icon['synonym'][0] if icon.get('synonym') else icon['component_name'])
+    return documents, queries
+
+
+def _normalized(vectors: Any) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def encode(model, texts: List[str]) -> np.ndarray:
+    return _normalized(model.encode(texts, batch_size=ENCODE_BATCH_SIZE))
+
+
+def check_equivalence(reference: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray], k: int) -> Dict[str, float]:
+    """Compare the cosine rankings of queries over the catalog under two backends.
+
+    Args:
+        reference, candidate: {"documents": matrix, "queries": matrix} of normalised embeddings
+        k: Ranking depth compared by recall@k
+
+    Returns:
+        top1_agreement: share of queries whose best match is the same document
+        recall_at_k: mean share of the reference top k that the candidate also ranks in its top k
+        min_cosine / mean_cosine: similarity of the two embeddings of each document
+    """
+    k = min(k, reference["documents"].shape[0])
+    reference_scores = reference["queries"] @ reference["documents"].T
+    candidate_scores = candidate["queries"] @ candidate["documents"].T
+
+    reference_top = np.argsort(-reference_scores, axis=1)[:, :k]
+    candidate_top = np.argsort(-candidate_scores, axis=1)[:, :k]
+    recall = [len(set(r) & set(c)) / k for r, c in zip(reference_top, candidate_top)]
+    document_cosines = np.sum(reference["documents"] * candidate["documents"], axis=1)
+    return {
+        "top1_agreement": float(np.mean(reference_top[:, 0] == candidate_top[:, 0])),
+        "recall_at_k": float(np.mean(recall)),
+        "min_cosine": float(np.min(document_cosines)),
+        "mean_cosine": float(np.mean(document_cosines)),
+    }
+
+
+def benchmark(model, documents: List[str], queries: List[str], latency_samples: int) -> Dict[str, float]:
+    """Bulk encode throughput over the catalog and single-query encode latency percentiles."""
+    # Warm up: first calls allocate buffers and, for ONNX Runtime, pick kernels
+    model.encode(documents[:ENCODE_BATCH_SIZE], batch_size=ENCODE_BATCH_SIZE)
+    for query in queries[:10]:
+        model.encode(query)
+
+    start = time.perf_counter()
+    model.encode(documents, batch_size=ENCODE_BATCH_SIZE)
+    bulk_seconds = time.perf_counter() - start
+
+    latencies = []
+    for i in range(latency_samples):
+        query = queries[i % len(queries)]
+        start = time.perf_counter()
+        model.encode(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "docs_per_second": len(documents) / bulk_seconds,
+        "query_p50_ms": float(np.percentile(latencies, 50)),
+        "query_p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def run(backends: List[str], k: int, latency_samples: int,
+        min_top1_agreement: float, min_recall: float,
+        components_dir: str = "component-docs",
+        icons_file: str = "icon-docs/icon-docs.json") -> Dict[str, Any]:
+    documents, queries = load_catalog_texts(components_dir, icons_file)
+    logger.info(f"Benchmarking {DEFAULT_EMBEDDING_MODEL} on {len(documents)} documents and {len(queries)} queries")
+
+    reference = None
+    results: Dict[str, Any] = {}
+    # torch is the float32 reference every other backend is checked against
+    for backend in ["torch"] + [b for b in backends if b != "torch"]:
+        try:
+            model = embedding_registry.get_model(DEFAULT_EMBEDDING_MODEL, backend=backend)
+        except Exception as e:
+            logger.error(f"Skipping backend {backend}: {str(e)}")
+            results[backend] = {"error": str(e)}
+            continue
+
+        vectors = {"documents": encode(model, documents), "queries": encode(model, queries)}
+        result = benchmark(model, documents, queries, latency_samples)
+        if backend == "torch":
+            reference = vectors
+        elif reference is not None:
+            result.update(check_equivalence(reference, vectors, k))
+            result["equivalent"] = (result["top1_agreement"] >= min_top1_agreement
+                                    and result["recall_at_k"] >= min_recall)
+        results[backend] = result
+    return results
+
+
+def print_report(results: Dict[str, Any], k: int) -> None:
+    reference = results.get("torch", {})
+    header = (f"{'backend':<10} {'docs/s':>9} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'top1':>6} {f'recall@{k}':>10} {'min cos':>8}  equivalent")
+    print(header)
+    print("-" * len(header))
+    for backend, result in results.items():
+        if "error" in result:
+            print(f"{backend:<10} unavailable: {result['error']}")
+            continue
+        speedup = result["docs_per_second"] / reference["docs_per_second"] if "docs_per_second" in reference else float("nan")
+        if "top1_agreement" in result:
+            check = (f"{result['top1_agreement']:>6.3f} {result['recall_at_k']:>10.3f} {result['min_cosine']:>8.4f}  "
+                     f"{'yes' if result['equivalent'] else 'NO'}")
+        else:
+            check = f"{'-':>6} {'-':>10} {'-':>8}  reference"
+        print(f"{backend:<10} {result['docs_per_second']:>9.1f} {speedup:>7.2f}x "
+              f"{result['query_p50_ms']:>8.2f} {result['query_p99_ms']:>8.2f} {check}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare embedding backends: encode throughput, query latency and ranking equivalence with torch"
+    )
+    parser.add_argument("--backends", nargs="+", choices=EMBEDDING_BACKENDS, default=list(EMBEDDING_BACKENDS))
+    parser.add_argument("--k", type=int, default=10, help="Ranking depth for recall@k")
+    parser.add_argument("--latency-samples", type=int, default=500)
+    parser.add_argument("--min-top1-agreement", type=float, default=0.98)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--components-dir", default="component-docs")
+    parser.add_argument("--icons-file", default="icon-docs/icon-docs.json")
+    args = parser.parse_args()
+
+    try:
+        results = run(args.backends, args.k, args.latency_samples, args.min_top1_agreement, args.min_recall,
+                      args.components_dir, args.icons_file)
+        print_report(results, args.k)
+        # Fail when a backend changes the rankings, so the check can gate a config change
+        if any(result.get("equivalent") is False for result in results.values()):
+            sys.exit(1)
+    except Exception as e:
+        logger.error(f"Script failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,132 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.utils.page_extraction import LXML_AVAILABLE, METADATA_FIELDS
+from app.utils.scrape_snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+from app.utils.scraper import ComponentScraper
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger('ExtractionBenchmark')
+
+
+def load_saved_pages(scraper: ComponentScraper, as_of: Optional[float] = None) -> List[Tuple[str, str, str]]:
+    """(usage URL, usage HTML, examples HTML) of every component with both pages in the snapshot store."""
+    store = scraper.snapshots
+    pages = []
+    for url in sorted({scraper._get_usage_url(url) for url in store.urls()}):
+        usage = store.get(url, as_of=as_of)
+        examples = store.get(scraper._get_examples_url(url), as_of=as_of)
+        if usage is None or examples is None:
+            logger.warning(f"Skipping {url}: usage or examples page not stored")
+            continue
+        pages.append((url, usage.html, examples.html))
+    return pages
+
+
+def time_extractor(extract, pages: List[Tuple[str, str, str]], repeat: int) -> Tuple[List[Dict[str, Any]], List[float]]:
+    """Fields of every page and per-component extraction times in ms (best of repeat runs)."""
+    fields, times = [], []
+    for _, usage_html, examples_html in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = extract(usage_html, examples_html)
+            best = min(best, time.perf_counter() - start)
+        fields.append(result)
+        times.append(best * 1000)
+    return fields, times
+
+
+def compare(pages: List[Tuple[str, str, str]], reference: List[Dict[str, Any]],
+            candidate: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """URLs whose extracted field differs between the two extractors, by field."""
+    mismatches: Dict[str, List[str]] = {}
+    for (url, _, _), expected, actual in zip(pages, reference, candidate):
+        for field in METADATA_FIELDS:
+            if expected[field] != actual[field]:
+                mismatches.setdefault(field, []).append(url)
+    return mismatches
+
+
+def run(snapshot_dir: str, repeat: int, as_of: Optional[float] = None) -> Dict[str, Any]:
+    if not LXML_AVAILABLE:
+        raise RuntimeError("lxml is not installed; nothing to compare the BeautifulSoup extractors with")
+    scraper = ComponentScraper(snapshot_mode="replay", snapshots=SnapshotStore(snapshot_dir))
+    pages = load_saved_pages(scraper, as_of)
+    if not pages:
+        raise RuntimeError(f"No component with both pages stored in {snapshot_dir}; "
+                           f"record some with scrape_components --snapshot-mode record")
+    logger.info(f"Benchmarking extraction on {len(pages)} saved components, best of {repeat} runs")
+
+    # The extractors log every field; keep that out of the timings
+    for name in ('ComponentScraper', 'app.utils.page_extraction'):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+    soup_fields, soup_times = time_extractor(scraper._extract_fields_with_soup, pages, repeat)
+    lxml_fields, lxml_times = time_extractor(scraper._extract_fields, pages, repeat)
+    for name in ('ComponentScraper', 'app.utils.page_extraction'):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+    results = {"components": len(pages), "mismatches": compare(pages, soup_fields, lxml_fields)}
+    for extractor, times in (("soup", soup_times), ("lxml", lxml_times)):
+        results[extractor] = {
+            "total_ms": float(np.sum(times)),
+            "p50_ms": float(np.percentile(times, 50)),
+            "p99_ms": float(np.percentile(times, 99)),
+        }
+    return results
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    reference = results["soup"]
+    header = f"{'extractor':<10} {'total ms':>10} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}"
+    print(f"{results['components']} components")
+    print(header)
+    print("-" * len(header))
+    for extractor in ("soup", "lxml"):
+        result = results[extractor]
+        speedup = reference["total_ms"] / result["total_ms"] if result["total_ms"] else float("nan")
+        print(f"{extractor:<10} {result['total_ms']:>10.1f} {result['p50_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {speedup:>7.2f}x")
+
+    if not results["mismatches"]:
+        print("Output identical for every field")
+    for field, urls in results["mismatches"].items():
+        print(f"{field}: differs on {len(urls)} components, e.g. {urls[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the single-pass lxml extractor with the BeautifulSoup extractors on saved pages"
+    )
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per component; the fastest is kept")
+    parser.add_argument("--as-of", type=float, default=None,
+                        help="Use the snapshots taken at or before this Unix timestamp")
+    args = parser.parse_args()
+
+    try:
+        results = run(args.snapshot_dir, args.repeat, args.as_of)
+        print_report(results)
+        # Fail when the extractors disagree, so the check can gate a parser change
+        if results["mismatches"]:
+            sys.exit(1)
+    except Exception as e:
+        logger.error(f"Script failed: {str(e)}")
+        sys.exit(1)
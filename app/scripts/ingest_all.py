@@ -3,13 +3,12 @@ import logging
 import sys
 from pathlib import Path
 from typing import List, Dict, Any
-import uuid
 import os
 
 # Add the parent directory to sys.path to import from app
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.vector_backend import create_vector_store
 
 # Configure logging
 logging.basicConfig(
@@ -22,32 +21,38 @@ logging.basicConfig(
 
 logger = logging.getLogger('ComponentIngestion')
 
-def ingest_all(components_dir: str = "component-docs", icons_file: str = "icon-docs/icon-docs.json") -> Dict[str, Any]:
+def ingest_all(components_dir: str = "component-docs",
+               icons_file: str = "icon-docs/icon-docs.json",
+               full_rebuild: bool = False) -> Dict[str, Any]:
     """
     Ingest all components and icons into ChromaDB.
-    This will clear the existing collection and create a new one.
+    Only new or edited documents are embedded; unchanged ones are skipped and
+    components or icons that were removed from the docs are deleted.
     
     Args:
         components_dir (str): Path to the directory containing component JSON files
         icons_file (str): Path to the icon documentation JSON file
+        full_rebuild (bool): Clear the collection and re-embed everything
         
     Returns:
         Dict containing ingestion statistics and any errors
     """
     try:
         # Initialize vector store
-        vector_store = ComponentVectorStore()
+        vector_store = create_vector_store()
         
-        # Clear existing collection
-        logger.info("Clearing existing collection...")
-        vector_store.clear_collection()
-        logger.info("Collection cleared successfully")
+        if full_rebuild:
+            logger.info("Clearing existing collection...")
+            vector_store.clear_collection()
+            logger.info("Collection cleared successfully")
 
         # Initialize counters
         successful_component_ingests = 0
         failed_component_ingests = 0
         successful_icon_ingests = 0
         failed_icon_ingests = 0
+        component_changes = None
+        icon_changes = None
         errors = []
 
         # Process components
@@ -61,24 +66,19 @@ def ingest_all(components_dir: str = "component-docs", icons_file: str = "icon-d
         else:
             logger.info(f"Found {len(json_files)} component JSON files to process")
 
+            components = []
             for json_file in json_files:
                 try:
                     # Read and parse JSON file
                     with open(json_file, 'r') as f:
                         component_data = json.load(f)
 
-                    # Generate unique ID
-                    component_id = str(uuid.uuid4())
-
                     # Validate required fields
                     if not component_data.get('component_name'):
                         logger.warning(f"Missing component_name in {json_file.name}")
                         continue
 
-                    # Add to vector store
-                    vector_store.add_component(component_id, component_data)
-                    successful_component_ingests += 1
-                    logger.info(f"Successfully ingested component {json_file.name}")
+                    components.append(component_data)
 
                 except json.JSONDecodeError as e:
                     logger.error(f"Invalid JSON in {json_file.name}: {str(e)}")
@@ -89,6 +89,16 @@ def ingest_all(components_dir: str = "component-docs", icons_file: str = "icon-d
                     failed_component_ingests += 1
                     errors.append(f"Error processing {json_file.name}: {str(e)}")
 
+            # Embed new and edited components, delete removed ones. A file that
+            # failed to parse must not cause its stored component to be deleted.
+            sync_result = vector_store.sync_components(components, prune=not failed_component_ingests)
+            current = len(sync_result["added"]) + len(sync_result["unchanged"])
+            successful_component_ingests += current
+            failed_component_ingests += len(components) - current
+            errors.extend(sync_result["errors"])
+            component_changes = {change: len(sync_result[change]) for change in ("added", "unchanged", "deleted")}
+            logger.info(f"Components: {component_changes}")
+
         # Process icons
         icons_path = Path(icons_file)
         if not icons_path.exists():
@@ -100,17 +110,14 @@ def ingest_all(components_dir: str = "component-docs", icons_file: str = "icon-d
 
                 logger.info(f"Found {len(icons)} icons to process")
 
-                for icon in icons:
-                    try:
-                        # Add to vector store
-                        vector_store.add_icon(icon)
-                        successful_icon_ingests += 1
-                        logger.info(f"Successfully ingested icon {icon.get('component_name', 'unknown')}")
-
-                    except Exception as e:
-                        logger.error(f"Error processing icon {icon.get('component_name', 'unknown')}: {str(e)}")
-                        failed_icon_ingests += 1
-                        errors.append(f"Error processing icon {icon.get('component_name', 'unknown')}: {str(e)}")
+                # Embed new and edited icons, delete removed ones
+                sync_result = vector_store.sync_icons(icons)
+                current = len(sync_result["added"]) + len(sync_result["unchanged"])
+                successful_icon_ingests += current
+                failed_icon_ingests += len(icons) - current
+                errors.extend(sync_result["errors"])
+                icon_changes = {change: len(sync_result[change]) for change in ("added", "unchanged", "deleted")}
+                logger.info(f"Icons: {icon_changes}")
 
             except json.JSONDecodeError as e:
                 logger.error(f"Invalid JSON in icons file: {str(e)}")
@@ -132,6 +139,8 @@ def ingest_all(components_dir: str = "component-docs", icons_file: str = "icon-d
             "failed_component_ingests": failed_component_ingests,
             "successful_icon_ingests": successful_icon_ingests,
             "failed_icon_ingests": failed_icon_ingests,
+            "component_changes": component_changes,
+            "icon_changes": icon_changes,
             "errors": errors if errors else None
         }
         
@@ -152,12 +161,15 @@ def ingest_all(components_dir: str = "component-docs", icons_file: str = "icon-d
         }
 
 if __name__ == "__main__":
-    # You can specify different directories as command line arguments
-    components_dir = sys.argv[1] if len(sys.argv) > 1 else "component-docs"
-    icons_file = sys.argv[2] if len(sys.argv) > 2 else "icon-docs/icon-docs.json"
+    # You can specify different directories as command line arguments,
+    # and --full-rebuild to clear the collection first
+    full_rebuild = "--full-rebuild" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    components_dir = args[0] if len(args) > 0 else "component-docs"
+    icons_file = args[1] if len(args) > 1 else "icon-docs/icon-docs.json"
     
     try:
-        result = ingest_all(components_dir, icons_file)
+        result = ingest_all(components_dir, icons_file, full_rebuild=full_rebuild)
         if not result["success"]:
             sys.exit(1)
     except Exception as e:
@@ -3,12 +3,11 @@ import logging
 import sys
 from pathlib import Path
 from typing import List, Dict, Any
-import uuid
 
 # Add the parent directory to sys.path to import from app
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.vector_backend import create_vector_store
 
 # Configure logging
 logging.basicConfig(
@@ -21,30 +20,32 @@ logging.basicConfig(
 
 logger = logging.getLogger('ComponentIngestion')
 
-def ingest_components(docs_dir: str = "component-docs") -> Dict[str, Any]:
+def ingest_components(docs_dir: str = "component-docs", full_rebuild: bool = False) -> Dict[str, Any]:
     """
     Ingest all component JSON files from the specified directory into ChromaDB.
-    This will clear the existing collection and create a new one.
+    Only new or edited documents are embedded; unchanged ones are skipped and
+    components whose JSON file was removed are deleted. Icons are left alone.
     
     Args:
         docs_dir (str): Path to the directory containing component JSON files
+        full_rebuild (bool): Clear the collection (including icons) and re-embed everything
         
     Returns:
         Dict containing ingestion statistics and any errors
     """
     try:
         # Initialize vector store
-        vector_store = ComponentVectorStore()
+        vector_store = create_vector_store()
         
         # Convert to Path object for better path handling
         docs_path = Path(docs_dir)
         if not docs_path.exists():
             raise ValueError(f"Directory {docs_dir} does not exist")
 
-        # Clear existing collection
-        logger.info("Clearing existing collection...")
-        vector_store.clear_collection()
-        logger.info("Collection cleared successfully")
+        if full_rebuild:
+            logger.info("Clearing existing collection...")
+            vector_store.clear_collection()
+            logger.info("Collection cleared successfully")
 
         # Get all JSON files
         json_files = list(docs_path.glob("*.json"))
@@ -57,6 +58,7 @@ def ingest_components(docs_dir: str = "component-docs") -> Dict[str, Any]:
         successful_ingests = 0
         failed_ingests = 0
         errors = []
+        components = []
 
         for json_file in json_files:
             try:
@@ -64,18 +66,12 @@ def ingest_components(docs_dir: str = "component-docs") -> Dict[str, Any]:
                 with open(json_file, 'r') as f:
                     component_data = json.load(f)
 
-                # Generate unique ID
-                component_id = str(uuid.uuid4())
-
                 # Validate required fields
                 if not component_data.get('component_name'):
                     logger.warning(f"Missing component_name in {json_file.name}")
                     continue
 
-                # Add to vector store
-                vector_store.add_component(component_id, component_data)
-                successful_ingests += 1
-                logger.info(f"Successfully ingested {json_file.name}")
+                components.append(component_data)
 
             except json.JSONDecodeError as e:
                 logger.error(f"Invalid JSON in {json_file.name}: {str(e)}")
@@ -86,11 +82,25 @@ def ingest_components(docs_dir: str = "component-docs") -> Dict[str, Any]:
                 failed_ingests += 1
                 errors.append(f"Error processing {json_file.name}: {str(e)}")
 
+        # Embed new and edited components, delete removed ones. A file that
+        # failed to parse must not cause its stored component to be deleted.
+        sync_result = vector_store.sync_components(components, prune=not failed_ingests)
+        current = len(sync_result["added"]) + len(sync_result["unchanged"])
+        successful_ingests += current
+        failed_ingests += len(components) - current
+        errors.extend(sync_result["errors"])
+        changes = {change: len(sync_result[change]) for change in ("added", "unchanged", "deleted")}
+
         result = {
             "success": True,
-            "message": f"Completed component ingestion. Successfully ingested {successful_ingests} components, failed {failed_ingests} components.",
+            "message": (
+                f"Completed component ingestion. Successfully ingested {successful_ingests} components "
+                f"({changes['added']} added, {changes['unchanged']} unchanged, {changes['deleted']} deleted), "
+                f"failed {failed_ingests} components."
+            ),
             "successful_ingests": successful_ingests,
             "failed_ingests": failed_ingests,
+            "changes": changes,
             "errors": errors if errors else None
         }
         
@@ -109,11 +119,14 @@ def ingest_components(docs_dir: str = "component-docs") -> Dict[str, Any]:
         }
 
 if __name__ == "__main__":
-    # You can specify a different directory as a command line argument
-    docs_dir = sys.argv[1] if len(sys.argv) > 1 else "component-docs"
+    # You can specify a different directory as a command line argument,
+    # and --full-rebuild to clear the collection first
+    full_rebuild = "--full-rebuild" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    docs_dir = args[0] if args else "component-docs"
     
     try:
-        result = ingest_components(docs_dir)
+        result = ingest_components(docs_dir, full_rebuild=full_rebuild)
         if not result["success"]:
             sys.exit(1)
     except Exception as e:
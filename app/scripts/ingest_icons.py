@@ -1,19 +1,17 @@
 import json
 import os
 from typing import Dict, Any, List
-from langchain_huggingface import HuggingFaceEmbeddings
 import sys
 from pathlib import Path
 
 # Add the parent directory to sys.path to import from app
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.vector_backend import create_vector_store
 
 def ingest_icons():
     """Ingest icon documentation into vector store"""
     # Initialize vector store
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    vector_store = ComponentVectorStore()
+    vector_store = create_vector_store()
 
     # Load icon documentation
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -22,15 +20,15 @@ def ingest_icons():
     with open(icon_docs_path, 'r') as f:
         icons = json.load(f)
 
-    # Prepare and ingest each icon
-    for icon in icons:
+    # Embed new and edited icons, delete removed ones
+    result = vector_store.sync_icons(icons)
+    for error in result["errors"]:
+        print(error)
 
-        
-        
-        # Add to vector store
-        vector_store.add_icon(icon)
-
-    print(f"Successfully ingested {len(icons)} icons into vector store")
+    print(
+        f"Successfully ingested {len(result['added']) + len(result['unchanged'])} of {len(icons)} icons into vector store "
+        f"({len(result['added'])} added, {len(result['unchanged'])} unchanged, {len(result['deleted'])} deleted)"
+    )
 
 if __name__ == "__main__":
     ingest_icons() 
\ No newline at end of file
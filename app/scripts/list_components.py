@@ -9,7 +9,7 @@ from datetime import datetime
 # Add the parent directory to sys.path to import from app
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from app.utils.chroma_vector_store import ComponentVectorStore
+from app.utils.vector_backend import create_vector_store
 
 # Configure logging
 logging.basicConfig(
@@ -34,13 +34,13 @@ def list_components(output_file: str = "component_list.txt") -> Dict[str, Any]:
     """
     try:
         # Initialize vector store
-        vector_store = ComponentVectorStore()
+        vector_store = create_vector_store()
         
         # Get all components
         logger.info("Fetching all components...")
-        results = vector_store.collection.get()
+        records = vector_store.list_records()
         
-        if not results or not results['ids']:
+        if not records:
             logger.warning("No components found in the collection")
             return {
                 "success": True,
@@ -51,9 +51,9 @@ def list_components(output_file: str = "component_list.txt") -> Dict[str, Any]:
 
         # Extract component names and categories
         components = []
-        for i, metadata in enumerate(results['metadatas']):
-            component_name = metadata.get('component_name', 'Unknown')
-            category = metadata.get('category', 'Uncategorized')
+        for record in records:
+            component_name = record.metadata.get('component_name', 'Unknown')
+            category = record.metadata.get('category', 'Uncategorized')
             components.append({
                 'name': component_name,
                 'category': category
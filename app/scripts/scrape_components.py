@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.utils.scrape_snapshots import SNAPSHOT_MODES
+from app.utils.scraper import ComponentScraper
+
+logger = logging.getLogger('ComponentScraping')
+
+
+async def scrape_components(urls: Optional[List[str]], output_file: str, concurrency: Optional[int] = None,
+                            snapshot_mode: Optional[str] = None,
+                            max_age_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Scrape Salt component documentation pages with one shared browser.
+
+    Args:
+        urls: Component documentation URLs (usage or examples pages); None replays every stored component
+        output_file: JSON file the scraped components are written to
+        concurrency: Number of components scraped at once
+        snapshot_mode: off, record, cache or replay (default: SCRAPER_SNAPSHOT_MODE)
+        max_age_seconds: In cache mode, refetch pages whose snapshot is older than this
+
+    Returns:
+        {"components": [...], "errors": [...]} as returned by ComponentScraper.scrape_many
+    """
+    async with ComponentScraper(concurrency=concurrency, snapshot_mode=snapshot_mode,
+                                snapshot_max_age_seconds=max_age_seconds) as scraper:
+        if urls is None:
+            if scraper.snapshots is None:
+                raise ValueError("A URL list is required unless snapshots are enabled")
+            # One entry per component: its usage and examples snapshots map to the same usage URL
+            urls = sorted({scraper._get_usage_url(url) for url in scraper.snapshots.urls()})
+            logger.info(f"Re-parsing {len(urls)} components from snapshots")
+        result = await scraper.scrape_many(urls)
+
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(result["components"], f, indent=2)
+    logger.info(f"Wrote {len(result['components'])} components to {output_file}")
+    for error in result["errors"]:
+        logger.error(error)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Salt component documentation pages concurrently")
+    parser.add_argument("urls_file", nargs="?",
+                        help="Text file with one component documentation URL per line "
+                             "(default with snapshots: every component in the snapshot store)")
+    parser.add_argument("--output", default="data/scraped_components.json")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Components scraped at once (default: SCRAPER_CONCURRENCY or 4)")
+    parser.add_argument("--snapshot-mode", choices=SNAPSHOT_MODES, default=None,
+                        help="record pages, reuse them (cache) or parse only stored pages (replay)")
+    parser.add_argument("--max-age", type=float, default=None,
+                        help="In cache mode, refetch pages whose snapshot is older than this many seconds")
+    args = parser.parse_args()
+
+    urls = None
+    if args.urls_file:
+        with open(args.urls_file, 'r') as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    try:
+        result = asyncio.run(scrape_components(urls, args.output, args.concurrency, args.snapshot_mode, args.max_age))
+        if result["errors"]:
+            sys.exit(1)
+    except Exception as e:
+        logger.error(f"Script failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,228 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+from app.utils.lexical_index import BM25Index, record_terms
+
+logger = logging.getLogger(__name__)
+
+# Metadata fields stored in the vector store as JSON strings
+JSON_METADATA_FIELDS = ('props', 'examples', 'tags', 'synonyms', 'when_to_use')
+
+
+class FrozenDict(dict):
+    """A dict that refuses modification, so one decoded record can be shared by every caller.
+
+    It is still a dict, so json.dumps, pydantic and isinstance checks accept it;
+    copy.deepcopy returns another FrozenDict.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Catalog records are shared and read-only; copy them before modifying")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into FrozenDicts and lists into tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def parse_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode the JSON string fields of stored metadata."""
+    parsed = dict(metadata or {})
+    for field in JSON_METADATA_FIELDS:
+        if isinstance(parsed.get(field), str):
+            try:
+                parsed[field] = json.loads(parsed[field])
+            except ValueError:
+                pass
+    return parsed
+
+
+def record_type_of(metadata: Dict[str, Any]) -> str:
+    # Records written before record_type was stored are told apart by category
+    return metadata.get('record_type') or ('icon' if metadata.get('category') == 'Icon' else 'component')
+
+
+# Records are stored and searched in one partition per kind, so a component
+# search never has to filter icons out of its nearest neighbours
+PARTITIONS = ('component', 'layout', 'icon')
+# Layout primitives are the *Layout components plus the items placed in them
+LAYOUT_ITEM_COMPONENTS = frozenset({'BorderItem', 'FlexItem', 'GridItem'})
+
+
+def partition_of(metadata: Dict[str, Any]) -> str:
+    """Partition a stored record belongs to: 'icon', 'layout' or 'component'."""
+    if record_type_of(metadata) == 'icon':
+        return 'icon'
+    name = metadata.get('component_name') or ''
+    if name.endswith('Layout') or name in LAYOUT_ITEM_COMPONENTS:
+        return 'layout'
+    return 'component'
+
+
+class CatalogRecord:
+    """A component or icon decoded once from its stored metadata and document."""
+
+    __slots__ = ('id', 'record_type', 'partition', 'component_name', 'metadata', 'document')
+
+    def __init__(self, record_id: str, record_type: str, component_name: str,
+                 metadata: Dict[str, Any], document: Optional[Dict[str, Any]]):
+        object.__setattr__(self, 'id', record_id)
+        object.__setattr__(self, 'record_type', record_type)
+        object.__setattr__(self, 'partition', partition_of({'record_type': record_type, 'component_name': component_name}))
+        object.__setattr__(self, 'component_name', component_name)
+        object.__setattr__(self, 'metadata', freeze(metadata))
+        object.__setattr__(self, 'document', freeze(document))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CatalogRecord is immutable")
+
+    def __repr__(self) -> str:
+        return f"CatalogRecord({self.id!r}, {self.record_type!r}, {self.component_name!r})"
+
+    @classmethod
+    def from_stored(cls, record_id: str, metadata: Optional[Dict[str, Any]], document: Optional[str]) -> "CatalogRecord":
+        """Decode a record as returned by the vector store (JSON string fields and document)."""
+        metadata = metadata or {}
+        return cls(
+            record_id,
+            record_type_of(metadata),
+            metadata.get('component_name'),
+            parse_metadata(metadata),
+            json.loads(document) if document else None,
+        )
+
+    def to_result(self, distance: Optional[float] = 0.0) -> Dict[str, Any]:
+        """Search-result shape used throughout the agents; the payloads are shared, not copied."""
+        return {
+            'id': self.id,
+            'metadata': self.metadata,
+            'distance': distance,
+            'full_metadata': self.document,
+        }
+
+
+# fetch(None) returns every stored record, fetch([ids]) only those IDs
+RecordFetcher = Callable[[Optional[List[str]]], Iterable[CatalogRecord]]
+
+# How long a catalog index is trusted when its store cannot tell whether it changed
+CATALOG_INDEX_TTL_SECONDS = float(os.getenv("CATALOG_INDEX_TTL_SECONDS", "60"))
+
+
+class CatalogIndex:
+    """In-memory copy of the catalog: records by ID, exact and case-insensitive name lookup
+    and a BM25 keyword index per partition.
+
+    Loaded with a single fetch on first use and dropped on every write, so
+    reads never go back to the store while the catalog is unchanged. Writes
+    from other processes (the ingest scripts) are noticed through refresh().
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = CATALOG_INDEX_TTL_SECONDS):
+        self._by_id: Optional[Dict[str, CatalogRecord]] = None
+        self._exact: Dict[Tuple[str, str], CatalogRecord] = {}
+        self._folded: Dict[Tuple[str, str], CatalogRecord] = {}
+        self._lexical: Dict[str, BM25Index] = {}
+        self._lock = threading.Lock()
+        self._ttl_seconds = ttl_seconds
+        self._version: Optional[Hashable] = None
+        self._loaded_at = 0.0
+
+    def _reset(self) -> None:
+        # Called with the lock held
+        self._by_id = None
+        self._exact = {}
+        self._folded = {}
+        self._lexical = {}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def refresh(self, version: Optional[Hashable]) -> None:
+        """Drop the loaded records if the store changed since they were read.
+
+        version identifies the stored catalog (e.g. file modification times);
+        stores that cannot provide one pass None, and the index is then
+        reloaded once it is older than ttl_seconds.
+        """
+        with self._lock:
+            if self._by_id is not None:
+                if version is None:
+                    stale = (self._ttl_seconds is not None
+                             and time.monotonic() - self._loaded_at > self._ttl_seconds)
+                else:
+                    stale = version != self._version
+                if stale:
+                    logger.debug("Catalog changed in the store; reloading the catalog index")
+                    self._reset()
+            if self._by_id is None:
+                # Taken before the records are read, so a write during the load triggers another
+                self._version = version
+
+    def _add(self, record: CatalogRecord) -> None:
+        self._by_id[record.id] = record
+        if record.component_name:
+            self._exact[(record.record_type, record.component_name)] = record
+            self._folded.setdefault((record.record_type, record.component_name.lower()), record)
+
+    def _ensure_loaded(self, fetch: RecordFetcher) -> None:
+        # Called with the lock held
+        if self._by_id is not None:
+            return
+        self._by_id = {}
+        self._loaded_at = time.monotonic()
+        for record in fetch(None):
+            self._add(record)
+        logger.debug(f"Loaded catalog index with {len(self._by_id)} records")
+
+    def lookup(self, fetch: RecordFetcher, name: str, record_type: str,
+               case_sensitive: bool = False) -> Optional[CatalogRecord]:
+        with self._lock:
+            self._ensure_loaded(fetch)
+            record = self._exact.get((record_type, name))
+            if record is None and not case_sensitive:
+                record = self._folded.get((record_type, name.lower()))
+        return record
+
+    def records(self, fetch: RecordFetcher, ids: List[str]) -> List[Optional[CatalogRecord]]:
+        """Records for ids, in order; IDs not loaded yet (e.g. written by another process) are fetched."""
+        with self._lock:
+            self._ensure_loaded(fetch)
+            missing = [record_id for record_id in dict.fromkeys(ids) if record_id not in self._by_id]
+            if missing:
+                for record in fetch(missing):
+                    self._add(record)
+                    self._lexical.pop(record.partition, None)
+            return [self._by_id.get(record_id) for record_id in ids]
+
+    def lexical(self, fetch: RecordFetcher, partition: str) -> BM25Index:
+        """Keyword index over the name, synonyms, tags and when_to_use of one partition, built on first use."""
+        with self._lock:
+            self._ensure_loaded(fetch)
+            index = self._lexical.get(partition)
+            if index is None:
+                index = self._lexical[partition] = BM25Index({
+                    r.id: record_terms(r.metadata, r.document)
+                    for r in self._by_id.values() if r.partition == partition
+                })
+            return index
+
+    def all(self, fetch: RecordFetcher, record_type: Optional[str] = None) -> List[CatalogRecord]:
+        with self._lock:
+            self._ensure_loaded(fetch)
+            return [r for r in self._by_id.values() if record_type is None or r.record_type == record_type]
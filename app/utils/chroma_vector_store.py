@@ -1,23 +1,37 @@
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Hashable, Optional, Set, Tuple
 import os
 import logging
 from pathlib import Path
 import stat
 
+from app.utils.catalog import PARTITIONS, CatalogRecord, partition_of, record_type_of
+from app.utils.embeddings import DEFAULT_EMBEDDING_MODEL
+from app.utils.instrumentation import record_vector_store_call
+# component_record_id, content_hash and icon_record_id are re-exported for existing imports
+from app.utils.vector_backend import (PARTITION_NAMES, CatalogVectorStore, component_record_id, content_hash, file_version,
+                                      icon_record_id, manifest_entry)
+
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-class ComponentVectorStore:
-    def __init__(self, persist_directory: str = "data/chroma"):
+# Created in the persist directory once the components collection has been split into partitions
+PARTITIONS_MIGRATED_MARKER = ".partitions_migrated"
+
+
+class ComponentVectorStore(CatalogVectorStore):
+    """Vector store backed by persistent ChromaDB collections (HNSW, cosine), one per partition."""
+
+    backend_name = "ChromaDB"
+
+    def __init__(self, persist_directory: str = "data/chroma", embedding_model_name: str = DEFAULT_EMBEDDING_MODEL):
         # Convert to absolute path
         self.persist_directory = str(Path(persist_directory).absolute())
         logger.debug(f"Using persist directory: {self.persist_directory}")
-        
+        super().__init__(self.persist_directory, embedding_model_name)
+
         # Ensure directory exists with proper permissions
         try:
             os.makedirs(self.persist_directory, exist_ok=True)
@@ -26,7 +40,7 @@ class ComponentVectorStore:
         except Exception as e:
             logger.error(f"Failed to create or set permissions on directory {self.persist_directory}: {str(e)}")
             raise
-        
+
         try:
             # Initialize ChromaDB client with explicit settings
             self.client = chromadb.PersistentClient(
@@ -37,356 +51,134 @@ class ComponentVectorStore:
                     is_persistent=True
                 )
             )
-            
-            # Create or get collection
-            self.collection = self.client.get_or_create_collection(
-                name="components",
-                metadata={"hnsw:space": "cosine"}
-            )
-            
-            # Verify collection
-            logger.debug(f"Collection name: {self.collection.name}")
-            logger.debug(f"Collection count: {self.collection.count()}")
-            
-            # Initialize sentence transformer for embeddings
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+
+            # Create or get one collection per partition
+            self.collections = {
+                partition: self.client.get_or_create_collection(
+                    name=PARTITION_NAMES[partition],
+                    metadata={"hnsw:space": "cosine"}
+                )
+                for partition in PARTITIONS
+            }
+            # The original single collection, holding every record before partitioning
+            self.collection = self.collections['component']
+            self._migrate_partitions()
+
+            # Verify collections
+            for collection in self.collections.values():
+                logger.debug(f"Collection {collection.name} count: {collection.count()}")
             logger.debug("ChromaDB initialized successfully")
-            
+
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {str(e)}")
             raise
-    
-    def _create_embedding(self, text: str) -> List[float]:
-        """Create embedding for a text using the sentence transformer model."""
-        return self.embedding_model.encode(text).tolist()
-    
-    def add_icon(self, icon_data: Dict[str, Any]) -> None:
-        """Add an icon to the vector store.
-        
-        Args:
-            icon_data: Dictionary containing icon information with the following structure:
-                {
-                    "component_name": str,
-                    "import": str,
-                    "synonym": List[str],
-                    "tags": List[str],
-                    "when_to_use": List[str]
-                }
+
+    def _migrate_partitions(self) -> None:
+        """Move layouts and icons stored in the single "components" collection into their own collections.
+
+        Embeddings are copied, so nothing is re-encoded. Completion is recorded
+        with a marker file in the persist directory, so later starts skip the scan.
         """
-        try:
-            logger.debug(f"Adding icon: {icon_data['component_name']}")
-            
-            # Generate a unique ID for the icon
-            icon_id = f"icon_{icon_data['component_name'].lower()}"
+        marker = os.path.join(self.persist_directory, PARTITIONS_MIGRATED_MARKER)
+        if os.path.exists(marker):
+            return
+        stored = self.collection.get(include=["metadatas"])
+        moves: Dict[str, List[str]] = {}
+        for record_id, meta in zip(stored['ids'], stored['metadatas']):
+            partition = partition_of(meta or {})
+            if partition != 'component':
+                moves.setdefault(partition, []).append(record_id)
 
-            # Prepare metadata for ChromaDB
-            metadata_for_chroma = {
-                'component_name': icon_data['component_name'],
-                'import_statement': icon_data['import'],
-                'description': f"Icon for {icon_data['component_name'].lower().replace('icon', '')}",
-                'category': 'Icon',
-                'props': json.dumps({
-                    'size': {
-                        'type': 'string | number',
-                        'required': False,
-                        'defaultValue': 'medium',
-                        'description': 'Size of the icon'
-                    },
-                    'color': {
-                        'type': 'string',
-                        'required': False,
-                        'defaultValue': 'inherit',
-                        'description': 'Color of the icon'
-                    }
-                }),
-                'tags': json.dumps(icon_data.get('tags', [])),
-                'synonyms': json.dumps(icon_data.get('synonym', [])),
-                'when_to_use': json.dumps(icon_data.get('when_to_use', []))
-            }
-            
-            # Create a text representation for embedding
-            # Include component name, synonyms, and tags for better searchability
-            component_text = (
-                f"{icon_data['component_name']} "
-                f"{' '.join(icon_data.get('synonym', []))} "
-                f"{' '.join(icon_data.get('tags', []))} "
-                f"{' '.join(icon_data.get('when_to_use', []))}"
+        for partition, ids in moves.items():
+            records = self.collection.get(ids=ids, include=["embeddings", "metadatas", "documents"])
+            self.collections[partition].upsert(
+                ids=records['ids'],
+                embeddings=records['embeddings'],
+                metadatas=records['metadatas'],
+                documents=records['documents']
             )
-            
-            # Create embedding
-            embedding = self._create_embedding(component_text)
-            
-            # Prepare full metadata for document
-            full_metadata = {
-                'component_name': icon_data['component_name'],
-                'import_statement': icon_data['import'],
-                'description': metadata_for_chroma['description'],
-                'category': 'Icon',
-                'props': json.loads(metadata_for_chroma['props']),
-                'tags': icon_data.get('tags', []),
-                'synonyms': icon_data.get('synonym', []),
-                'when_to_use': icon_data.get('when_to_use', [])
-            }
-            
-            # Add to collection
-            self.collection.add(
-                ids=[icon_id],
-                embeddings=[embedding],
-                metadatas=[metadata_for_chroma],
-                documents=[json.dumps(full_metadata)]
-            )
-            
-            # Verify the icon was added
-            count_after = self.collection.count()
-            logger.debug(f"Collection count after adding: {count_after}")
-            
-            # Verify the icon exists
-            result = self.collection.get(ids=[icon_id])
-            if not result['ids']:
-                raise Exception("Icon was not added successfully")
-            
-            logger.debug(f"Successfully added icon {icon_data['component_name']} to ChromaDB")
-            
-        except Exception as e:
-            logger.error(f"Error adding icon to ChromaDB: {str(e)}")
-            raise
+            self.collection.delete(ids=records['ids'])
+            logger.info(f"Moved {len(records['ids'])} records to the {PARTITION_NAMES[partition]} collection")
+        with open(marker, 'w'):
+            pass
 
-    def add_component(self, component_id: str, metadata: Dict[str, Any]) -> None:
-        """Add a component to the vector store."""
-        try:
-            logger.debug(f"Adding component with ID: {component_id}")
-            logger.debug(f"Metadata: {metadata}")
-            
-            # Convert lists to JSON strings for ChromaDB
-            metadata_for_chroma = {
-                'component_name': metadata['component_name'],
-                'description': metadata['metadata']['description'],
-                'props': json.dumps(metadata['metadata']['props']),
-                'examples': json.dumps(metadata['metadata'].get('examples', [])),
-                'category': metadata['metadata'].get('category', ""),
-                'tags': json.dumps(metadata['metadata'].get('tags', []))
-            }
-            
-            
-            # Create a text representation of the component for embedding
-            component_text = f"{metadata['component_name']} {metadata['metadata']['description']} {' '.join(metadata['metadata'].get('tags', []))}"
-            
-            # Create embedding
-            embedding = self._create_embedding(component_text)
-            
-            # Add to collection
-            self.collection.add(
-                ids=[component_id],
-                embeddings=[embedding],
-                metadatas=[metadata_for_chroma],
-                documents=[json.dumps(metadata)]
-            )
-            
-            # Verify the component was added
-            count_after = self.collection.count()
-            logger.debug(f"Collection count after adding: {count_after}")
-            
-            # Verify the component exists
-            result = self.collection.get(ids=[component_id])
-            if not result['ids']:
-                raise Exception("Component was not added successfully")
-            
-            logger.debug(f"Successfully added component {component_id} to ChromaDB")
-            
-        except Exception as e:
-            logger.error(f"Error adding component to ChromaDB: {str(e)}")
-            raise
-    
-    def get_component(self, component_id: str) -> Dict[str, Any]:
-        """Get a component by its ID."""
-        try:
-            logger.debug(f"Attempting to retrieve component with ID: {component_id}")
-            
-            # Log the current state of the collection
-            logger.debug(f"Collection name: {self.collection.name}")
-            logger.debug(f"Collection count: {self.collection.count()}")
-            
-            # Get the component
-            result = self.collection.get(ids=[component_id])
-            logger.debug(f"Raw ChromaDB query result: {result}")
-            
-            if not result['ids']:
-                logger.warning(f"No component found with ID: {component_id}")
-                return None
-            
-            # Parse the metadata
-            metadata = result['metadatas'][0]
-            parsed_metadata = {
-                'component_name': metadata['component_name'],
-                'description': metadata['description'],
-                'props': json.loads(metadata['props']),
-                'examples': json.loads(metadata['examples']),
-                'category': metadata['category'],
-                'tags': json.loads(metadata['tags'])
-            }
-            
-            # Log the parsed result
-            parsed_result = {
-                'id': result['ids'][0],
-                'metadata': parsed_metadata,
-                'document': json.loads(result['documents'][0])
-            }
-            logger.debug(f"Parsed result: {parsed_result}")
-            
-            return parsed_result
-            
-        except Exception as e:
-            logger.error(f"Error retrieving component from ChromaDB: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise
-    
-    def search_components(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Search for components similar to the query, returning parsed metadata and full document."""
-        try:
-            logger.debug(f"Searching for components with query: {query}")
-            # Create embedding for query
-            query_embedding = self._create_embedding(query)
-            
-            # Search in collection
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results
-            )
-            
-            # Format results
-            components = []
-            for i in range(len(results['ids'][0])):
-                meta = results['metadatas'][0][i]
-                # Parse fields that are stored as JSON strings
-                meta['tags'] = json.loads(meta['tags']) if isinstance(meta['tags'], str) else meta['tags']
-                meta['props'] = json.loads(meta['props']) if isinstance(meta['props'], str) else meta['props']
-                meta['examples'] = json.loads(meta['examples']) if isinstance(meta['examples'], str) else meta['examples']
-                # Add full document
-                full_metadata = json.loads(results['documents'][0][i]) if results['documents'][0][i] else None
-                components.append({
-                    'id': results['ids'][0][i],
-                    'metadata': meta,
-                    'distance': results['distances'][0][i],
-                    'full_metadata': full_metadata
-                })
-            logger.debug(f"Found {len(components)} components")
+    def _write(self, partition: str, ids: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
+        self.collections[partition].upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
 
-            return components
-            
-        except Exception as e:
-            logger.error(f"Error searching components: {str(e)}")
-            raise
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        found = set()
+        for collection in self.collections.values():
+            found.update(collection.get(ids=ids, include=[])['ids'])
+        return found
 
-    def search_icons(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Search for icons similar to the query, returning parsed metadata and full document.
-        
-        Args:
-            query: Search query string. Can be icon name, synonym, tag, or use case.
-            n_results: Maximum number of results to return.
-            
-        Returns:
-            List of dictionaries containing icon information with the following structure:
-            {
-                'id': str,
-                'metadata': {
-                    'component_name': str,
-                    'import_statement': str,
-                    'description': str,
-                    'category': str,
-                    'props': Dict,
-                    'tags': List[str],
-                    'synonyms': List[str],
-                    'when_to_use': List[str]
-                },
-                'distance': float,
-                'full_metadata': Dict
-            }
-        """
-        try:
-            logger.debug(f"Searching for icons with query: {query}")
-            
-            # First try exact name match
-            exact_query = query.lower().replace("icon", "").strip()
-            results = self.collection.get(
-                where={"category": "Icon"},
-                include=["metadatas", "documents"]
-            )
-            
-            exact_matches = []
-            for i, meta in enumerate(results['metadatas']):
-                component_name = meta.get('component_name', '').lower()
-                if component_name == exact_query or component_name == f"icon{exact_query}":
-                    exact_matches.append({
-                        'id': results['ids'][i],
-                        'metadata': meta,
-                        'distance': 0.0,  # Exact match
-                        'full_metadata': json.loads(results['documents'][i]) if results['documents'][i] else None
-                    })
-            
-            if exact_matches:
-                logger.debug(f"Found exact match for icon: {query}")
-                return exact_matches
-            
-            # If no exact match, try semantic search
-            query_embedding = self._create_embedding(query)
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results,
-                where={"category": "Icon"}  # Only search in icons
+    def _delete(self, ids: List[str]) -> None:
+        for collection in self.collections.values():
+            collection.delete(ids=ids)
+
+    def _fetch_records(self, ids: Optional[List[str]] = None) -> List[CatalogRecord]:
+        """Read and decode records from Chroma (all of them when ids is None)."""
+        record_vector_store_call("get")
+        records = []
+        for collection in self.collections.values():
+            if ids is None:
+                results = collection.get(include=["metadatas", "documents"])
+            else:
+                results = collection.get(ids=ids, include=["metadatas", "documents"])
+            records.extend(
+                CatalogRecord.from_stored(record_id, meta, document)
+                for record_id, meta, document in zip(results['ids'], results['metadatas'], results['documents'])
             )
-            
-            # Format results
-            icons = []
-            for i in range(len(results['ids'][0])):
-                meta = results['metadatas'][0][i]
-                
-                # Parse fields that are stored as JSON strings
-                meta['tags'] = json.loads(meta['tags']) if isinstance(meta['tags'], str) else meta['tags']
-                meta['props'] = json.loads(meta['props']) if isinstance(meta['props'], str) else meta['props']
-                meta['synonyms'] = json.loads(meta['synonyms']) if isinstance(meta['synonyms'], str) else meta['synonyms']
-                meta['when_to_use'] = json.loads(meta['when_to_use']) if isinstance(meta['when_to_use'], str) else meta['when_to_use']
-                
-                # Add full document
-                full_metadata = json.loads(results['documents'][0][i]) if results['documents'][0][i] else None
-                
-                icons.append({
-                    'id': results['ids'][0][i],
-                    'metadata': meta,
-                    'distance': results['distances'][0][i],
-                    'full_metadata': full_metadata
-                })
-            
-            logger.debug(f"Found {len(icons)} icons")
-            return icons
-            
-        except Exception as e:
-            logger.error(f"Error searching icons: {str(e)}")
-            raise
-    
-    def delete_component(self, component_id: str) -> None:
-        """Delete a component from the vector store."""
-        try:
-            logger.debug(f"Deleting component with ID: {component_id}")
-            self.collection.delete(ids=[component_id])
-            logger.debug(f"Successfully deleted component {component_id}")
-            
-        except Exception as e:
-            logger.error(f"Error deleting component: {str(e)}")
-            raise
+        return records
 
-    def clear_collection(self):
-        """
-        Clear all data from the collection by deleting and recreating it.
-        """
-        try:
+    def _nearest(self, partition: str, embeddings: List[List[float]], n_results: int,
+                 where: Optional[Dict[str, Any]]) -> Tuple[List[List[str]], List[List[float]]]:
+        collection = self.collections[partition]
+        # Chroma rejects n_results larger than the collection
+        n_results = min(n_results, collection.count())
+        if n_results == 0:
+            return [[] for _ in embeddings], [[] for _ in embeddings]
+        query_kwargs = {
+            "query_embeddings": embeddings,
+            "n_results": n_results,
+            "include": ["distances"]
+        }
+        if where:
+            query_kwargs["where"] = where
+        results = collection.query(**query_kwargs)
+        return results['ids'], results['distances']
+
+    def _clear(self) -> None:
+        for collection in self.collections.values():
             # Get all IDs from the collection
-            results = self.collection.get()
+            results = collection.get(include=[])
             if results and results['ids']:
                 # Delete all documents by their IDs
-                self.collection.delete(ids=results['ids'])
-            logger.info("Collection cleared successfully")
-        except Exception as e:
-            logger.error(f"Error clearing collection: {str(e)}")
-            raise
\ No newline at end of file
+                collection.delete(ids=results['ids'])
+
+    def _max_batch_size(self) -> Optional[int]:
+        return getattr(self.client, "get_max_batch_size", lambda: None)()
+
+    def _catalog_version(self) -> Optional[Hashable]:
+        # Every write goes through Chroma's SQLite database (and its write-ahead log)
+        database = os.path.join(self.persist_directory, "chroma.sqlite3")
+        return file_version(database, f"{database}-wal")
+
+    def get_manifest(self, record_type: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Describe what is stored: record ID -> {component_name, record_type, content_hash, embedding_model}.
+
+        Reads only metadata from Chroma; see CatalogVectorStore.get_manifest.
+        """
+        record_vector_store_call("get")
+        manifest = {}
+        for partition, collection in self.collections.items():
+            if record_type and (partition == 'icon') != (record_type == 'icon'):
+                continue
+            results = collection.get(include=["metadatas"])
+            for record_id, meta in zip(results['ids'], results['metadatas']):
+                meta = meta or {}
+                stored_type = record_type_of(meta)
+                if record_type and stored_type != record_type:
+                    continue
+                manifest[record_id] = manifest_entry(meta)
+        return manifest
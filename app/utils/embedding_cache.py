@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+import array
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app.utils.instrumentation import record_embedding_cache_lookups
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class QueryEmbeddingCache:
+    """Bounded, thread-safe LRU of (model, text) -> embedding vector.
+
+    With a path, entries are also written to SQLite and the most recently
+    used ones are loaded back on first use after a restart.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = str(Path(path).absolute()) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+        self._loaded_models = set()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                " model TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (model, text))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS query_embeddings_created_at ON query_embeddings (created_at)")
+            self._conn = conn
+            logger.debug(f"Opened query embedding cache at {self.path}")
+        return self._conn
+
+    def _load_persisted(self, model_name: str) -> None:
+        # Called with the lock held, once per model
+        self._loaded_models.add(model_name)
+        if not self.path:
+            return
+        try:
+            rows = self._connection().execute(
+                "SELECT text, vector FROM query_embeddings WHERE model = ? ORDER BY created_at DESC LIMIT ?",
+                (model_name, self.max_entries),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Query embedding cache load failed: {str(e)}")
+            return
+        # Oldest first so the newest end up most recently used
+        for text, blob in reversed(rows):
+            key = (model_name, text)
+            if key not in self._entries:
+                self._entries[key] = tuple(array.array("f", blob))
+        self._trim()
+        logger.info(f"Loaded {len(rows)} cached query embeddings for {model_name}")
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors aligned with texts; None for misses."""
+        found: List[Optional[List[float]]] = []
+        with self._lock:
+            if model_name not in self._loaded_models:
+                self._load_persisted(model_name)
+            for text in texts:
+                vector = self._entries.get((model_name, text))
+                if vector is None:
+                    found.append(None)
+                else:
+                    self._entries.move_to_end((model_name, text))
+                    found.append(list(vector))
+            hits = sum(1 for vector in found if vector is not None)
+            self.hits += hits
+            self.misses += len(found) - hits
+        record_embedding_cache_lookups(hits, len(found) - hits)
+        return found
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                stored = tuple(float(v) for v in vector)
+                self._entries[(model_name, text)] = stored
+                self._entries.move_to_end((model_name, text))
+                rows.append((model_name, text, array.array("f", stored).tobytes(), now))
+            self._trim()
+            if self.path and rows:
+                self._persist(rows)
+
+    def _persist(self, rows: List[Tuple[str, str, bytes, float]]) -> None:
+        try:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings (model, text, vector, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM query_embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM query_embeddings ORDER BY created_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Query embedding cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                self._connection().execute("DELETE FROM query_embeddings")
+
+
+_default_cache: Optional[QueryEmbeddingCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """Return the process-wide query embedding cache, or None if disabled.
+
+    QUERY_EMBEDDING_CACHE_ENABLED (default "true"), QUERY_EMBEDDING_CACHE_MAX_ENTRIES
+    and QUERY_EMBEDDING_CACHE_PATH (unset keeps the cache in memory only) control it.
+    """
+    global _default_cache
+    if os.getenv("QUERY_EMBEDDING_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = QueryEmbeddingCache(
+                max_entries=int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                path=os.getenv("QUERY_EMBEDDING_CACHE_PATH") or None,
+            )
+        return _default_cache
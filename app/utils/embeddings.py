@@ -0,0 +1,172 @@
+from sentence_transformers import SentenceTransformer
+from langchain_core.embeddings import Embeddings
+from typing import Dict, Any, List, Optional
+import logging
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app.utils.instrumentation import record_embedding_model_load
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Inference runtimes for the sentence transformer, selected with EMBEDDING_BACKEND:
+#   torch      PyTorch float32 (default)
+#   onnx       ONNX Runtime float32
+#   onnx-int8  ONNX Runtime with int8-quantized weights
+# The ONNX backends need sentence-transformers>=3.2 and optimum[onnxruntime].
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_EMBEDDING_BACKEND = "torch"
+# Quantized export in the sentence-transformers model repos; the AVX2 build runs on any x86-64 server.
+# Set EMBEDDING_ONNX_INT8_FILE to e.g. onnx/model_qint8_avx512_vnni.onnx or onnx/model_qint8_arm64.onnx.
+DEFAULT_ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+
+
+def get_embedding_backend() -> str:
+    """Configured inference backend (EMBEDDING_BACKEND, default "torch")."""
+    backend = os.getenv("EMBEDDING_BACKEND", DEFAULT_EMBEDDING_BACKEND).strip().lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Available: {', '.join(EMBEDDING_BACKENDS)}")
+    return backend
+
+
+def embedding_model_key(model_name: str, backend: Optional[str] = None) -> str:
+    """Name identifying the vectors a model produces: quantized output is kept apart from float32 in caches."""
+    backend = backend or get_embedding_backend()
+    return model_name if backend == "torch" else f"{model_name}[{backend}]"
+
+
+def _load_sentence_transformer(model_name: str, backend: str) -> SentenceTransformer:
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    kwargs: Dict[str, Any] = {"backend": "onnx"}
+    if backend == "onnx-int8":
+        kwargs["model_kwargs"] = {"file_name": os.getenv("EMBEDDING_ONNX_INT8_FILE", DEFAULT_ONNX_INT8_FILE)}
+    try:
+        return SentenceTransformer(model_name, **kwargs)
+    except (TypeError, ImportError) as e:
+        # TypeError: sentence-transformers older than 3.2 has no backend argument
+        raise RuntimeError(
+            f"EMBEDDING_BACKEND={backend} needs sentence-transformers>=3.2 and optimum[onnxruntime]: {e}"
+        ) from e
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Return the resident set size of this process in bytes, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        # AttributeError: no os.sysconf on Windows
+        return None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size of this process in bytes, or None on Windows."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class EmbeddingModelRegistry:
+    """Process-wide registry that loads each embedding model once, on first use."""
+
+    def __init__(self):
+        self._models: Dict[str, SentenceTransformer] = {}
+        self._langchain_embeddings: Dict[str, "SharedSentenceTransformerEmbeddings"] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_model(self, model_name: str = DEFAULT_EMBEDDING_MODEL, backend: Optional[str] = None) -> SentenceTransformer:
+        """Return the shared SentenceTransformer for model_name, loading it if needed.
+
+        backend defaults to EMBEDDING_BACKEND; each (model, backend) pair is loaded once.
+        """
+        key = embedding_model_key(model_name, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            logger.info(f"Loading embedding model '{key}'")
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
+            model = _load_sentence_transformer(model_name, backend or get_embedding_backend())
+            load_seconds = time.perf_counter() - start
+            rss_after = _current_rss_bytes()
+
+            stats: Dict[str, Any] = {"load_seconds": round(load_seconds, 3)}
+            if rss_before is not None and rss_after is not None:
+                rss_delta = rss_after - rss_before
+                stats["rss_delta_mb"] = round(rss_delta / (1024 * 1024), 1)
+                stats["rss_after_mb"] = round(rss_after / (1024 * 1024), 1)
+                memory = f"+{stats['rss_delta_mb']} MB RSS, {stats['rss_after_mb']} MB total"
+            else:
+                # Without the current RSS only the process peak is known, which says nothing about this load
+                rss_delta = None
+                peak = _peak_rss_bytes()
+                stats["peak_rss_mb"] = round(peak / (1024 * 1024), 1) if peak is not None else None
+                memory = f"peak RSS {stats['peak_rss_mb']} MB" if peak is not None else "RSS unavailable"
+
+            record_embedding_model_load(key, load_seconds, rss_delta)
+            self._stats[key] = stats
+            logger.info(f"Loaded embedding model '{key}' in {load_seconds:.2f}s ({memory})")
+            self._models[key] = model
+            return model
+
+    def get_langchain_embeddings(self, model_name: str = DEFAULT_EMBEDDING_MODEL) -> "SharedSentenceTransformerEmbeddings":
+        """Return a LangChain Embeddings adapter backed by the shared model."""
+        with self._lock:
+            embeddings = self._langchain_embeddings.get(model_name)
+            if embeddings is None:
+                embeddings = SharedSentenceTransformerEmbeddings(model_name, registry=self)
+                self._langchain_embeddings[model_name] = embeddings
+            return embeddings
+
+    def is_loaded(self, model_name: str = DEFAULT_EMBEDDING_MODEL, backend: Optional[str] = None) -> bool:
+        return embedding_model_key(model_name, backend) in self._models
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load time and memory cost of every model loaded so far."""
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+class SharedSentenceTransformerEmbeddings(Embeddings):
+    """LangChain Embeddings that resolve the shared model lazily on first embed call."""
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, registry: Optional[EmbeddingModelRegistry] = None):
+        self.model_name = model_name
+        self._registry = registry or embedding_registry
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        model = self._registry.get_model(self.model_name)
+        return model.encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        model = self._registry.get_model(self.model_name)
+        return model.encode(text).tolist()
+
+
+embedding_registry = EmbeddingModelRegistry()
+
+
+def get_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL) -> SentenceTransformer:
+    """Shortcut for embedding_registry.get_model."""
+    return embedding_registry.get_model(model_name)
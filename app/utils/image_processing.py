@@ -0,0 +1,133 @@
+from PIL import Image, ImageOps
+from dataclasses import dataclass
+from typing import Optional, Union
+import base64
+import hashlib
+import io
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# GPT-4o first fits high-detail images inside 2048x2048 and then scales the
+# shortest side down to 768px, so pixels beyond that only cost upload time.
+DEFAULT_MAX_DIMENSION = 2048
+DEFAULT_MAX_SHORT_SIDE = 768
+DEFAULT_FORMAT = "JPEG"
+DEFAULT_QUALITY = 85
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+@dataclass
+class NormalizedImage:
+    """An uploaded image decoded once, downscaled and re-encoded without metadata."""
+    data_url: str
+    content_hash: str
+    width: int
+    height: int
+    original_width: int
+    original_height: int
+    original_bytes: int
+    normalized_bytes: int
+    image: Image.Image
+
+    def summary(self) -> dict:
+        """JSON-friendly description (without the pixel data) for state metadata."""
+        return {
+            "content_hash": self.content_hash,
+            "width": self.width,
+            "height": self.height,
+            "original_width": self.original_width,
+            "original_height": self.original_height,
+            "original_bytes": self.original_bytes,
+            "normalized_bytes": self.normalized_bytes,
+        }
+
+
+def decode_image_bytes(image_data: Union[str, bytes]) -> bytes:
+    """Decode a data URL or bare base64 string into raw bytes (bytes pass through)."""
+    if isinstance(image_data, bytes):
+        return image_data
+    if image_data.startswith("data:"):
+        image_data = image_data.split(",", 1)[-1]
+    # Add padding if necessary
+    padding = 4 - (len(image_data) % 4)
+    if padding != 4:
+        image_data += "=" * padding
+    return base64.b64decode(image_data)
+
+
+def _target_size(width: int, height: int, max_dimension: int, max_short_side: int) -> tuple:
+    scale = min(1.0, max_dimension / max(width, height))
+    if max_short_side:
+        scale = min(scale, max_short_side / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def normalize_image(image_data: Union[str, bytes],
+                    max_dimension: Optional[int] = None,
+                    max_short_side: Optional[int] = None,
+                    image_format: Optional[str] = None,
+                    quality: Optional[int] = None) -> NormalizedImage:
+    """Decode, clamp the resolution, strip metadata and re-encode an uploaded image.
+
+    Defaults come from IMAGE_MAX_DIMENSION, IMAGE_MAX_SHORT_SIDE (0 disables it),
+    IMAGE_FORMAT (JPEG, PNG or WEBP) and IMAGE_QUALITY.
+    """
+    max_dimension = max_dimension or int(os.getenv("IMAGE_MAX_DIMENSION", DEFAULT_MAX_DIMENSION))
+    if max_short_side is None:
+        max_short_side = int(os.getenv("IMAGE_MAX_SHORT_SIDE", DEFAULT_MAX_SHORT_SIDE))
+    image_format = (image_format or os.getenv("IMAGE_FORMAT", DEFAULT_FORMAT)).upper()
+    quality = quality or int(os.getenv("IMAGE_QUALITY", DEFAULT_QUALITY))
+    if image_format not in _MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    raw = decode_image_bytes(image_data)
+    image = Image.open(io.BytesIO(raw))
+    image.load()
+    original_width, original_height = image.size
+
+    # Honour camera/phone orientation before the EXIF block is dropped
+    image = ImageOps.exif_transpose(image)
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if image_format == "JPEG" or not has_alpha:
+        if has_alpha:
+            # JPEG has no alpha channel: flatten onto white like a browser would
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image.convert("RGBA"), mask=image.convert("RGBA").split()[-1])
+            image = background
+        else:
+            image = image.convert("RGB")
+    else:
+        image = image.convert("RGBA")
+
+    target = _target_size(image.width, image.height, max_dimension, max_short_side)
+    if target != image.size:
+        image = image.resize(target, Image.LANCZOS)
+
+    # Saving without exif/icc_profile/pnginfo drops all metadata
+    buffer = io.BytesIO()
+    save_kwargs = {"optimize": True}
+    if image_format in ("JPEG", "WEBP"):
+        save_kwargs["quality"] = quality
+    image.save(buffer, format=image_format, **save_kwargs)
+    encoded = buffer.getvalue()
+
+    normalized = NormalizedImage(
+        data_url=f"data:{_MIME_TYPES[image_format]};base64,{base64.b64encode(encoded).decode()}",
+        content_hash=hashlib.sha256(encoded).hexdigest(),
+        width=image.width,
+        height=image.height,
+        original_width=original_width,
+        original_height=original_height,
+        original_bytes=len(raw),
+        normalized_bytes=len(encoded),
+        image=image,
+    )
+    logger.info(
+        f"Normalized image {original_width}x{original_height} ({len(raw)} bytes) -> "
+        f"{image.width}x{image.height} {image_format} ({len(encoded)} bytes)"
+    )
+    return normalized
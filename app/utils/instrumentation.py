@@ -0,0 +1,192 @@
+from prometheus_client import Counter, Histogram, Gauge, CONTENT_TYPE_LATEST, generate_latest
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+import asyncio
+import functools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+STAGE_SECONDS = Histogram(
+    "spiceui_stage_duration_seconds", "Wall time of a workflow stage", ["stage"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+STAGE_QUEUE_SECONDS = Histogram(
+    "spiceui_stage_queue_seconds", "Time a state waited between stages before a stage started", ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+STAGE_ERRORS = Counter("spiceui_stage_errors_total", "Workflow stages that finished with state.error set", ["stage"])
+SPAN_SECONDS = Histogram(
+    "spiceui_span_duration_seconds", "Wall time of an instrumented step inside a stage", ["span"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+LLM_SECONDS = Histogram(
+    "spiceui_llm_call_duration_seconds", "Wall time of an LLM call", ["agent", "model", "cached"],
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+LLM_TOKENS = Counter("spiceui_llm_tokens_total", "LLM tokens consumed", ["agent", "model", "kind"])
+LLM_PROMPT_BYTES = Histogram(
+    "spiceui_llm_prompt_bytes", "Serialized size of the messages sent to the LLM", ["agent"],
+    buckets=(1e3, 5e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6),
+)
+LLM_QUEUE_DEPTH = Gauge("spiceui_llm_queue_depth", "LLM calls waiting for a concurrency slot", ["model"])
+LLM_IN_FLIGHT = Gauge("spiceui_llm_in_flight", "LLM calls currently running", ["model"])
+LLM_RETRIES = Counter("spiceui_llm_retries_total", "LLM calls retried after rate limits or transient errors", ["model", "reason"])
+VECTOR_STORE_CALLS = Counter("spiceui_vector_store_calls_total", "Vector store operations", ["operation"])
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "spiceui_query_embedding_cache_lookups_total", "Query embedding cache lookups", ["result"]
+)
+EMBEDDING_MODEL_LOAD_SECONDS = Gauge(
+    "spiceui_embedding_model_load_seconds", "Time taken to load an embedding model", ["model"]
+)
+EMBEDDING_MODEL_RSS_BYTES = Gauge(
+    "spiceui_embedding_model_rss_bytes", "Resident memory added by loading an embedding model", ["model"]
+)
+
+# Timing record of the stage currently running in this task, if any
+_current_stage: ContextVar[Optional[Dict[str, Any]]] = ContextVar("spiceui_current_stage", default=None)
+
+
+def _new_stage_record(stage: str, started_at: float, queue_seconds: float) -> Dict[str, Any]:
+    return {
+        "stage": stage,
+        "started_at": started_at,
+        "ended_at": None,
+        "wall_ms": None,
+        "queue_ms": round(queue_seconds * 1000, 2),
+        "llm_calls": [],
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "prompt_bytes": 0,
+        "vector_store_calls": {},
+        "spans": {},
+    }
+
+
+def instrument_node(stage: str, fn: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+    """Wrap a LangGraph node so its timings land in Prometheus and state.metadata["timings"]."""
+
+    @functools.wraps(fn)
+    async def wrapper(state):
+        started_at = time.time()
+        timings = state.metadata.setdefault("timings", [])
+        # The state became ready when the previous stage ended (or when it was submitted)
+        ready_at = timings[-1]["ended_at"] if timings else state.metadata.get("submitted_at", started_at)
+        queue_seconds = max(0.0, started_at - ready_at)
+
+        record = _new_stage_record(stage, started_at, queue_seconds)
+        token = _current_stage.set(record)
+        start = time.perf_counter()
+        try:
+            result = await fn(state)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_stage.reset(token)
+            record["ended_at"] = time.time()
+            record["wall_ms"] = round(elapsed * 1000, 2)
+            STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+            STAGE_QUEUE_SECONDS.labels(stage=stage).observe(queue_seconds)
+            logger.info(f"Stage '{stage}' took {elapsed:.2f}s (queued {queue_seconds * 1000:.1f}ms)")
+
+        result_state = result if result is not None else state
+        result_state.metadata.setdefault("timings", timings).append(record)
+        if result_state.error:
+            STAGE_ERRORS.labels(stage=stage).inc()
+        return result_state
+
+    return wrapper
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a step inside the current stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_SECONDS.labels(span=name).observe(elapsed)
+        record = _current_stage.get()
+        if record is not None:
+            record["spans"][name] = round(record["spans"].get(name, 0.0) + elapsed * 1000, 2)
+
+
+def timed(name: str):
+    """Decorator form of span() for sync and async functions."""
+
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def sync_wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+def record_llm_call(agent: str,
+                    model: str,
+                    seconds: float,
+                    prompt_bytes: int,
+                    prompt_tokens: Optional[int] = None,
+                    completion_tokens: Optional[int] = None,
+                    cached: bool = False,
+                    queue_seconds: float = 0.0) -> None:
+    LLM_SECONDS.labels(agent=agent, model=model, cached=str(cached).lower()).observe(seconds)
+    LLM_PROMPT_BYTES.labels(agent=agent).observe(prompt_bytes)
+    if prompt_tokens:
+        LLM_TOKENS.labels(agent=agent, model=model, kind="prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(agent=agent, model=model, kind="completion").inc(completion_tokens)
+
+    record = _current_stage.get()
+    if record is not None:
+        record["llm_calls"].append({
+            "agent": agent,
+            "model": model,
+            "wall_ms": round(seconds * 1000, 2),
+            "queue_ms": round(queue_seconds * 1000, 2),
+            "prompt_bytes": prompt_bytes,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached": cached,
+        })
+        record["prompt_tokens"] += prompt_tokens or 0
+        record["completion_tokens"] += completion_tokens or 0
+        record["prompt_bytes"] += prompt_bytes
+
+
+def record_vector_store_call(operation: str) -> None:
+    VECTOR_STORE_CALLS.labels(operation=operation).inc()
+    record = _current_stage.get()
+    if record is not None:
+        calls = record["vector_store_calls"]
+        calls[operation] = calls.get(operation, 0) + 1
+
+
+def record_embedding_cache_lookups(hits: int, misses: int) -> None:
+    if hits:
+        EMBEDDING_CACHE_LOOKUPS.labels(result="hit").inc(hits)
+    if misses:
+        EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(misses)
+
+
+def record_embedding_model_load(model: str, seconds: float, rss_delta_bytes: Optional[int]) -> None:
+    EMBEDDING_MODEL_LOAD_SECONDS.labels(model=model).set(seconds)
+    # None where only the process peak RSS is known, which cannot be attributed to one load
+    if rss_delta_bytes is not None:
+        EMBEDDING_MODEL_RSS_BYTES.labels(model=model).set(rss_delta_bytes)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Prometheus exposition payload and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,186 @@
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """A unit of work tracked by the JobQueue."""
+
+    def __init__(self, payload: Dict[str, Any],
+                 handler: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None):
+        self.id = str(uuid.uuid4())
+        self.payload = payload
+        # Overrides the queue's handler, e.g. to stream the workflow instead of awaiting its result
+        self.handler = handler
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def _finish(self, status: JobStatus, result: Any = None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        # The payload may hold a large image; it is not needed once the job is done
+        self.payload = {}
+        self._done.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded in-process queue served by a fixed pool of asyncio workers."""
+
+    def __init__(self,
+                 handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 workers: int = 2,
+                 max_queue_size: int = 16,
+                 result_ttl_seconds: int = 3600):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        # Queued jobs not yet cancelled; capacity is checked against this, not the queue length,
+        # so a job cancelled while queued frees its slot at once
+        self._pending = 0
+        self._jobs: Dict[str, Job] = {}
+        self._worker_tasks = []
+
+    def _ensure_started(self) -> None:
+        # Workers are started on first use so they bind to the running event loop
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} job workers (queue size {self.max_queue_size})")
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        for job in self._jobs.values():
+            if job._task is not None and not job._task.done():
+                job._task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, payload: Dict[str, Any],
+               handler: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None) -> Job:
+        """Queue a job; raises QueueFullError when the queue is at capacity.
+
+        handler, if given, runs this job instead of the queue's handler.
+        """
+        self._ensure_started()
+        self._purge_expired()
+        if self._pending >= self.max_queue_size:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} pending jobs)")
+        job = Job(payload, handler)
+        self._queue.put_nowait(job)
+        self._pending += 1
+        self._jobs[job.id] = job
+        logger.info(f"Queued job {job.id} ({self._pending} pending)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it is unknown or already finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            # Still queued: free its slot now; the worker skips it when dequeued
+            self._pending -= 1
+            job._finish(JobStatus.CANCELLED)
+        logger.info(f"Cancelled job {job_id}")
+        return True
+
+    async def wait(self, job: Job) -> Job:
+        await job._done.wait()
+        return job
+
+    def pending(self) -> int:
+        return self._pending
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                self._pending -= 1
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                job._task = asyncio.create_task((job.handler or self.handler)(job.payload))
+                # wait() rather than await so cancelling the job does not cancel the worker
+                await asyncio.wait({job._task})
+
+                if job._task.cancelled():
+                    job._finish(JobStatus.CANCELLED)
+                elif job._task.exception() is not None:
+                    error = job._task.exception()
+                    logger.error(f"Job {job.id} failed: {str(error)}")
+                    job._finish(JobStatus.FAILED, error=str(error))
+                else:
+                    job._finish(JobStatus.SUCCEEDED, result=job._task.result())
+                logger.info(f"Job {job.id} {job.status.value} in {job.finished_at - job.started_at:.2f}s")
+            except asyncio.CancelledError:
+                if job._task is not None:
+                    job._task.cancel()
+                if not job.finished:
+                    job._finish(JobStatus.CANCELLED)
+                raise
+            finally:
+                self._queue.task_done()
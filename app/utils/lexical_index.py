@@ -0,0 +1,93 @@
+from typing import Any, Dict, Iterable, List, Tuple
+import math
+import re
+
+# Catalog fields the keyword index covers
+LEXICAL_FIELDS = ('component_name', 'synonyms', 'tags', 'when_to_use')
+# Name tokens are counted this many times, so "arrow" ranks ArrowIcon above icons merely tagged "arrow"
+NAME_WEIGHT = 2
+
+# Splits "ArrowDownIcon" / "arrow-down" / "ArrowDown2" into arrow, down, icon / arrow, down / arrow, down, 2
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with camelCase split and a light plural strip ("arrows" -> "arrow")."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text or ""):
+        token = token.lower()
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _field_values(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, str)]
+    return []
+
+
+def record_terms(metadata: Dict[str, Any], document: Any) -> List[str]:
+    """Index terms of a catalog record: its name, synonyms, tags and when_to_use.
+
+    Icons carry these in their stored metadata; components keep when_to_use
+    only in the document, so the document's metadata is used as a fallback.
+    """
+    sources = [metadata or {}]
+    if isinstance(document, dict):
+        sources.append(document)
+        if isinstance(document.get('metadata'), dict):
+            sources.append(document['metadata'])
+
+    terms = []
+    for field in LEXICAL_FIELDS:
+        values = next((_field_values(s[field]) for s in sources if s.get(field)), [])
+        weight = NAME_WEIGHT if field == 'component_name' else 1
+        for value in values:
+            terms.extend(tokenize(value) * weight)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents, held as in-memory posting lists."""
+
+    def __init__(self, documents: Dict[str, List[str]], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._ids = list(documents)
+        lengths = [len(terms) for terms in documents.values()]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+        # term -> [(document index, term frequency)]
+        postings: Dict[str, Dict[int, int]] = {}
+        for doc, terms in enumerate(documents.values()):
+            for term in terms:
+                counts = postings.setdefault(term, {})
+                counts[doc] = counts.get(doc, 0) + 1
+
+        n_docs = len(self._ids)
+        self._idf = {
+            term: math.log(1 + (n_docs - len(counts) + 0.5) / (len(counts) + 0.5))
+            for term, counts in postings.items()
+        }
+        # Length normalisation is per document, so fold it in once here
+        self._norms = [k1 * (1 - b + b * length / average_length) if average_length else k1 for length in lengths]
+        self._postings = {term: list(counts.items()) for term, counts in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, n_results: int) -> List[Tuple[str, float]]:
+        """Top n_results (id, score) for query, best first; documents sharing no term are omitted."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self._postings[term]:
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norms[doc])
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+        return [(self._ids[doc], score) for doc, score in ranked]
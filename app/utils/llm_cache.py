@@ -0,0 +1,185 @@
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "data/llm_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _normalize_image_url(url: str) -> str:
+    """Replace inline image data with a hash of its content so keys stay small."""
+    if url.startswith("data:"):
+        # data:image/png;base64,<payload> -> hash only the payload
+        payload = url.split(",", 1)[-1]
+        return f"sha256:{_hash_bytes(payload.encode())}"
+    return url
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                image_url = part.get("image_url", {})
+                url = image_url.get("url", "") if isinstance(image_url, dict) else str(image_url)
+                parts.append({"type": "image_url", "image_url": _normalize_image_url(url)})
+            else:
+                parts.append(_normalize_content(part))
+        return parts
+    if isinstance(content, dict):
+        return {k: _normalize_content(v) for k, v in sorted(content.items())}
+    return content
+
+
+def _normalize_messages(messages: List[Any]) -> List[Dict[str, Any]]:
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role"), message.get("content")
+        else:
+            # LangChain BaseMessage
+            role, content = getattr(message, "type", None), getattr(message, "content", None)
+        normalized.append({"role": role, "content": _normalize_content(content)})
+    return normalized
+
+
+def make_cache_key(model_name: str, temperature: Optional[float], messages: List[Any]) -> str:
+    """Content-addressed key: model + temperature + normalized messages (images by hash)."""
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "temperature": temperature,
+            "messages": _normalize_messages(messages),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return _hash_bytes(payload.encode())
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with LRU eviction and a TTL."""
+
+    def __init__(self,
+                 path: str = DEFAULT_CACHE_PATH,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.path = str(Path(path).absolute())
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_accessed ON llm_cache (last_accessed)")
+            self._conn = conn
+            logger.debug(f"Opened LLM response cache at {self.path}")
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                response, created_at = row
+                if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE llm_cache SET last_accessed = ? WHERE key = ?", (now, key))
+                return response
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache read failed: {str(e)}")
+            return None
+
+    def set(self, key: str, model_name: str, response: str) -> None:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model_name, response, now, now),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache write failed: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache delete failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM llm_cache")
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide cache configured from the environment, or None if disabled.
+
+    LLM_CACHE_ENABLED (default "true"), LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES
+    and LLM_CACHE_TTL_SECONDS control it.
+    """
+    global _default_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(
+                path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            )
+        return _default_cache
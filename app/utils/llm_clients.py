@@ -0,0 +1,231 @@
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessageChunk
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+import httpx
+import openai
+
+from app.utils.instrumentation import LLM_IN_FLIGHT, LLM_QUEUE_DEPTH, LLM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_CONCURRENCY_PER_MODEL = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_MAX_CONNECTIONS = 20
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class LLMClientPool:
+    """Shares one HTTP connection pool per model and limits concurrent LLM calls.
+
+    Concurrency is capped globally (LLM_MAX_CONCURRENCY) and per model
+    (LLM_MAX_CONCURRENCY_PER_MODEL). Rate limits and transient errors are retried
+    with jittered backoff that honours the provider's retry headers; a streamed
+    call is only retried if it failed before its first chunk.
+    """
+
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 max_concurrency_per_model: Optional[int] = None,
+                 max_retries: Optional[int] = None):
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        self.max_concurrency_per_model = max_concurrency_per_model or int(
+            os.getenv("LLM_MAX_CONCURRENCY_PER_MODEL", DEFAULT_MAX_CONCURRENCY_PER_MODEL)
+        )
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+        )
+        self._models: Dict[Tuple[str, float, bool], ChatOpenAI] = {}
+        self._http_clients: Dict[str, Tuple[httpx.Client, httpx.AsyncClient]] = {}
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _http_clients_for(self, model_name: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        clients = self._http_clients.get(model_name)
+        if clients is None:
+            limits = httpx.Limits(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+            )
+            timeout = httpx.Timeout(120.0, connect=10.0)
+            clients = (
+                httpx.Client(limits=limits, timeout=timeout),
+                httpx.AsyncClient(limits=limits, timeout=timeout),
+            )
+            self._http_clients[model_name] = clients
+        return clients
+
+    def get_chat_model(self, model_name: str, temperature: float = 0.1, streaming: bool = True) -> ChatOpenAI:
+        """Shared ChatOpenAI for this configuration, reusing the model's connection pool."""
+        key = (model_name, temperature, streaming)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                http_client, http_async_client = self._http_clients_for(model_name)
+                model = ChatOpenAI(
+                    model_name=model_name,
+                    temperature=temperature,
+                    streaming=streaming,
+                    stream_usage=True,
+                    # Retries are handled by invoke() so they respect the concurrency limits
+                    max_retries=0,
+                    http_client=http_client,
+                    http_async_client=http_async_client
+                )
+                self._models[key] = model
+                logger.debug(f"Created shared chat model {key}")
+            return model
+
+    def _model_semaphore(self, model_name: str) -> asyncio.Semaphore:
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._model_semaphores.get(model_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_model)
+            self._model_semaphores[model_name] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, model_name: str) -> AsyncIterator[float]:
+        """Hold a concurrency slot for model_name; yields the seconds spent waiting for it."""
+        model_semaphore = self._model_semaphore(model_name)
+        queue_depth = LLM_QUEUE_DEPTH.labels(model=model_name)
+        in_flight = LLM_IN_FLIGHT.labels(model=model_name)
+
+        start = time.perf_counter()
+        queue_depth.inc()
+        try:
+            await model_semaphore.acquire()
+            try:
+                await self._global_semaphore.acquire()
+            except BaseException:
+                model_semaphore.release()
+                raise
+        finally:
+            queue_depth.dec()
+        waited = time.perf_counter() - start
+
+        in_flight.inc()
+        try:
+            yield waited
+        finally:
+            in_flight.dec()
+            self._global_semaphore.release()
+            model_semaphore.release()
+
+    async def invoke(self, model: ChatOpenAI, model_name: str, messages: List[Any], **kwargs) -> Tuple[Any, float]:
+        """ainvoke (astream for streaming models) with concurrency limiting and retries.
+
+        Returns (response, seconds queued).
+        """
+        queued = 0.0
+        attempt = 0
+        while True:
+            async with self.slot(model_name) as waited:
+                queued += waited
+                progress = {"streamed": False}
+                try:
+                    return await self._call(model, messages, progress, **kwargs), queued
+                except (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                        openai.InternalServerError) as e:
+                    if _is_quota_error(e):
+                        # 429 for an exhausted quota or billing limit: waiting will not help
+                        logger.error(f"{model_name} quota exhausted, not retrying: {e}")
+                        raise
+                    if progress["streamed"]:
+                        # Tokens already reached stream consumers (SSE clients); a retry would repeat them
+                        logger.error(f"{type(e).__name__} from {model_name} mid-stream, not retrying")
+                        raise
+                    error = e
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._retry_delay(error, attempt)
+            attempt += 1
+            LLM_RETRIES.labels(model=model_name, reason=type(error).__name__).inc()
+            logger.warning(
+                f"{type(error).__name__} from {model_name}, retry {attempt}/{self.max_retries} in {delay:.2f}s"
+            )
+            # Sleep outside the slot so a backing-off call does not block others
+            await asyncio.sleep(delay)
+
+    async def _call(self, model: ChatOpenAI, messages: List[Any], progress: Dict[str, bool], **kwargs) -> Any:
+        """One attempt; streaming models are consumed chunk by chunk so progress shows whether any arrived."""
+        if not getattr(model, "streaming", False):
+            return await model.ainvoke(messages, **kwargs)
+        response = None
+        async for chunk in model.astream(messages, **kwargs):
+            progress["streamed"] = True
+            response = chunk if response is None else response + chunk
+        return response if response is not None else AIMessageChunk(content="")
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Provider-requested delay when available, else exponential backoff; both jittered."""
+        response = getattr(error, "response", None)
+        headers = response.headers if response is not None else {}
+        hinted = _header_delay(headers)
+        if hinted is not None:
+            return hinted + random.uniform(0, min(1.0, hinted * 0.1 + 0.1))
+        ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+def _is_quota_error(error: Exception) -> bool:
+    """Whether a RateLimitError reports an exhausted quota rather than a transient rate limit."""
+    if not isinstance(error, openai.RateLimitError):
+        return False
+    body = getattr(error, "body", None)
+    body_error = body.get("error", body) if isinstance(body, dict) else {}
+    if not isinstance(body_error, dict):
+        body_error = {}
+    return "insufficient_quota" in (getattr(error, "code", None), getattr(error, "type", None),
+                                    body_error.get("code"), body_error.get("type"))
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse OpenAI reset durations like '1s', '6m0s' or '250ms'."""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_delay(headers: Any) -> Optional[float]:
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    resets = [
+        _parse_duration(headers.get(name, ""))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(name)
+    ]
+    resets = [r for r in resets if r is not None]
+    if resets:
+        return min(max(resets), BACKOFF_MAX_SECONDS)
+    return None
+
+
+llm_client_pool = LLMClientPool()
+
+
+def get_chat_model(model_name: str, temperature: float = 0.1, streaming: bool = True) -> ChatOpenAI:
+    """Shortcut for llm_client_pool.get_chat_model."""
+    return llm_client_pool.get_chat_model(model_name, temperature=temperature, streaming=streaming)
@@ -0,0 +1,230 @@
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+from pathlib import Path
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from app.utils.catalog import PARTITIONS, CatalogRecord, partition_of
+from app.utils.embeddings import DEFAULT_EMBEDDING_MODEL
+from app.utils.instrumentation import record_vector_store_call
+from app.utils.vector_backend import CatalogVectorStore, file_version, matches_where
+
+logger = logging.getLogger(__name__)
+
+# Before partitioning the whole catalog was saved as one vectors.npy + records.json pair
+LEGACY_VECTORS_FILE = "vectors.npy"
+LEGACY_RECORDS_FILE = "records.json"
+
+
+class _Partition:
+    """Records of one partition plus their L2-normalised float32 embedding matrix."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.documents: List[Optional[str]] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.rows: Dict[str, int] = {}
+
+    def load(self, records: List[Dict[str, Any]], matrix: np.ndarray) -> None:
+        self.ids = [r['id'] for r in records]
+        self.metadatas = [r['metadata'] for r in records]
+        self.documents = [r['document'] for r in records]
+        self.matrix = matrix.astype(np.float32, copy=False)
+        self.rows = {record_id: row for row, record_id in enumerate(self.ids)}
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [
+            {'id': record_id, 'metadata': metadata, 'document': document}
+            for record_id, metadata, document in zip(self.ids, self.metadatas, self.documents)
+        ]
+
+    def write(self, ids: List[str], vectors: np.ndarray,
+              metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
+        if self.matrix.size == 0:
+            self.matrix = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        new_rows = []
+        for record_id, vector, metadata, document in zip(ids, vectors, metadatas, documents):
+            row = self.rows.get(record_id)
+            if row is None:
+                self.rows[record_id] = len(self.ids)
+                self.ids.append(record_id)
+                self.metadatas.append(metadata)
+                self.documents.append(document)
+                new_rows.append(vector)
+            else:
+                self.matrix[row] = vector
+                self.metadatas[row] = metadata
+                self.documents[row] = document
+        if new_rows:
+            self.matrix = np.vstack([self.matrix, np.stack(new_rows)])
+
+    def delete(self, ids: List[str]) -> bool:
+        drop = {self.rows[record_id] for record_id in ids if record_id in self.rows}
+        if not drop:
+            return False
+        keep = [row for row in range(len(self.ids)) if row not in drop]
+        self.ids = [self.ids[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        self.documents = [self.documents[row] for row in keep]
+        self.matrix = self.matrix[keep]
+        self.rows = {record_id: row for row, record_id in enumerate(self.ids)}
+        return True
+
+
+class NumpyVectorStore(CatalogVectorStore):
+    """Whole catalog in RAM as one L2-normalised float32 matrix per partition; a query is a single matmul.
+
+    The catalog is a few hundred components and icons, so exact brute-force
+    search is sub-millisecond and needs no ANN index. Each partition is saved
+    to persist_directory ({partition}.npy + {partition}.json) after every write,
+    and reloaded before the next read or write once another process saved it.
+    """
+
+    backend_name = "NumPy store"
+
+    def __init__(self, persist_directory: str = "data/numpy_store", embedding_model_name: str = DEFAULT_EMBEDDING_MODEL):
+        self.persist_directory = str(Path(persist_directory).absolute())
+        super().__init__(f"numpy:{self.persist_directory}", embedding_model_name)
+        self._lock = threading.RLock()
+        self._partitions = {partition: _Partition() for partition in PARTITIONS}
+        self._loaded_version: Optional[Hashable] = None
+        self._load()
+
+    def _paths(self, partition: str) -> Tuple[str, str]:
+        return (os.path.join(self.persist_directory, f"{partition}.npy"),
+                os.path.join(self.persist_directory, f"{partition}.json"))
+
+    def _load(self) -> None:
+        legacy_vectors = os.path.join(self.persist_directory, LEGACY_VECTORS_FILE)
+        legacy_records = os.path.join(self.persist_directory, LEGACY_RECORDS_FILE)
+        if os.path.exists(legacy_vectors) and os.path.exists(legacy_records):
+            self._migrate_partitions(legacy_vectors, legacy_records)
+            return
+
+        loaded = 0
+        self._loaded_version = self._catalog_version()
+        for partition in PARTITIONS:
+            state = self._partitions[partition] = _Partition()
+            vectors_path, records_path = self._paths(partition)
+            if not (os.path.exists(vectors_path) and os.path.exists(records_path)):
+                continue
+            with open(records_path, 'r') as f:
+                state.load(json.load(f), np.load(vectors_path))
+            loaded += len(state.ids)
+        logger.info(f"Loaded {loaded} records into the NumPy store from {self.persist_directory}")
+
+    def _reload_if_changed(self) -> None:
+        # Called with the lock held; picks up partitions saved by another process
+        if self._catalog_version() != self._loaded_version:
+            self._load()
+
+    def _migrate_partitions(self, legacy_vectors: str, legacy_records: str) -> None:
+        """Split a store saved before partitioning into one file pair per partition."""
+        with open(legacy_records, 'r') as f:
+            records = json.load(f)
+        matrix = np.load(legacy_vectors)
+        rows_by_partition: Dict[str, List[int]] = {partition: [] for partition in PARTITIONS}
+        for row, record in enumerate(records):
+            rows_by_partition[partition_of(record['metadata'])].append(row)
+        for partition, rows in rows_by_partition.items():
+            self._partitions[partition].load([records[row] for row in rows], matrix[rows])
+            self._save(partition)
+        os.remove(legacy_vectors)
+        os.remove(legacy_records)
+        logger.info(f"Migrated {len(records)} records in {self.persist_directory} to partitioned files")
+
+    def _save(self, partition: str) -> None:
+        os.makedirs(self.persist_directory, exist_ok=True)
+        state = self._partitions[partition]
+        vectors_path, records_path = self._paths(partition)
+        # Write to temporary files and rename so a crash never leaves a half-written store
+        with open(f"{vectors_path}.tmp", 'wb') as f:
+            np.save(f, state.matrix)
+        with open(f"{records_path}.tmp", 'w') as f:
+            json.dump(state.records(), f)
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{records_path}.tmp", records_path)
+        self._loaded_version = self._catalog_version()
+
+    def _catalog_version(self) -> Optional[Hashable]:
+        # The records file of each partition is replaced on every save
+        return file_version(*(self._paths(partition)[1] for partition in PARTITIONS))
+
+    @staticmethod
+    def _normalize(vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _write(self, partition: str, ids: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
+        vectors = self._normalize(embeddings)
+        with self._lock:
+            self._reload_if_changed()
+            self._partitions[partition].write(ids, vectors, metadatas, documents)
+            self._save(partition)
+
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        with self._lock:
+            self._reload_if_changed()
+            return {record_id for record_id in ids
+                    if any(record_id in state.rows for state in self._partitions.values())}
+
+    def _delete(self, ids: List[str]) -> None:
+        with self._lock:
+            self._reload_if_changed()
+            for partition, state in self._partitions.items():
+                if state.delete(ids):
+                    self._save(partition)
+
+    def _fetch_records(self, ids: Optional[List[str]] = None) -> List[CatalogRecord]:
+        record_vector_store_call("get")
+        with self._lock:
+            self._reload_if_changed()
+            records = []
+            for state in self._partitions.values():
+                rows = range(len(state.ids)) if ids is None else [state.rows[i] for i in ids if i in state.rows]
+                records.extend(
+                    CatalogRecord.from_stored(state.ids[row], state.metadatas[row], state.documents[row]) for row in rows
+                )
+            return records
+
+    def _nearest(self, partition: str, embeddings: List[List[float]], n_results: int,
+                 where: Optional[Dict[str, Any]]) -> Tuple[List[List[str]], List[List[float]]]:
+        queries = self._normalize(embeddings)
+        with self._lock:
+            self._reload_if_changed()
+            state = self._partitions[partition]
+            if not state.ids:
+                return [[] for _ in queries], [[] for _ in queries]
+            if where:
+                candidates = np.array([row for row, metadata in enumerate(state.metadatas) if matches_where(metadata, where)],
+                                      dtype=np.int64)
+            else:
+                candidates = np.arange(len(state.ids))
+            if candidates.size == 0:
+                return [[] for _ in queries], [[] for _ in queries]
+            ids = state.ids
+            # Cosine similarity of every query with every candidate in one matmul
+            similarities = queries @ state.matrix[candidates].T
+
+        k = min(n_results, candidates.size)
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        result_ids, result_distances = [], []
+        for q in range(len(queries)):
+            order = top[q][np.argsort(-similarities[q, top[q]])]
+            result_ids.append([ids[candidates[i]] for i in order])
+            result_distances.append([float(1.0 - similarities[q, i]) for i in order])
+        return result_ids, result_distances
+
+    def _clear(self) -> None:
+        with self._lock:
+            for partition in PARTITIONS:
+                self._partitions[partition] = _Partition()
+                self._save(partition)
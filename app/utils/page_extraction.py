@@ -0,0 +1,253 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+import re
+
+try:
+    from lxml import etree, html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Page parsers ComponentScraper can use (SCRAPER_EXTRACTOR):
+#   lxml  one pass over an lxml tree per page (default when lxml is installed)
+#   soup  the BeautifulSoup _extract_* methods, one tree search per field
+EXTRACTORS = ("lxml", "soup")
+# Tree builder of the soup extractors. Parsers repair invalid nesting differently
+# (html.parser keeps a <div> inside a <p>, libxml2 closes the <p>), so with lxml
+# installed both extractors read the same tree.
+SOUP_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+
+# Component metadata fields the extractors fill, in output order
+METADATA_FIELDS = ("description", "props", "examples", "category", "tags",
+                   "when_to_use", "when_not_to_use", "import_statement")
+
+# The same patterns the BeautifulSoup extractors search for
+_PROPS_RE = re.compile(r'Props', re.IGNORECASE)
+_WHEN_TO_USE_RE = re.compile(r'When to use', re.IGNORECASE)
+_WHEN_NOT_TO_USE_RE = re.compile(r'When not to use', re.IGNORECASE)
+_IMPORT_RE = re.compile(r'Import', re.IGNORECASE)
+_CATEGORY_CLASS_RE = re.compile(r'category|type')
+_TAGS_CLASS_RE = re.compile(r'tags|keywords')
+_CODE_BLOCK_CLASS_RE = re.compile(r'shiki')
+_EXAMPLE_HEADINGS = frozenset({'h2', 'h3', 'h4'})
+
+# Element text BeautifulSoup's get_text() leaves out; string searches still see it
+_NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+_WALK_EVENTS = ('start', 'end', 'comment', 'pi')
+
+
+def _strings(element) -> Iterator[str]:
+    if element.text and element.tag not in _NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        # Comments and processing instructions have a callable tag; only their tail is text
+        if isinstance(child.tag, str):
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _text(element) -> str:
+    """Same as BeautifulSoup's element.text."""
+    return ''.join(_strings(element))
+
+
+def _stripped_text(element) -> str:
+    """Same as BeautifulSoup's element.get_text(strip=True)."""
+    return ''.join(s.strip() for s in _strings(element))
+
+
+def _parse(page_html: str):
+    return lxml_html.document_fromstring(page_html)
+
+
+class _UsagePageWalk:
+    """State of the single walk over a usage page.
+
+    Fields the BeautifulSoup extractors find with soup.find(string=...) followed by
+    find_next(tag) are resolved the same way here: the first string matching the
+    pattern arms a lookup, and the next element with that tag in document order
+    satisfies it.
+    """
+
+    def __init__(self):
+        self.h1 = None
+        self.description = None
+        self.nav = None
+        self.in_nav = False
+        self.category = None
+        self.tag_containers: List[Any] = []
+        # find_next lookups: armed once their string is seen, then the first matching element
+        self.props_seen = False
+        self.props_table = None
+        self.when_to_use_seen = False
+        self.when_to_use_list = None
+        self.when_not_to_use_seen = False
+        self.when_not_to_use_list = None
+        self.import_seen = False
+        self.import_pre = None
+        self.import_code = None
+
+    def string(self, text: Optional[str]) -> None:
+        if not text:
+            return
+        if not self.props_seen and _PROPS_RE.search(text):
+            self.props_seen = True
+        if not self.when_to_use_seen and _WHEN_TO_USE_RE.search(text):
+            self.when_to_use_seen = True
+        if not self.when_not_to_use_seen and _WHEN_NOT_TO_USE_RE.search(text):
+            self.when_not_to_use_seen = True
+        if not self.import_seen and _IMPORT_RE.search(text):
+            self.import_seen = True
+
+    def start(self, element) -> None:
+        tag = element.tag
+        # Satisfy lookups armed by earlier strings before this element's own text arms new ones
+        if tag == 'p':
+            if self.h1 is not None and self.description is None:
+                self.description = element
+        elif tag == 'table':
+            if self.props_seen and self.props_table is None:
+                self.props_table = element
+        elif tag == 'ul':
+            if self.when_to_use_seen and self.when_to_use_list is None:
+                self.when_to_use_list = element
+            if self.when_not_to_use_seen and self.when_not_to_use_list is None:
+                self.when_not_to_use_list = element
+        elif tag == 'pre':
+            if self.import_seen and self.import_pre is None:
+                self.import_pre = element
+        elif tag == 'code':
+            if self.import_seen and self.import_code is None:
+                self.import_code = element
+        elif tag == 'h1':
+            if self.h1 is None:
+                self.h1 = element
+        elif tag == 'nav':
+            if self.nav is None:
+                self.nav = element
+                self.in_nav = True
+        elif tag == 'a':
+            if self.in_nav and self.category is None and _CATEGORY_CLASS_RE.search(element.get('class') or ''):
+                self.category = element
+
+        if tag in ('div', 'span') and _TAGS_CLASS_RE.search(element.get('class') or ''):
+            self.tag_containers.append(element)
+        self.string(element.text)
+
+    def end(self, element) -> None:
+        if element is self.nav:
+            self.in_nav = False
+        self.string(element.tail)
+
+
+def _props_from_table(table) -> List[Dict[str, Any]]:
+    props = []
+    for row in list(table.iterdescendants('tr'))[1:]:  # Skip header row
+        cells = list(row.iterdescendants('td', 'th'))
+        if len(cells) >= 3:
+            name = _text(cells[0])
+            props.append({
+                'name': name.strip(),
+                'type': _text(cells[1]).strip(),
+                'description': _text(cells[2]).strip(),
+                'required': 'required' in name.lower(),
+                'default': _text(cells[3]).strip() if len(cells) > 3 else None
+            })
+    return props
+
+
+def _list_items(element) -> List[str]:
+    return [_text(item).strip() for item in element.iterdescendants('li')] if element is not None else []
+
+
+def extract_usage_page(page_html: str, component_name_from_heading: Callable[[str], str]) -> Dict[str, Any]:
+    """Every usage page field from one walk over the page.
+
+    Produces what ComponentScraper's _extract_description, _extract_props,
+    _extract_category, _extract_tags, _extract_when_to_use,
+    _extract_when_not_to_use and _extract_import_statement return for the page.
+
+    Args:
+        page_html: Rendered usage page
+        component_name_from_heading: Maps the h1 text to the component name added to the tags
+            (ComponentScraper._extract_component_name)
+    """
+    walk = _UsagePageWalk()
+    for event, element in etree.iterwalk(_parse(page_html), events=_WALK_EVENTS):
+        if event == 'start':
+            walk.start(element)
+        elif event == 'end':
+            walk.end(element)
+        else:
+            # Comment and processing instruction text is still a string to soup.find
+            walk.string(element.text)
+            walk.string(element.tail)
+
+    tags: List[str] = []
+    if walk.h1 is not None:
+        tag_set = set()
+        for container in walk.tag_containers:
+            tag_set.update(_text(tag).strip().lower() for tag in container.iterdescendants('span', 'a'))
+        tag_set.add(component_name_from_heading(_text(walk.h1)).lower())
+        tags = sorted(tag_set)
+
+    import_block = walk.import_pre if walk.import_pre is not None else walk.import_code
+    fields = {
+        "description": _text(walk.description).strip() if walk.description is not None else "",
+        "props": _props_from_table(walk.props_table) if walk.props_table is not None else [],
+        "category": _text(walk.category).strip() if walk.category is not None else "Components",
+        "tags": tags,
+        "when_to_use": _list_items(walk.when_to_use_list),
+        "when_not_to_use": _list_items(walk.when_not_to_use_list),
+        "import_statement": _text(import_block).strip() if import_block is not None else "",
+    }
+    logger.debug(f"Extracted {len(fields['props'])} props and {len(tags)} tags in one pass")
+    return fields
+
+
+def extract_examples_page(page_html: str) -> List[Dict[str, str]]:
+    """The examples ComponentScraper._extract_examples returns, from one walk over the page.
+
+    Each pre.shiki block is titled by the first h2/h3/h4 of its nearest ancestor
+    that contains one. The walk records, for every element, its first such heading,
+    so finding a block's title no longer searches each ancestor's subtree.
+    """
+    first_heading: Dict[Any, Any] = {}
+    open_elements: List[Any] = []
+    code_blocks = []
+    for event, element in etree.iterwalk(_parse(page_html), events=('start', 'end')):
+        if event == 'end':
+            open_elements.pop()
+            continue
+        tag = element.tag
+        if tag in _EXAMPLE_HEADINGS:
+            # Once an ancestor has a first heading, so have all of its ancestors
+            for ancestor in reversed(open_elements):
+                if ancestor in first_heading:
+                    break
+                first_heading[ancestor] = element
+        elif tag == 'pre' and _CODE_BLOCK_CLASS_RE.search(element.get('class') or ''):
+            # A heading later in an enclosing container can still title the block,
+            # so resolve it after the walk; keep the ancestors, nearest first
+            code_blocks.append((element, open_elements[::-1]))
+        open_elements.append(element)
+
+    examples = []
+    for i, (code_block, ancestors) in enumerate(code_blocks):
+        heading = next((first_heading[a] for a in ancestors if a in first_heading), None)
+        desc = ""
+        if heading is not None:
+            desc_elem = next(heading.itersiblings('p'), None)
+            if desc_elem is not None:
+                desc = _stripped_text(desc_elem)
+        code_elem = code_block.find('.//code')
+        examples.append({
+            'title': _stripped_text(heading) if heading is not None else f"Example {i + 1}",
+            'description': desc,
+            'jsx': _stripped_text(code_elem if code_elem is not None else code_block)
+        })
+    logger.debug(f"Extracted {len(examples)} examples in one pass")
+    return examples
@@ -0,0 +1,198 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 12000
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken's o200k_base encoding, loaded on first use, or None if unavailable.
+
+    tiktoken downloads the encoding the first time it is used on a machine
+    (cached under TIKTOKEN_CACHE_DIR), so it is not loaded at import time.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:  # tiktoken missing or its encoding files unavailable
+                    logger.warning(f"tiktoken unavailable, estimating prompt tokens from length: {str(e)}")
+                _encoding_loaded = True
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of text (tiktoken when available, ~4 chars/token otherwise)."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def compact_json(obj: Any) -> str:
+    """JSON without insignificant whitespace."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+# Detail levels, from most to least verbose. The serializer steps down until the
+# context fits the token budget.
+_DETAIL_LEVELS = (
+    {"when_to_use": True, "prop_descriptions": True, "descriptions": True, "prop_defaults": True},
+    {"when_to_use": False, "prop_descriptions": True, "descriptions": True, "prop_defaults": True},
+    {"when_to_use": False, "prop_descriptions": False, "descriptions": True, "prop_defaults": True},
+    {"when_to_use": False, "prop_descriptions": False, "descriptions": False, "prop_defaults": True},
+    {"when_to_use": False, "prop_descriptions": False, "descriptions": False, "prop_defaults": False},
+)
+
+
+class CompactPromptSerializer:
+    """Serializes the code generation context compactly and within a token budget.
+
+    - The component tree is emitted without whitespace or empty fields.
+    - Library components keep only the props the tree uses plus required props.
+    - Icons that share a props schema list that schema once.
+
+    If the lowest detail level is still over budget, library components the
+    tree does not use are dropped, then the remaining components and icons
+    from the end. The component tree and theme are the spec being generated
+    and are never trimmed; a context still over budget is sent with a warning.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None):
+        if token_budget is None:
+            token_budget = int(os.getenv("PROMPT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+        self.token_budget = token_budget
+
+    def serialize(self,
+                  components: List[Dict[str, Any]],
+                  detailed_components: List[Dict[str, Any]],
+                  detailed_icons: List[Dict[str, Any]],
+                  theme: Dict[str, Any]) -> Dict[str, str]:
+        """Return the prompt sections: components, detailed_components, detailed_icons, theme."""
+        referenced = self._referenced_props(components)
+        tree = self._compact_tree(components)
+        theme = theme or {}
+
+        for level, detail in enumerate(_DETAIL_LEVELS):
+            sections, tokens = self._sections(tree, detailed_components, detailed_icons, theme, referenced, detail)
+            if tokens <= self.token_budget:
+                logger.debug(f"Prompt context: {tokens} tokens at detail level {level}")
+                return sections
+
+        # Over budget at the lowest detail level: drop library components no tree node uses first.
+        # Icons are all looked up from the tree's Icon nodes (possibly by synonym), so none is unused.
+        detail = _DETAIL_LEVELS[-1]
+        library = [c for c in detailed_components if (c.get("name") or "").lower() in referenced]
+        icons = list(detailed_icons)
+        sections, tokens = self._sections(tree, library, icons, theme, referenced, detail)
+        dropped = len(detailed_components) - len(library)
+
+        # Then the remaining entries from the end, the longer list first
+        while tokens > self.token_budget and (library or icons):
+            (library if len(library) >= len(icons) else icons).pop()
+            dropped += 1
+            sections, tokens = self._sections(tree, library, icons, theme, referenced, detail)
+
+        if tokens > self.token_budget:
+            logger.warning(
+                f"Prompt context over the budget of {self.token_budget} tokens with all library and icon "
+                f"detail trimmed ({dropped} components/icons dropped); sending {tokens} tokens"
+            )
+        else:
+            logger.warning(
+                f"Prompt context over the budget of {self.token_budget} tokens at the lowest detail level: "
+                f"dropped {dropped} components/icons, now {tokens} tokens"
+            )
+        return sections
+
+    def _sections(self,
+                  tree: List[Dict[str, Any]],
+                  detailed_components: List[Dict[str, Any]],
+                  detailed_icons: List[Dict[str, Any]],
+                  theme: Dict[str, Any],
+                  referenced: Dict[str, Set[str]],
+                  detail: Dict[str, bool]) -> Tuple[Dict[str, str], int]:
+        sections = {
+            "components": compact_json(tree),
+            "detailed_components": compact_json(
+                [self._compact_component(c, referenced.get((c.get("name") or "").lower(), set()), detail)
+                 for c in detailed_components]
+            ),
+            "detailed_icons": compact_json(self._compact_icons(detailed_icons, detail)),
+            "theme": compact_json(theme),
+        }
+        return sections, sum(estimate_tokens(text) for text in sections.values())
+
+    def _referenced_props(self, components: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+        """Prop names used by tree nodes, per lowercased component type."""
+        referenced: Dict[str, Set[str]] = {}
+
+        def collect(nodes):
+            for node in nodes:
+                names = referenced.setdefault((node.get("type") or "").lower(), set())
+                names.update((node.get("props") or {}).keys())
+                names.update((node.get("layoutProps") or {}).keys())
+                if node.get("children"):
+                    collect(node["children"])
+
+        collect(components)
+        return referenced
+
+    def _compact_tree(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        compacted = []
+        for node in nodes:
+            out = {k: v for k, v in node.items() if k != "children" and v not in (None, {}, [], "")}
+            if node.get("children"):
+                out["children"] = self._compact_tree(node["children"])
+            compacted.append(out)
+        return compacted
+
+    def _compact_prop(self, prop: Dict[str, Any], detail: Dict[str, bool]) -> Dict[str, Any]:
+        out = {"type": prop.get("type", "any")}
+        if prop.get("required"):
+            out["required"] = True
+        if detail["prop_defaults"] and prop.get("default") not in (None, ""):
+            out["default"] = prop["default"]
+        if detail["prop_descriptions"] and prop.get("description"):
+            out["description"] = prop["description"]
+        return out
+
+    def _compact_component(self,
+                           component: Dict[str, Any],
+                           referenced: Set[str],
+                           detail: Dict[str, bool]) -> Dict[str, Any]:
+        out = {"name": component.get("name"), "import": component.get("import_statement", "")}
+        if detail["descriptions"] and component.get("description"):
+            out["description"] = component["description"]
+        if detail["when_to_use"] and component.get("when_to_use"):
+            out["when_to_use"] = component["when_to_use"]
+
+        props = {
+            p["name"]: self._compact_prop(p, detail)
+            for p in component.get("props", [])
+            if p.get("name") and (p["name"] in referenced or p.get("required"))
+        }
+        if props:
+            out["props"] = props
+        return out
+
+    def _compact_icons(self, icons: List[Dict[str, Any]], detail: Dict[str, bool]) -> List[Dict[str, Any]]:
+        """Group icons by props schema so each distinct schema is emitted once."""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for icon in icons:
+            schema = {p["name"]: self._compact_prop(p, detail) for p in icon.get("props", []) if p.get("name")}
+            key = compact_json(schema)
+            group = groups.setdefault(key, {"props": schema, "icons": []})
+            group["icons"].append({"name": icon.get("name"), "import": icon.get("import_statement", "")})
+        return list(groups.values())
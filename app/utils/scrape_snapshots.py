@@ -0,0 +1,137 @@
+from typing import List, NamedTuple, Optional
+from pathlib import Path
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = "data/scrape_snapshots"
+# Versions kept per URL; older ones are dropped when a newer one is recorded
+DEFAULT_KEEP_PER_URL = 5
+
+# How ComponentScraper uses snapshots (SCRAPER_SNAPSHOT_MODE):
+#   off     always fetch live, store nothing (default)
+#   record  always fetch live and store every page
+#   cache   use a snapshot younger than the max age, otherwise fetch live and store it
+#   replay  only read snapshots, never start a browser; a missing page is an error
+SNAPSHOT_MODES = ("off", "record", "cache", "replay")
+
+
+class SnapshotMissingError(LookupError):
+    """Replay mode asked for a page that has no stored snapshot."""
+
+
+class Snapshot(NamedTuple):
+    url: str
+    fetched_at: float
+    sha256: str
+    html: str
+
+
+class SnapshotStore:
+    """Content-addressed store of rendered page HTML, indexed by URL and fetch time.
+
+    Each distinct page body is written once, gzipped, to objects/<sha[:2]>/<sha>.html.gz;
+    a SQLite index records which body every URL returned at every fetch.
+    """
+
+    def __init__(self, directory: str = DEFAULT_SNAPSHOT_DIR, keep_per_url: int = DEFAULT_KEEP_PER_URL):
+        self.directory = str(Path(directory).absolute())
+        self.keep_per_url = keep_per_url
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"),
+                                   check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " url TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " sha256 TEXT NOT NULL,"
+                " PRIMARY KEY (url, fetched_at))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS snapshots_sha256 ON snapshots (sha256)")
+            self._conn = conn
+            logger.debug(f"Opened scrape snapshot store at {self.directory}")
+        return self._conn
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, "objects", sha256[:2], f"{sha256}.html.gz")
+
+    def put(self, url: str, html: str, fetched_at: Optional[float] = None) -> str:
+        """Record that url rendered as html; returns the content hash."""
+        data = html.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha256)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write then rename so a crash never leaves a truncated object
+                with gzip.open(f"{path}.tmp", "wb") as f:
+                    f.write(data)
+                os.replace(f"{path}.tmp", path)
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (url, fetched_at, sha256) VALUES (?, ?, ?)",
+                (url, fetched_at or time.time(), sha256),
+            )
+            self._trim(conn, url)
+        return sha256
+
+    def _trim(self, conn: sqlite3.Connection, url: str) -> None:
+        old = conn.execute(
+            "SELECT fetched_at, sha256 FROM snapshots WHERE url = ? ORDER BY fetched_at DESC LIMIT -1 OFFSET ?",
+            (url, self.keep_per_url),
+        ).fetchall()
+        for fetched_at, sha256 in old:
+            conn.execute("DELETE FROM snapshots WHERE url = ? AND fetched_at = ?", (url, fetched_at))
+            # Bodies are shared between URLs and fetches; delete only unreferenced ones
+            if conn.execute("SELECT 1 FROM snapshots WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone() is None:
+                try:
+                    os.remove(self._object_path(sha256))
+                except FileNotFoundError:
+                    pass
+
+    def get(self, url: str, max_age_seconds: Optional[float] = None, as_of: Optional[float] = None) -> Optional[Snapshot]:
+        """Latest snapshot of url, or None.
+
+        Args:
+            max_age_seconds: Ignore snapshots older than this (None: any age, 0: always refetch)
+            as_of: Only consider snapshots taken at or before this timestamp, to replay a past scrape
+        """
+        query = "SELECT fetched_at, sha256 FROM snapshots WHERE url = ?"
+        params: List = [url]
+        if as_of is not None:
+            query += " AND fetched_at <= ?"
+            params.append(as_of)
+        if max_age_seconds is not None:
+            query += " AND fetched_at >= ?"
+            params.append((as_of if as_of is not None else time.time()) - max_age_seconds)
+        query += " ORDER BY fetched_at DESC LIMIT 1"
+
+        with self._lock:
+            row = self._connection().execute(query, params).fetchone()
+        if row is None:
+            return None
+        fetched_at, sha256 = row
+        try:
+            with gzip.open(self._object_path(sha256), "rb") as f:
+                html = f.read().decode("utf-8")
+        except FileNotFoundError:
+            logger.warning(f"Snapshot object {sha256} for {url} is missing")
+            return None
+        return Snapshot(url, fetched_at, sha256, html)
+
+    def urls(self) -> List[str]:
+        """Every URL with at least one snapshot."""
+        with self._lock:
+            return [row[0] for row in self._connection().execute("SELECT DISTINCT url FROM snapshots ORDER BY url")]
@@ -1,6 +1,9 @@
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
 from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional, List
+from contextlib import asynccontextmanager, suppress
+from typing import Dict, Any, AsyncIterator, Optional, List
+import asyncio
+import os
 import re
 import json
 from urllib.parse import urljoin, urlparse
@@ -8,6 +11,10 @@ import logging
 import sys
 from datetime import datetime
 
+from app.utils.page_extraction import (EXTRACTORS, LXML_AVAILABLE, METADATA_FIELDS, SOUP_PARSER, extract_examples_page,
+                                      extract_usage_page)
+from app.utils.scrape_snapshots import DEFAULT_SNAPSHOT_DIR, SNAPSHOT_MODES, SnapshotMissingError, SnapshotStore
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,83 +27,348 @@ logging.basicConfig(
 
 logger = logging.getLogger('ComponentScraper')
 
+# Components scraped at once by scrape_many; each uses two pages (usage + examples)
+DEFAULT_SCRAPE_CONCURRENCY = 4
+# Load state page.goto waits for (SCRAPER_WAIT_UNTIL). "load" has run the page's scripts;
+# "networkidle" additionally waits for 500 ms without requests, which analytics often delay.
+DEFAULT_WAIT_UNTIL = "load"
+WAIT_UNTIL_STATES = ("domcontentloaded", "load", "networkidle")
+# Upper bounds for the selector waits that replace fixed sleeps
+PAGE_READY_TIMEOUT_MS = 15000
+SHOW_CODE_TIMEOUT_MS = 10000
+
+# Request types the _extract_* methods never need, aborted when resource blocking is on
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+# Every "Show code" switch input on the page (a JS expression)
+_SHOW_CODE_INPUTS = """[...document.querySelectorAll('label.saltSwitch')]
+        .filter(label => (label.querySelector('.saltSwitch-label')?.textContent || '').toLowerCase().includes('show code'))
+        .map(label => label.querySelector('input[type="checkbox"]'))
+        .filter(input => input)"""
+
+# React stores its props on the DOM nodes it has hydrated. A click before that
+# only flips the native checkbox, so the code block never renders.
+_SHOW_CODE_HYDRATED_JS = f"""
+() => {_SHOW_CODE_INPUTS}.every(input => Object.keys(input).some(key => key.startsWith('__reactProps$')))
+"""
+
+# Turns on every unchecked "Show code" switch in one round trip.
+# Returns [switches clicked, pre.shiki blocks present before clicking].
+_CLICK_SHOW_CODE_JS = f"""
+() => {{
+    const inputs = {_SHOW_CODE_INPUTS}.filter(input => !input.checked);
+    const before = document.querySelectorAll('pre.shiki').length;
+    inputs.forEach(input => input.click());
+    return [inputs.length, before];
+}}
+"""
+
+# Switches on again every "Show code" switch whose example has no pre.shiki block,
+# whether or not its checkbox reads checked. Returns the number of switches retried.
+_RECLICK_MISSING_CODE_JS = f"""
+() => {{
+    const inputs = {_SHOW_CODE_INPUTS};
+    const missing = inputs.filter(input => {{
+        // The example of a switch is its outermost ancestor holding no other switch
+        let example = input;
+        while (example.parentElement && inputs.filter(other => example.parentElement.contains(other)).length === 1) {{
+            example = example.parentElement;
+        }}
+        return !example.querySelector('pre.shiki');
+    }});
+    // A lost click leaves the checkbox checked while React's state is off: switch it off, then on
+    missing.forEach(input => {{
+        if (input.checked) input.click();
+        input.click();
+    }});
+    return missing.length;
+}}
+"""
+
+
 class ComponentScraper:
-    def __init__(self):
+    """Scrapes Salt component docs with one long-lived headless browser.
+
+    The browser is started by __aenter__ (or lazily by the first scrape) and
+    shared by every scrape; pages come from a bounded pool and are reused.
+    The usage and examples pages of a component are loaded concurrently.
+
+    With block_resources (or SCRAPER_BLOCK_RESOURCES=true) image, font and
+    media requests and requests to other sites are aborted. Hosts in
+    allowed_hosts (SCRAPER_ALLOWED_HOSTS, comma-separated) and their
+    subdomains are never blocked.
+
+    snapshot_mode (SCRAPER_SNAPSHOT_MODE) stores rendered pages in a
+    SnapshotStore and reads them back; see scrape_snapshots.SNAPSHOT_MODES.
+    In replay mode no browser is started and the parsers run on stored HTML.
+
+    extractor (SCRAPER_EXTRACTOR) picks the page parser: "lxml" walks each
+    page once (page_extraction); "soup" runs the BeautifulSoup _extract_*
+    methods, which are also the fallback when lxml is not installed.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, headless: bool = True, slow_mo: float = 0,
+                 block_resources: Optional[bool] = None, allowed_hosts: Optional[List[str]] = None,
+                 snapshot_mode: Optional[str] = None, snapshots: Optional[SnapshotStore] = None,
+                 snapshot_max_age_seconds: Optional[float] = None, replay_as_of: Optional[float] = None,
+                 extractor: Optional[str] = None):
         self.base_url = "https://www.saltdesignsystem.com"
+        self.concurrency = concurrency or int(os.getenv("SCRAPER_CONCURRENCY", DEFAULT_SCRAPE_CONCURRENCY))
+        # Every in-flight component holds a usage page and an examples page
+        self.max_pages = 2 * self.concurrency
+        self.headless = headless
+        self.slow_mo = slow_mo
+        if block_resources is None:
+            block_resources = os.getenv("SCRAPER_BLOCK_RESOURCES", "false").lower() in ("1", "true", "yes")
+        self.block_resources = block_resources
+        if allowed_hosts is None:
+            allowed_hosts = [h.strip() for h in os.getenv("SCRAPER_ALLOWED_HOSTS", "").split(",") if h.strip()]
+        self.allowed_hosts = [h.lower() for h in allowed_hosts]
+        # First-party requests are the docs site and its subdomains
+        self.site_domain = urlparse(self.base_url).hostname.removeprefix("www.")
+        self.blocked_requests = 0
+        self.wait_until = os.getenv("SCRAPER_WAIT_UNTIL", DEFAULT_WAIT_UNTIL)
+        if self.wait_until not in WAIT_UNTIL_STATES:
+            raise ValueError(f"Unknown SCRAPER_WAIT_UNTIL '{self.wait_until}'. Available: {', '.join(WAIT_UNTIL_STATES)}")
+        self.snapshot_mode = snapshot_mode or os.getenv("SCRAPER_SNAPSHOT_MODE", "off")
+        if self.snapshot_mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown SCRAPER_SNAPSHOT_MODE '{self.snapshot_mode}'. Available: {', '.join(SNAPSHOT_MODES)}")
+        self.snapshots = snapshots
+        if self.snapshots is None and self.snapshot_mode != "off":
+            self.snapshots = SnapshotStore(os.getenv("SCRAPER_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR))
+        # Freshness policy: cache mode refetches pages whose snapshot is older than this (None: any age)
+        if snapshot_max_age_seconds is None and os.getenv("SCRAPER_SNAPSHOT_MAX_AGE_SECONDS"):
+            snapshot_max_age_seconds = float(os.getenv("SCRAPER_SNAPSHOT_MAX_AGE_SECONDS"))
+        self.snapshot_max_age_seconds = snapshot_max_age_seconds
+        # Replay the snapshots taken at or before this timestamp instead of the latest ones
+        self.replay_as_of = replay_as_of
+        self.extractor = extractor or os.getenv("SCRAPER_EXTRACTOR", "lxml")
+        if self.extractor not in EXTRACTORS:
+            raise ValueError(f"Unknown SCRAPER_EXTRACTOR '{self.extractor}'. Available: {', '.join(EXTRACTORS)}")
+        if self.extractor == "lxml" and not LXML_AVAILABLE:
+            logger.warning("lxml is not installed, parsing pages with BeautifulSoup")
+            self.extractor = "soup"
         self.playwright = None
+        self.browser = None
+        self.context = None
+        self._idle_pages: Optional[asyncio.Queue] = None
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
         logger.info("Initialized ComponentScraper")
-    
+
     async def __aenter__(self):
-        logger.info("Starting Playwright")
-        self.playwright = await async_playwright().start()
+        # With snapshots the browser is only started once a page has to be fetched live
+        if self.snapshot_mode in ("off", "record"):
+            await self.start()
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self) -> None:
+        """Launch the shared browser and page pool if they are not running yet."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.browser is not None:
+                return
+            logger.info("Starting Playwright")
+            self.playwright = await async_playwright().start()
+            logger.info(f"Launching browser (headless={self.headless}, up to {self.max_pages} pages)")
+            self.browser = await self.playwright.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
+            self.context = await self.browser.new_context()
+            if self.block_resources:
+                logger.info(f"Blocking {', '.join(sorted(BLOCKED_RESOURCE_TYPES))} and third-party requests "
+                            f"(allowed hosts: {', '.join(self.allowed_hosts) or 'none'})")
+                await self.context.route("**/*", self._route_request)
+            self._idle_pages = asyncio.Queue()
+            self._page_slots = asyncio.Semaphore(self.max_pages)
+
+    async def close(self) -> None:
+        """Close the pooled pages, the browser and Playwright."""
+        if self.browser is not None:
+            logger.info("Closing browser")
+            try:
+                await self.context.close()
+                await self.browser.close()
+            except Exception as e:
+                logger.error(f"Error closing browser: {str(e)}")
+        if self.blocked_requests:
+            logger.info(f"Blocked {self.blocked_requests} requests")
         if self.playwright:
             logger.info("Stopping Playwright")
             await self.playwright.stop()
-    
-    async def scrape_component(self, url: str) -> Dict[str, Any]:
-        """Scrape component information from Salt Design System pages."""
-        logger.info(f"Starting to scrape component from URL: {url}")
-        
+        self.playwright = self.browser = self.context = None
+        self._idle_pages = self._page_slots = None
+
+    @staticmethod
+    def _matches_host(host: str, domain: str) -> bool:
+        return host == domain or host.endswith("." + domain)
+
+    def _should_block(self, url: str, resource_type: str) -> bool:
+        """Whether resource blocking aborts a request for url of the given Playwright resource type."""
+        host = (urlparse(url).hostname or "").lower()
+        if host and any(self._matches_host(host, allowed) for allowed in self.allowed_hosts):
+            return False
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return True
+        # data: and blob: URLs have no host and belong to the page
+        return bool(host) and not self._matches_host(host, self.site_domain)
+
+    async def _route_request(self, route) -> None:
+        request = route.request
+        if self._should_block(request.url, request.resource_type):
+            self.blocked_requests += 1
+            logger.debug(f"Blocked {request.resource_type} request: {request.url}")
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def _page(self) -> AsyncIterator[Any]:
+        """Borrow a page from the pool, opening a new one while fewer than max_pages exist."""
+        await self._page_slots.acquire()
+        page = None
         try:
-            async with async_playwright() as p:
-                logger.info("Launching browser")
-                browser = await p.chromium.launch(headless=False, slow_mo=500)
-                page = await browser.new_page()
-                
-                # Extract component name from URL
-                component_name = self._extract_component_name(url)
-                logger.info(f"Extracted component name: {component_name}")
-                
-                # Scrape usage page
-                usage_url = self._get_usage_url(url)
-                logger.info(f"Scraping usage page: {usage_url}")
-                await page.goto(usage_url)
-                await page.wait_for_load_state("networkidle")
-                usage_content = await page.content()
-                usage_soup = BeautifulSoup(usage_content, 'html.parser')
-                
-                # Scrape examples page
-                examples_url = self._get_examples_url(url)
-                logger.info(f"Scraping examples page: {examples_url}")
-                await page.goto(examples_url)
-                await page.wait_for_load_state("networkidle")
-                
+            try:
+                page = self._idle_pages.get_nowait()
+            except asyncio.QueueEmpty:
+                page = await self.context.new_page()
+            yield page
+            self._idle_pages.put_nowait(page)
+        except BaseException:
+            # The page may be mid-navigation; don't hand it to the next scrape
+            if page is not None:
+                with suppress(Exception):
+                    await page.close()
+            raise
+        finally:
+            self._page_slots.release()
+
+    async def _fetch_page(self, url: str, show_code: bool = False) -> str:
+        """Load url in a pooled page and return its rendered HTML."""
+        async with self._page() as page:
+            logger.info(f"Scraping page: {url}")
+            await page.goto(url, wait_until=self.wait_until)
+            try:
+                # The heading is rendered with the page content
+                await page.wait_for_selector('h1', timeout=PAGE_READY_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                logger.warning(f"No heading rendered on {url} within {PAGE_READY_TIMEOUT_MS} ms")
+            if show_code:
                 # Click all "Show code" buttons
                 logger.info("Clicking 'Show code' buttons")
                 await self._click_show_code_buttons(page)
-                
-                examples_content = await page.content()
-                examples_soup = BeautifulSoup(examples_content, 'html.parser')
-                
-                # Extract component information
-                logger.info("Extracting component information")
-                component_info = {
-                    "component_name": component_name,
-                    "metadata": {
-                        "component_name": component_name,
-                        "description": self._extract_description(usage_soup),
-                        "props": self._extract_props(usage_soup),
-                        "examples": self._extract_examples(examples_soup),
-                        "category": self._extract_category(usage_soup),
-                        "tags": self._extract_tags(usage_soup),
-                        "when_to_use": self._extract_when_to_use(usage_soup),
-                        "when_not_to_use": self._extract_when_not_to_use(usage_soup),
-                        "import_statement": self._extract_import_statement(usage_soup)
-                    },
-                    "documentation_url": url
-                }
-                
-                logger.info("Successfully extracted component information")
-                await browser.close()
-                return component_info
-                
+            return await page.content()
+
+    async def _get_page_html(self, url: str, show_code: bool = False) -> str:
+        """Rendered HTML of url, from a snapshot or a live fetch as snapshot_mode decides."""
+        if self.snapshot_mode in ("cache", "replay"):
+            max_age = self.snapshot_max_age_seconds if self.snapshot_mode == "cache" else None
+            as_of = self.replay_as_of if self.snapshot_mode == "replay" else None
+            snapshot = await asyncio.to_thread(self.snapshots.get, url, max_age, as_of)
+            if snapshot is not None:
+                logger.info(f"Using snapshot of {url} from {datetime.fromtimestamp(snapshot.fetched_at).isoformat()}")
+                return snapshot.html
+            if self.snapshot_mode == "replay":
+                raise SnapshotMissingError(f"No snapshot of {url} in {self.snapshots.directory}")
+
+        await self.start()
+        html = await self._fetch_page(url, show_code=show_code)
+        if self.snapshot_mode in ("record", "cache"):
+            await asyncio.to_thread(self.snapshots.put, url, html)
+        return html
+
+    async def scrape_component(self, url: str) -> Dict[str, Any]:
+        """Scrape component information from Salt Design System pages."""
+        logger.info(f"Starting to scrape component from URL: {url}")
+
+        try:
+            # Extract component name from URL
+            component_name = self._extract_component_name(url)
+            logger.info(f"Extracted component name: {component_name}")
+
+            # Scrape usage and examples pages concurrently
+            usage_content, examples_content = await asyncio.gather(
+                self._get_page_html(self._get_usage_url(url)),
+                self._get_page_html(self._get_examples_url(url), show_code=True)
+            )
+
+            # Parsing is CPU-bound; keep it off the event loop so other pages keep loading
+            component_info = await asyncio.to_thread(
+                self._build_component_info, url, component_name, usage_content, examples_content
+            )
+            logger.info("Successfully extracted component information")
+            return component_info
+
         except Exception as e:
             logger.error(f"Error scraping component: {str(e)}", exc_info=True)
             raise
-    
+
+    async def scrape_many(self, urls: List[str], concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Scrape several components, up to concurrency at a time (default: the scraper's concurrency).
+
+        Returns:
+            {"components": [...component info, in the order of urls], "errors": [...messages for urls that failed]}
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def scrape(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.scrape_component(url)
+
+        results = await asyncio.gather(*(scrape(url) for url in urls), return_exceptions=True)
+        components, errors = [], []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                errors.append(f"Error scraping {url}: {str(result)}")
+            else:
+                components.append(result)
+        logger.info(f"Scraped {len(components)} components, {len(errors)} failed")
+        return {"components": components, "errors": errors}
+
+    def _build_component_info(self, url: str, component_name: str,
+                              usage_content: str, examples_content: str) -> Dict[str, Any]:
+        # Extract component information
+        logger.info("Extracting component information")
+        fields = None
+        if self.extractor == "lxml":
+            try:
+                fields = self._extract_fields(usage_content, examples_content)
+            except Exception as e:
+                logger.warning(f"Single-pass extraction failed, falling back to BeautifulSoup: {str(e)}")
+        if fields is None:
+            fields = self._extract_fields_with_soup(usage_content, examples_content)
+
+        metadata = {"component_name": component_name}
+        metadata.update((field, fields[field]) for field in METADATA_FIELDS)
+        return {
+            "component_name": component_name,
+            "metadata": metadata,
+            "documentation_url": url
+        }
+
+    def _extract_fields(self, usage_content: str, examples_content: str) -> Dict[str, Any]:
+        """Metadata fields from one lxml walk over each page."""
+        fields = extract_usage_page(usage_content, self._extract_component_name)
+        fields["examples"] = extract_examples_page(examples_content)
+        return fields
+
+    def _extract_fields_with_soup(self, usage_content: str, examples_content: str) -> Dict[str, Any]:
+        """Metadata fields from the BeautifulSoup _extract_* methods."""
+        usage_soup = BeautifulSoup(usage_content, SOUP_PARSER)
+        examples_soup = BeautifulSoup(examples_content, SOUP_PARSER)
+        return {
+            "description": self._extract_description(usage_soup),
+            "props": self._extract_props(usage_soup),
+            "examples": self._extract_examples(examples_soup),
+            "category": self._extract_category(usage_soup),
+            "tags": self._extract_tags(usage_soup),
+            "when_to_use": self._extract_when_to_use(usage_soup),
+            "when_not_to_use": self._extract_when_not_to_use(usage_soup),
+            "import_statement": self._extract_import_statement(usage_soup)
+        }
+
     def _extract_component_name(self, url: str) -> str:
         """Extract component name from URL."""
         try:
@@ -127,33 +399,40 @@ class ComponentScraper:
         return examples_url
     
     async def _click_show_code_buttons(self, page) -> None:
-        """Click all 'Show code' switches on the page."""
+        """Click all 'Show code' switches on the page and wait until their code blocks render."""
         try:
-            # Select all saltSwitch labels
-            labels = await page.query_selector_all('label.saltSwitch')
-
-            logger.info(f"Found {len(labels)} switches in total")
+            try:
+                # The server-rendered heading appears before React hydrates the switches
+                await page.wait_for_function(_SHOW_CODE_HYDRATED_JS, timeout=PAGE_READY_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                logger.warning(f"'Show code' switches not hydrated within {PAGE_READY_TIMEOUT_MS} ms")
 
-            count = 0
-            for i, label in enumerate(labels):
-                text = await label.query_selector('.saltSwitch-label')
-                text_content = await text.text_content() if text else ""
+            clicked, before = await page.evaluate(_CLICK_SHOW_CODE_JS)
+            logger.info(f"Clicked {clicked} 'Show code' switches")
+            if not clicked:
+                return
 
-                if "show code" in text_content.lower():
-                    logger.debug(f"Clicking 'Show code' switch {i+1}")
-                    switch_input = await label.query_selector('input[type="checkbox"]')
-                    if switch_input:
-                        await switch_input.click()
-                        count += 1
-                        await page.wait_for_timeout(500)  # wait for code block to appear
-
-            logger.info(f"Clicked {count} 'Show code' switches")
-            await page.wait_for_timeout(1000)  # ensure all blocks are rendered
+            expected = before + clicked
+            try:
+                await self._wait_for_code_blocks(page, expected)
+            except PlaywrightTimeoutError:
+                retried = await page.evaluate(_RECLICK_MISSING_CODE_JS)
+                logger.debug(f"Code blocks incomplete, re-clicked {retried} switches")
+                await self._wait_for_code_blocks(page, expected)
 
+        except PlaywrightTimeoutError:
+            rendered = await page.evaluate("() => document.querySelectorAll('pre.shiki').length")
+            logger.warning(f"Only {rendered} code blocks rendered within {SHOW_CODE_TIMEOUT_MS} ms")
         except Exception as e:
             logger.error(f"Error clicking 'Show code' switches: {e}")
 
-    
+    async def _wait_for_code_blocks(self, page, expected: int) -> None:
+        await page.wait_for_function(
+            "expected => document.querySelectorAll('pre.shiki').length >= expected",
+            arg=expected,
+            timeout=SHOW_CODE_TIMEOUT_MS / 2
+        )
+
     def _extract_description(self, soup: BeautifulSoup) -> str:
         """Extract component description."""
         try:
@@ -0,0 +1,135 @@
+from PIL import Image
+from dataclasses import dataclass
+from typing import Dict
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Images are analysed at this size; the statistics are scale-invariant enough
+ANALYSIS_SIZE = 256
+
+DEFAULT_AMBIGUOUS_LOW = 0.35
+DEFAULT_AMBIGUOUS_HIGH = 0.65
+
+# Band of edge density (share of strong-gradient pixels) that UIs sit in. Text, borders
+# and controls give even sparse screens some edges; smooth gradients have next to none,
+# photos and noise are busier.
+UI_EDGE_DENSITY_MIN = 0.002
+UI_EDGE_DENSITY_FULL = 0.015
+UI_EDGE_DENSITY_MAX = 0.25
+
+
+@dataclass
+class LocalValidationResult:
+    """Outcome of the local UI heuristic."""
+    is_valid_ui: bool
+    confidence: float
+    score: float
+    ambiguous: bool
+    reason: str
+    features: Dict[str, float]
+
+
+def _clip01(value: float) -> float:
+    return float(min(1.0, max(0.0, value)))
+
+
+def _image_features(image: Image.Image) -> Dict[str, float]:
+    small = image.convert("RGB")
+    small.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE))
+    rgb = np.asarray(small, dtype=np.int16)
+    gray = np.asarray(small.convert("L"), dtype=np.float32)
+
+    # Flat colour regions: share of pixels covered by the 8 most common colours
+    # (quantised to 4 bits/channel). UI mockups are dominated by a few fills.
+    quantised = (rgb >> 4).reshape(-1, 3)
+    keys = (quantised[:, 0] << 8) | (quantised[:, 1] << 4) | quantised[:, 2]
+    counts = np.bincount(keys, minlength=4096)
+    top_counts = np.sort(counts)[::-1]
+    flat_ratio = float(top_counts[:8].sum() / keys.size)
+    distinct_colors = int((counts > 0).sum())
+
+    # Gradients
+    gx = np.abs(np.diff(gray, axis=1))[:-1, :]
+    gy = np.abs(np.diff(gray, axis=0))[:, :-1]
+    magnitude = np.hypot(gx, gy)
+    strong = magnitude > 32
+    edge_density = float(strong.mean())
+
+    # UI edges (boxes, rules, text strokes) are mostly horizontal or vertical;
+    # photographs have edges at every angle
+    if strong.any():
+        dominant = np.maximum(gx[strong], gy[strong])
+        minor = np.minimum(gx[strong], gy[strong])
+        axis_alignment = float((minor < 0.35 * dominant).mean())
+    else:
+        axis_alignment = 0.0
+
+    return {
+        "flat_ratio": round(flat_ratio, 4),
+        "distinct_colors": distinct_colors,
+        "edge_density": round(edge_density, 4),
+        "axis_alignment": round(axis_alignment, 4),
+    }
+
+
+def _edge_density_score(edge_density: float) -> float:
+    if edge_density < UI_EDGE_DENSITY_FULL:
+        return _clip01((edge_density - UI_EDGE_DENSITY_MIN) / (UI_EDGE_DENSITY_FULL - UI_EDGE_DENSITY_MIN))
+    if edge_density <= UI_EDGE_DENSITY_MAX:
+        return 1.0
+    return _clip01(1 - (edge_density - UI_EDGE_DENSITY_MAX) / UI_EDGE_DENSITY_MAX)
+
+
+def assess_ui_image(image: Image.Image,
+                    ambiguous_low: float = None,
+                    ambiguous_high: float = None) -> LocalValidationResult:
+    """Score how likely an image is a UI design from cheap image statistics.
+
+    Scores between UI_VALIDATION_AMBIGUOUS_LOW and UI_VALIDATION_AMBIGUOUS_HIGH
+    are flagged as ambiguous so the caller can ask the LLM instead.
+    """
+    if ambiguous_low is None:
+        ambiguous_low = float(os.getenv("UI_VALIDATION_AMBIGUOUS_LOW", DEFAULT_AMBIGUOUS_LOW))
+    if ambiguous_high is None:
+        ambiguous_high = float(os.getenv("UI_VALIDATION_AMBIGUOUS_HIGH", DEFAULT_AMBIGUOUS_HIGH))
+
+    features = _image_features(image)
+
+    if features["edge_density"] < 0.002 and features["flat_ratio"] > 0.9:
+        return LocalValidationResult(
+            is_valid_ui=False,
+            confidence=0.9,
+            score=0.0,
+            ambiguous=False,
+            reason="The image is blank or nearly uniform.",
+            features=features,
+        )
+
+    flat_score = _clip01((features["flat_ratio"] - 0.2) / 0.5)
+    axis_score = _clip01((features["axis_alignment"] - 0.5) / 0.35)
+    edge_score = _edge_density_score(features["edge_density"])
+
+    score = 0.45 * flat_score + 0.35 * axis_score + 0.2 * edge_score
+    is_valid = score >= 0.5
+    # Inclusive upper bound: a score right at the threshold is not confident enough to skip the LLM
+    ambiguous = ambiguous_low < score <= ambiguous_high
+
+    if is_valid:
+        reason = "Large flat colour regions and axis-aligned edges typical of a UI layout."
+    else:
+        reason = "Colour and edge statistics look like a photograph or illustration rather than a UI."
+
+    result = LocalValidationResult(
+        is_valid_ui=is_valid,
+        confidence=round(score if is_valid else 1 - score, 3),
+        score=round(score, 3),
+        ambiguous=ambiguous,
+        reason=reason,
+        features=features,
+    )
+    logger.debug(f"Local UI validation: score={result.score} ambiguous={ambiguous} features={features}")
+    return result
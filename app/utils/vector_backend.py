@@ -0,0 +1,834 @@
+from typing import Any, Dict, Hashable, List, Optional, Protocol, Set, Tuple, runtime_checkable
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+
+from app.utils.catalog import CatalogIndex, CatalogRecord, partition_of, record_type_of
+from app.utils.embedding_cache import get_query_embedding_cache
+from app.utils.embeddings import DEFAULT_EMBEDDING_BACKEND, DEFAULT_EMBEDDING_MODEL, embedding_model_key, embedding_registry
+from app.utils.instrumentation import record_vector_store_call
+
+logger = logging.getLogger(__name__)
+
+# Records embedded and written per backend write in the bulk APIs
+DEFAULT_BULK_BATCH_SIZE = 256
+# Batch size passed to SentenceTransformer.encode
+ENCODE_BATCH_SIZE = 64
+
+# Partitions searched by search_components; icons are only returned by search_icons
+COMPONENT_PARTITIONS = ('component', 'layout')
+# Collection / index name of each partition. Components keep the name of the
+# original single collection, so migrating only moves layouts and icons out of it.
+PARTITION_NAMES = {'component': 'components', 'layout': 'layouts', 'icon': 'icons'}
+
+# Reciprocal rank fusion: a record scores sum(1 / (RRF_K + rank)) over the rankings it appears in
+RRF_K = 60
+# Records taken from each of the vector and keyword rankings before fusing them
+HYBRID_CANDIDATES = 20
+
+# Every icon exposes the same props
+ICON_PROPS = {
+    'size': {
+        'type': 'string | number',
+        'required': False,
+        'defaultValue': 'medium',
+        'description': 'Size of the icon'
+    },
+    'color': {
+        'type': 'string',
+        'required': False,
+        'defaultValue': 'inherit',
+        'description': 'Color of the icon'
+    }
+}
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """Stable SHA-256 of a source record, independent of key order and whitespace."""
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _record_id(prefix: str, name: str, record: Dict[str, Any]) -> str:
+    return f"{prefix}_{name.lower()}_{content_hash(record)[:16]}"
+
+
+def component_record_id(component_data: Dict[str, Any]) -> str:
+    """Deterministic ID for a component document: its name plus a hash of its content."""
+    return _record_id("component", component_data['component_name'], component_data)
+
+
+def icon_record_id(icon_data: Dict[str, Any]) -> str:
+    """Deterministic ID for an icon entry: its name plus a hash of its content."""
+    return _record_id("icon", icon_data['component_name'], icon_data)
+
+
+def component_embedding_text(metadata: Dict[str, Any]) -> str:
+    """Text embedded for a component document: name, description and tags."""
+    return f"{metadata['component_name']} {metadata['metadata']['description']} {' '.join(metadata['metadata'].get('tags', []))}"
+
+
+def icon_embedding_text(icon_data: Dict[str, Any]) -> str:
+    """Text embedded for an icon: name, synonyms, tags and use cases."""
+    return (
+        f"{icon_data['component_name']} "
+        f"{' '.join(icon_data.get('synonym', []))} "
+        f"{' '.join(icon_data.get('tags', []))} "
+        f"{' '.join(icon_data.get('when_to_use', []))}"
+    )
+
+
+# One catalog index per stored catalog, shared by every store instance that opens it
+_catalog_indexes: Dict[str, CatalogIndex] = {}
+_catalog_indexes_lock = threading.Lock()
+
+
+def catalog_index_for(location: str) -> CatalogIndex:
+    with _catalog_indexes_lock:
+        index = _catalog_indexes.get(location)
+        if index is None:
+            index = _catalog_indexes[location] = CatalogIndex()
+        return index
+
+
+def file_version(*paths: str) -> Tuple[Tuple[str, int, int], ...]:
+    """(path, mtime_ns, size) of each existing file, to tell whether another process rewrote them."""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        version.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+@runtime_checkable
+class VectorBackend(Protocol):
+    """Operations every component/icon vector store provides.
+
+    Search results are dicts of {'id', 'metadata', 'distance', 'full_metadata'}
+    where distance is cosine distance (0 = identical) and metadata/full_metadata
+    are shared read-only objects. Components, layouts and icons are kept in
+    separate partitions; search_components covers components and layouts.
+    """
+
+    def add_component(self, component_id: str, metadata: Dict[str, Any]) -> None: ...
+
+    def add_icon(self, icon_data: Dict[str, Any]) -> None: ...
+
+    def add_components_bulk(self, components: List[Tuple[str, Dict[str, Any]]],
+                            batch_size: int = DEFAULT_BULK_BATCH_SIZE, verify: bool = True) -> Dict[str, Any]: ...
+
+    def add_icons_bulk(self, icons: List[Dict[str, Any]],
+                       batch_size: int = DEFAULT_BULK_BATCH_SIZE, verify: bool = True) -> Dict[str, Any]: ...
+
+    def sync_components(self, components: List[Dict[str, Any]], prune: bool = True) -> Dict[str, List[str]]: ...
+
+    def sync_icons(self, icons: List[Dict[str, Any]], prune: bool = True) -> Dict[str, List[str]]: ...
+
+    def upsert_component(self, metadata: Dict[str, Any]) -> Tuple[str, bool]: ...
+
+    def get_component(self, component_id: str) -> Optional[Dict[str, Any]]: ...
+
+    def find_by_name(self, name: str, record_type: str = 'component',
+                     case_sensitive: bool = False) -> Optional[Dict[str, Any]]: ...
+
+    def list_records(self, record_type: Optional[str] = None) -> List[CatalogRecord]: ...
+
+    def search_components(self, query: str, n_results: int = 5,
+                          where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]: ...
+
+    def search_components_many(self, queries: List[str], n_results: int = 5,
+                               where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]: ...
+
+    def search_layouts(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]: ...
+
+    def search_layouts_many(self, queries: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]: ...
+
+    def search_icons(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]: ...
+
+    def search_icons_many(self, queries: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]: ...
+
+    def delete_component(self, component_id: str) -> None: ...
+
+    def delete_components(self, component_ids: List[str]) -> None: ...
+
+    def clear_collection(self) -> None: ...
+
+
+class CatalogVectorStore:
+    """VectorBackend implementation on top of a few storage primitives.
+
+    Subclasses store records and answer nearest-neighbour queries; record
+    preparation, embedding, the catalog index, incremental sync and search
+    result shaping live here so every backend behaves the same.
+
+    Each partition (see catalog.PARTITIONS) is a separately indexed collection.
+    Record IDs are unique across partitions, so only writes and queries name one.
+
+    Primitives:
+        _write(partition, ids, embeddings, metadatas, documents)  upsert records
+        _existing_ids(ids) -> set                                  which of ids are stored
+        _delete(ids)                                               remove records
+        _fetch_records(ids | None) -> [CatalogRecord]              read records (all when None)
+        _nearest(partition, embeddings, n_results, where)          -> ([[id, ...]], [[distance, ...]])
+        _clear()                                                   remove everything
+        _catalog_version() -> hashable | None                      changes whenever the store is written
+    """
+
+    backend_name = "vector store"
+
+    def __init__(self, catalog_location: str, embedding_model_name: str = DEFAULT_EMBEDDING_MODEL):
+        self.embedding_model_name = embedding_model_name
+        self._catalog_index = catalog_index_for(catalog_location)
+
+    @property
+    def catalog(self) -> CatalogIndex:
+        """The catalog index, dropped first if the store was written since it was loaded (e.g. by an ingest script)."""
+        self._catalog_index.refresh(self._catalog_version())
+        return self._catalog_index
+
+    # -- storage primitives -------------------------------------------------
+
+    def _write(self, partition: str, ids: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
+        raise NotImplementedError
+
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        raise NotImplementedError
+
+    def _delete(self, ids: List[str]) -> None:
+        raise NotImplementedError
+
+    def _fetch_records(self, ids: Optional[List[str]] = None) -> List[CatalogRecord]:
+        raise NotImplementedError
+
+    def _nearest(self, partition: str, embeddings: List[List[float]], n_results: int,
+                 where: Optional[Dict[str, Any]]) -> Tuple[List[List[str]], List[List[float]]]:
+        raise NotImplementedError
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+    def _max_batch_size(self) -> Optional[int]:
+        return None
+
+    def _catalog_version(self) -> Optional[Hashable]:
+        # None: the store cannot tell cheaply, so the catalog index expires after a TTL
+        return None
+
+    # -- embeddings ---------------------------------------------------------
+
+    @property
+    def embedding_model(self):
+        """Shared sentence transformer, loaded on first use by the embedding registry."""
+        return embedding_registry.get_model(self.embedding_model_name)
+
+    def _create_embedding(self, text: str) -> List[float]:
+        """Create embedding for a text using the sentence transformer model."""
+        return self._create_embeddings([text])[0]
+
+    def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for several texts, encoding the ones not in the query cache in one batch."""
+        cache = get_query_embedding_cache()
+        if cache is None:
+            return self.embedding_model.encode(texts, batch_size=ENCODE_BATCH_SIZE).tolist()
+
+        model_key = embedding_model_key(self.embedding_model_name)
+        embeddings = cache.get_many(model_key, texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if missing:
+            encoded = self.embedding_model.encode(missing, batch_size=ENCODE_BATCH_SIZE).tolist()
+            cache.put_many(model_key, missing, encoded)
+            by_text = dict(zip(missing, encoded))
+            embeddings = [embedding if embedding is not None else list(by_text[text])
+                          for text, embedding in zip(texts, embeddings)]
+        return embeddings
+
+    # -- writes -------------------------------------------------------------
+
+    def _prepare_icon(self, icon_data: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], str]:
+        """Build (id, embedding text, stored metadata, document) for an icon."""
+        icon_id = icon_record_id(icon_data)
+
+        # Prepare flat metadata (lists and dicts as JSON strings)
+        stored_metadata = {
+            'component_name': icon_data['component_name'],
+            'import_statement': icon_data['import'],
+            'description': f"Icon for {icon_data['component_name'].lower().replace('icon', '')}",
+            'category': 'Icon',
+            'props': json.dumps(ICON_PROPS),
+            'tags': json.dumps(icon_data.get('tags', [])),
+            'synonyms': json.dumps(icon_data.get('synonym', [])),
+            'when_to_use': json.dumps(icon_data.get('when_to_use', [])),
+            'record_type': 'icon',
+            'content_hash': content_hash(icon_data),
+            'embedding_model': embedding_model_key(self.embedding_model_name)
+        }
+
+        # Include component name, synonyms, and tags for better searchability
+        component_text = icon_embedding_text(icon_data)
+
+        # Prepare full metadata for document
+        full_metadata = {
+            'component_name': icon_data['component_name'],
+            'import_statement': icon_data['import'],
+            'description': stored_metadata['description'],
+            'category': 'Icon',
+            'props': ICON_PROPS,
+            'tags': icon_data.get('tags', []),
+            'synonyms': icon_data.get('synonym', []),
+            'when_to_use': icon_data.get('when_to_use', [])
+        }
+        return icon_id, component_text, stored_metadata, json.dumps(full_metadata)
+
+    def _prepare_component(self, component_id: str, metadata: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], str]:
+        """Build (id, embedding text, stored metadata, document) for a component."""
+        # Convert lists to JSON strings
+        stored_metadata = {
+            'component_name': metadata['component_name'],
+            'description': metadata['metadata']['description'],
+            'props': json.dumps(metadata['metadata']['props']),
+            'examples': json.dumps(metadata['metadata'].get('examples', [])),
+            'category': metadata['metadata'].get('category', ""),
+            'tags': json.dumps(metadata['metadata'].get('tags', [])),
+            'record_type': 'component',
+            'content_hash': content_hash(metadata),
+            'embedding_model': embedding_model_key(self.embedding_model_name)
+        }
+
+        component_text = component_embedding_text(metadata)
+        return component_id, component_text, stored_metadata, json.dumps(metadata)
+
+    def _add_one(self, record: Tuple[str, str, Dict[str, Any], str]) -> None:
+        record_id, text, stored_metadata, document = record
+        # Documents are not queries, so bypass the query cache
+        embedding = self.embedding_model.encode(text).tolist()
+        record_vector_store_call("add")
+        self._write(partition_of(stored_metadata), [record_id], [embedding], [stored_metadata], [document])
+        self.catalog.invalidate()
+        if record_id not in self._existing_ids([record_id]):
+            raise Exception(f"Record {record_id} was not added successfully")
+
+    def add_icon(self, icon_data: Dict[str, Any]) -> None:
+        """Add an icon to the vector store.
+
+        Args:
+            icon_data: Dictionary containing icon information with the following structure:
+                {
+                    "component_name": str,
+                    "import": str,
+                    "synonym": List[str],
+                    "tags": List[str],
+                    "when_to_use": List[str]
+                }
+        """
+        try:
+            logger.debug(f"Adding icon: {icon_data['component_name']}")
+            self._add_one(self._prepare_icon(icon_data))
+            logger.debug(f"Successfully added icon {icon_data['component_name']} to {self.backend_name}")
+        except Exception as e:
+            logger.error(f"Error adding icon to {self.backend_name}: {str(e)}")
+            raise
+
+    def add_component(self, component_id: str, metadata: Dict[str, Any]) -> None:
+        """Add a component to the vector store."""
+        try:
+            logger.debug(f"Adding component with ID: {component_id}")
+            self._add_one(self._prepare_component(component_id, metadata))
+            logger.debug(f"Successfully added component {component_id} to {self.backend_name}")
+        except Exception as e:
+            logger.error(f"Error adding component to {self.backend_name}: {str(e)}")
+            raise
+
+    def add_components_bulk(self,
+                            components: List[Tuple[str, Dict[str, Any]]],
+                            batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+                            verify: bool = True) -> Dict[str, Any]:
+        """Add many components, embedding and writing them in batches.
+
+        Args:
+            components: (component_id, metadata) pairs, metadata as accepted by add_component
+            batch_size: Number of records encoded and written per batch
+            verify: Check once per batch that every record was stored
+
+        Returns:
+            {"ids": [...stored ids], "errors": [...messages for records that were skipped]}
+        """
+        records, errors = [], []
+        for component_id, metadata in components:
+            try:
+                records.append(self._prepare_component(component_id, metadata))
+            except Exception as e:
+                errors.append(f"Error preparing component {metadata.get('component_name', component_id)}: {str(e)}")
+        return self._add_bulk(records, errors, batch_size, verify)
+
+    def add_icons_bulk(self,
+                       icons: List[Dict[str, Any]],
+                       batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+                       verify: bool = True) -> Dict[str, Any]:
+        """Add many icons, embedding and writing them in batches. See add_components_bulk."""
+        records, errors = [], []
+        for icon_data in icons:
+            try:
+                records.append(self._prepare_icon(icon_data))
+            except Exception as e:
+                errors.append(f"Error preparing icon {icon_data.get('component_name', 'unknown')}: {str(e)}")
+        return self._add_bulk(records, errors, batch_size, verify)
+
+    def _add_bulk(self,
+                  records: List[Tuple[str, str, Dict[str, Any], str]],
+                  errors: List[str],
+                  batch_size: int,
+                  verify: bool) -> Dict[str, Any]:
+        # Duplicate IDs within one write are rejected or ambiguous in every backend
+        seen = set()
+        unique_records = []
+        for record in records:
+            if record[0] in seen:
+                errors.append(f"Duplicate ID skipped: {record[0]}")
+                continue
+            seen.add(record[0])
+            unique_records.append(record)
+
+        batch_size = max(1, min(batch_size, self._max_batch_size() or batch_size))
+
+        stored_ids = []
+        for start in range(0, len(unique_records), batch_size):
+            batch = unique_records[start:start + batch_size]
+            ids = [r[0] for r in batch]
+            try:
+                embeddings = self.embedding_model.encode(
+                    [r[1] for r in batch], batch_size=ENCODE_BATCH_SIZE
+                ).tolist()
+                by_partition: Dict[str, List[int]] = {}
+                for i, record in enumerate(batch):
+                    by_partition.setdefault(partition_of(record[2]), []).append(i)
+                for partition, rows in by_partition.items():
+                    record_vector_store_call("add")
+                    self._write(partition, [ids[i] for i in rows], [embeddings[i] for i in rows],
+                                [batch[i][2] for i in rows], [batch[i][3] for i in rows])
+                self.catalog.invalidate()
+                if verify:
+                    record_vector_store_call("get")
+                    found = self._existing_ids(ids)
+                    missing = [i for i in ids if i not in found]
+                    if missing:
+                        errors.extend(f"Record was not added successfully: {i}" for i in missing)
+                    stored_ids.extend(i for i in ids if i in found)
+                else:
+                    stored_ids.extend(ids)
+                logger.info(f"Stored batch of {len(batch)} records ({start + len(batch)}/{len(unique_records)})")
+            except Exception as e:
+                logger.error(f"Error adding batch to {self.backend_name}: {str(e)}")
+                errors.extend(f"Error adding {i}: {str(e)}" for i in ids)
+
+        return {"ids": stored_ids, "errors": errors}
+
+    # -- incremental ingestion ----------------------------------------------
+
+    def get_manifest(self, record_type: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Describe what is stored: record ID -> {component_name, record_type, content_hash, embedding_model}.
+
+        Records written before content hashing have no content_hash and a type
+        inferred from their category, so the next sync replaces them.
+        embedding_model is the embedding_model_key the record was embedded with
+        (None for records stored before it was recorded); sync re-embeds records
+        whose key differs from the current model and EMBEDDING_BACKEND.
+        """
+        manifest = {}
+        for record in self._fetch_records(None):
+            if record_type and record.record_type != record_type:
+                continue
+            manifest[record.id] = manifest_entry(record.metadata)
+        return manifest
+
+    def _embedded_by_current_model(self, entry: Dict[str, Any]) -> bool:
+        # Records stored before the model was recorded were embedded with the torch backend
+        stored = entry['embedding_model'] or embedding_model_key(self.embedding_model_name, DEFAULT_EMBEDDING_BACKEND)
+        return stored == embedding_model_key(self.embedding_model_name)
+
+    def sync_components(self, components: List[Dict[str, Any]], prune: bool = True) -> Dict[str, List[str]]:
+        """Make the stored components match the given documents.
+
+        New and edited documents are embedded and added, unchanged ones are
+        skipped and, with prune, components that are no longer in the input
+        (including older versions of edited ones) are deleted.
+
+        Returns:
+            {"added": [...], "unchanged": [...], "deleted": [...], "errors": [...]}
+        """
+        records = [(component_record_id(c), c) for c in components]
+        return self._sync('component', records, self.add_components_bulk, prune)
+
+    def sync_icons(self, icons: List[Dict[str, Any]], prune: bool = True) -> Dict[str, List[str]]:
+        """Make the stored icons match the given icon entries. See sync_components."""
+        records = [(icon_record_id(i), i) for i in icons]
+        return self._sync('icon', records, lambda pairs: self.add_icons_bulk([r for _, r in pairs]), prune)
+
+    def _sync(self, record_type: str, records: List[Tuple[str, Dict[str, Any]]], add_bulk, prune: bool) -> Dict[str, List[str]]:
+        manifest = self.get_manifest(record_type)
+        wanted = dict(records)
+
+        # Records embedded with another model or EMBEDDING_BACKEND are re-embedded in place
+        to_add = [(record_id, record) for record_id, record in wanted.items()
+                  if record_id not in manifest or not self._embedded_by_current_model(manifest[record_id])]
+        unchanged = [record_id for record_id in wanted
+                     if record_id in manifest and self._embedded_by_current_model(manifest[record_id])]
+        if prune:
+            stale = [record_id for record_id in manifest if record_id not in wanted]
+        else:
+            # Still replace older versions of the records being written
+            names = {record['component_name'] for _, record in to_add}
+            stale = [record_id for record_id, entry in manifest.items()
+                     if record_id not in wanted and entry['component_name'] in names]
+
+        result = add_bulk(to_add) if to_add else {"ids": [], "errors": []}
+        # Only drop old versions once their replacements are stored
+        stored = set(result['ids'])
+        failed_names = {record['component_name'] for record_id, record in to_add if record_id not in stored}
+        stale = [record_id for record_id in stale if manifest[record_id]['component_name'] not in failed_names]
+        self.delete_components(stale)
+
+        logger.info(
+            f"Synced {record_type}s: {len(result['ids'])} added, {len(unchanged)} unchanged, "
+            f"{len(stale)} deleted, {len(result['errors'])} errors"
+        )
+        return {"added": result['ids'], "unchanged": unchanged, "deleted": stale, "errors": result['errors']}
+
+    def upsert_component(self, metadata: Dict[str, Any]) -> Tuple[str, bool]:
+        """Store one component document, replacing any other version of it.
+
+        Returns:
+            (component_id, changed) where changed is False if the identical document was already stored
+        """
+        component_id = component_record_id(metadata)
+        manifest = self.get_manifest('component')
+        if component_id in manifest and self._embedded_by_current_model(manifest[component_id]):
+            return component_id, False
+        self.add_component(component_id, metadata)
+        self.delete_components([
+            record_id for record_id, entry in manifest.items()
+            if entry['component_name'] == metadata['component_name'] and record_id != component_id
+        ])
+        return component_id, True
+
+    # -- reads --------------------------------------------------------------
+
+    def find_by_name(self, name: str, record_type: str = 'component', case_sensitive: bool = False) -> Optional[Dict[str, Any]]:
+        """Look up a component or icon by component_name without querying the backend.
+
+        Tries an exact match first, then (unless case_sensitive) a case-insensitive one.
+
+        Returns:
+            {'id', 'metadata', 'distance': 0.0, 'full_metadata'} with JSON fields parsed, or None.
+            The metadata and document are shared read-only objects.
+        """
+        record = self.catalog.lookup(self._fetch_records, name, record_type, case_sensitive)
+        return record.to_result() if record else None
+
+    def find_icon_by_name(self, query: str) -> Optional[Dict[str, Any]]:
+        """Exact icon lookup that tolerates a missing or extra "Icon" and spaces ("arrow down" -> ArrowDownIcon)."""
+        base = re.sub(r"[\s_-]+", "", query.lower().replace("icon", ""))
+        if not base:
+            return None
+        for candidate in (base, f"{base}icon", f"icon{base}"):
+            match = self.find_by_name(candidate, record_type='icon')
+            if match:
+                return match
+        return None
+
+    def list_records(self, record_type: Optional[str] = None) -> List[CatalogRecord]:
+        """Every stored record (optionally of one type), from the catalog index."""
+        return self.catalog.all(self._fetch_records, record_type)
+
+    def get_component(self, component_id: str) -> Optional[Dict[str, Any]]:
+        """Get a component by its ID."""
+        try:
+            logger.debug(f"Attempting to retrieve component with ID: {component_id}")
+
+            # Served from the catalog index; unknown IDs are fetched from the backend
+            record = self.catalog.records(self._fetch_records, [component_id])[0]
+            if record is None:
+                logger.warning(f"No component found with ID: {component_id}")
+                return None
+
+            return {
+                'id': record.id,
+                'metadata': record.metadata,
+                'document': record.document
+            }
+
+        except Exception as e:
+            logger.error(f"Error retrieving component from {self.backend_name}: {str(e)}")
+            raise
+
+    def _query_many(self, queries: List[str], n_results: int, partitions: Tuple[str, ...],
+                    where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Run semantic queries with one encode pass and one backend query per partition; results align with queries."""
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return [[] for _ in queries]
+
+        # Only IDs and distances come back from the backend; the decoded records
+        # are taken from the catalog index instead of re-parsing stored metadata
+        embeddings = self._create_embeddings(unique_queries)
+        result_ids, result_distances = None, None
+        for partition in partitions:
+            record_vector_store_call("query")
+            ids, distances = self._nearest(partition, embeddings, n_results, where)
+            if result_ids is None:
+                result_ids, result_distances = ids, distances
+                continue
+            # Merge with the partitions already queried, keeping the n_results closest
+            for q in range(len(unique_queries)):
+                merged = sorted(zip(result_distances[q] + distances[q], result_ids[q] + ids[q]))[:n_results]
+                result_ids[q] = [record_id for _, record_id in merged]
+                result_distances[q] = [distance for distance, _ in merged]
+
+        records = self.catalog.records(self._fetch_records, [i for ids in result_ids for i in ids])
+        records_by_id = {record.id: record for record in records if record is not None}
+
+        by_query = {}
+        for query, ids, distances in zip(unique_queries, result_ids, result_distances):
+            by_query[query] = [
+                records_by_id[record_id].to_result(distance)
+                for record_id, distance in zip(ids, distances)
+                if record_id in records_by_id
+            ]
+        return [list(by_query[query]) for query in queries]
+
+    def _hybrid_query_many(self, queries: List[str], n_results: int, partitions: Tuple[str, ...]) -> List[List[Dict[str, Any]]]:
+        """Vector search fused with BM25 over name, synonyms, tags and when_to_use by reciprocal rank fusion.
+
+        One batched vector query plus in-memory keyword lookups, so a query
+        that matches a name or synonym but embeds poorly still ranks first
+        without a second round trip. Results carry the fused 'score'; a record
+        found only by keywords has distance None.
+        """
+        candidates = max(n_results, HYBRID_CANDIDATES)
+        vector_results = self._query_many(queries, candidates, partitions)
+        lexical_indexes = [self.catalog.lexical(self._fetch_records, partition) for partition in partitions]
+
+        fused_results = []
+        for query, vector_hits in zip(queries, vector_results):
+            scores: Dict[str, float] = {}
+            hits = {hit['id']: hit for hit in vector_hits}
+            for rank, hit in enumerate(vector_hits, start=1):
+                scores[hit['id']] = 1.0 / (RRF_K + rank)
+
+            keyword_hits = sorted(
+                (hit for index in lexical_indexes for hit in index.search(query, candidates)),
+                key=lambda hit: hit[1], reverse=True
+            )[:candidates]
+            for rank, (record_id, _) in enumerate(keyword_hits, start=1):
+                scores[record_id] = scores.get(record_id, 0.0) + 1.0 / (RRF_K + rank)
+
+            top = sorted(scores, key=scores.get, reverse=True)[:n_results]
+            keyword_only = [record_id for record_id in top if record_id not in hits]
+            if keyword_only:
+                for record in self.catalog.records(self._fetch_records, keyword_only):
+                    if record is not None:
+                        hits[record.id] = record.to_result(None)
+            fused_results.append([dict(hits[record_id], score=scores[record_id]) for record_id in top if record_id in hits])
+        return fused_results
+
+    def search_components(self, query: str, n_results: int = 5,
+                          where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search for components similar to the query, returning parsed metadata and full document.
+
+        Components and layouts are searched, icons are not (see search_icons).
+        where restricts the search to records whose stored metadata equals the
+        given values, e.g. {"category": "@salt-ds/core"}.
+        """
+        return self.search_components_many([query], n_results=n_results, where=where)[0]
+
+    def search_components_many(self, queries: List[str], n_results: int = 5,
+                               where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Search for several queries at once.
+
+        All queries are encoded in one batch and sent in a single backend query.
+
+        Returns:
+            One result list per query, in the order of queries, each shaped like search_components()
+        """
+        try:
+            logger.debug(f"Searching for components with {len(queries)} queries")
+            results = self._query_many(queries, n_results, COMPONENT_PARTITIONS, where)
+            logger.debug(f"Found {sum(len(r) for r in results)} components")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching components: {str(e)}")
+            raise
+
+    def search_layouts(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """Search only layout components (FlexLayout, GridItem, ...) with hybrid keyword + vector ranking.
+
+        Results are shaped like search_components, plus the fused 'score'.
+        """
+        return self.search_layouts_many([query], n_results=n_results)[0]
+
+    def search_layouts_many(self, queries: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """Search layouts for several queries at once. See search_layouts and search_components_many."""
+        try:
+            logger.debug(f"Searching for layouts with {len(queries)} queries")
+            results = self._hybrid_query_many(queries, n_results, ('layout',))
+            logger.debug(f"Found {sum(len(r) for r in results)} layouts")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching layouts: {str(e)}")
+            raise
+
+    def search_icons(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """Search for icons similar to the query, returning parsed metadata and full document.
+
+        Args:
+            query: Search query string. Can be icon name, synonym, tag, or use case.
+            n_results: Maximum number of results to return.
+
+        Returns:
+            List of dictionaries containing icon information with the following structure:
+            {
+                'id': str,
+                'metadata': {
+                    'component_name': str,
+                    'import_statement': str,
+                    'description': str,
+                    'category': str,
+                    'props': Dict,
+                    'tags': List[str],
+                    'synonyms': List[str],
+                    'when_to_use': List[str]
+                },
+                'distance': float,
+                'full_metadata': Dict
+            }
+            Non-exact matches are ranked by keywords and embeddings together
+            and also carry the fused 'score'; see _hybrid_query_many.
+        """
+        return self.search_icons_many([query], n_results=n_results)[0]
+
+    def search_icons_many(self, queries: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """Search icons for several queries at once. See search_icons and search_components_many.
+
+        Queries that name an icon exactly are answered from the catalog index;
+        the rest share one batched encode, one backend query and the keyword index.
+        """
+        try:
+            logger.debug(f"Searching for icons with {len(queries)} queries")
+            results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+
+            # First try exact name match
+            semantic = []
+            for i, query in enumerate(queries):
+                exact_match = self.find_icon_by_name(query)
+                if exact_match:
+                    logger.debug(f"Found exact match for icon: {query}")
+                    results[i] = [exact_match]
+                else:
+                    semantic.append(i)
+
+            # If no exact match, rank icons by synonyms/tags and embeddings together
+            if semantic:
+                matches = self._hybrid_query_many([queries[i] for i in semantic], n_results, ('icon',))
+                for i, icon_matches in zip(semantic, matches):
+                    results[i] = icon_matches
+
+            logger.debug(f"Found {sum(len(r) for r in results)} icons")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching icons: {str(e)}")
+            raise
+
+    # -- deletes ------------------------------------------------------------
+
+    def delete_component(self, component_id: str) -> None:
+        """Delete a component from the vector store."""
+        try:
+            logger.debug(f"Deleting component with ID: {component_id}")
+            self._delete([component_id])
+            self.catalog.invalidate()
+            logger.debug(f"Successfully deleted component {component_id}")
+
+        except Exception as e:
+            logger.error(f"Error deleting component: {str(e)}")
+            raise
+
+    def delete_components(self, component_ids: List[str]) -> None:
+        """Delete several records from the vector store in one call."""
+        if not component_ids:
+            return
+        try:
+            logger.debug(f"Deleting {len(component_ids)} records")
+            self._delete(list(component_ids))
+            self.catalog.invalidate()
+        except Exception as e:
+            logger.error(f"Error deleting components: {str(e)}")
+            raise
+
+    def clear_collection(self) -> None:
+        """Remove every component and icon from the vector store."""
+        try:
+            self._clear()
+            self.catalog.invalidate()
+            logger.info("Collection cleared successfully")
+        except Exception as e:
+            logger.error(f"Error clearing collection: {str(e)}")
+            raise
+
+
+def manifest_entry(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Manifest entry of a record from its stored metadata (see CatalogVectorStore.get_manifest)."""
+    return {
+        'component_name': metadata.get('component_name'),
+        'record_type': record_type_of(metadata),
+        'content_hash': metadata.get('content_hash'),
+        'embedding_model': metadata.get('embedding_model')
+    }
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Equality filter on stored metadata, for backends without native filtering."""
+    return not where or all(metadata.get(key) == value for key, value in where.items())
+
+
+# Backend name -> store class, as an import path so optional clients
+# (chromadb, opensearch-py) are only imported when selected
+VECTOR_BACKENDS: Dict[str, str] = {
+    "chroma": "app.utils.chroma_vector_store:ComponentVectorStore",
+    "numpy": "app.utils.numpy_vector_store:NumpyVectorStore",
+    "opensearch": "app.utils.vector_store:AWSComponentVectorStore",
+}
+DEFAULT_VECTOR_BACKEND = "chroma"
+
+_shared_stores: Dict[str, VectorBackend] = {}
+_shared_stores_lock = threading.Lock()
+
+
+def create_vector_store(backend: Optional[str] = None, **kwargs) -> VectorBackend:
+    """Construct a new store for backend (default: VECTOR_BACKEND, then "chroma")."""
+    backend = backend or os.getenv("VECTOR_BACKEND", DEFAULT_VECTOR_BACKEND)
+    if backend not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector backend '{backend}'. Available: {', '.join(VECTOR_BACKENDS)}")
+    module_path, class_name = VECTOR_BACKENDS[backend].split(":")
+    store_class = getattr(importlib.import_module(module_path), class_name)
+    logger.info(f"Using {backend} vector backend")
+    return store_class(**kwargs)
+
+
+def get_vector_store(backend: Optional[str] = None) -> VectorBackend:
+    """Process-wide store for backend, created on first use and shared by all agents."""
+    backend = backend or os.getenv("VECTOR_BACKEND", DEFAULT_VECTOR_BACKEND)
+    with _shared_stores_lock:
+        store = _shared_stores.get(backend)
+        if store is None:
+            store = _shared_stores[backend] = create_vector_store(backend)
+        return store
@@ -1,113 +1,258 @@
-
-from opensearchpy import OpenSearch, exceptions
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
+from opensearchpy import OpenSearch, exceptions, helpers
+from typing import List, Dict, Any, Optional, Set, Tuple
 import json
 import logging
 
+from app.utils.catalog import PARTITIONS, CatalogRecord, partition_of
+from app.utils.embeddings import DEFAULT_EMBEDDING_MODEL
+from app.utils.vector_backend import DEFAULT_BULK_BATCH_SIZE, PARTITION_NAMES, CatalogVectorStore
+
 logger = logging.getLogger(__name__)
 
-class AWSComponentVectorStore:
-    def __init__(self):
+# Upper bound for reading the whole catalog in one search request
+MAX_CATALOG_SIZE = 10000
+
+# Version of the index mapping below. Each partition name is an alias of the
+# index "<name>_<version>", so a rebuild can fill a new index before switching.
+MAPPING_VERSION = "v2"
+
+# Embedding field of every index. The lucene engine scores cosinesimil as
+# (1 + cosine) / 2 (nmslib would score it 1 / (1 + cosine distance))
+EMBEDDING_MAPPING = {
+    "type": "knn_vector",
+    "dimension": 384,  # for MiniLM
+    "method": {"name": "hnsw", "space_type": "cosinesimil", "engine": "lucene"}
+}
+
+
+class AWSComponentVectorStore(CatalogVectorStore):
+    """Vector store backed by OpenSearch k-NN indices, one per partition."""
+
+    backend_name = "OpenSearch"
+
+    def __init__(self, embedding_model_name: str = DEFAULT_EMBEDDING_MODEL):
+        host = 'search-spiceui-vectorstore-lnuytstobyg4b25dvnpxzln4wy.aos.us-east-1.on.aws'
         self.client = OpenSearch(
-            hosts=[{'host': 'search-spiceui-vectorstore-lnuytstobyg4b25dvnpxzln4wy.aos.us-east-1.on.aws', 'port': 443}],
+            hosts=[{'host': host, 'port': 443}],
             http_auth=('spiceui-admin', 'Pwd@spiceui#vectordb123'),
             use_ssl=True,
             verify_certs=True
         )
-        self.index = "components"
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self._ensure_index()
+        self.indices = {partition: PARTITION_NAMES[partition] for partition in PARTITIONS}
+        # The original single index, holding every record before partitioning
+        self.index = self.indices['component']
+        # Reads and deletes by ID span every partition
+        self._all_indices = ",".join(self.indices.values())
+        super().__init__(f"opensearch:{host}/{self._all_indices}", embedding_model_name)
+        for index in self.indices.values():
+            self._ensure_index(index)
+        self._migrate_partitions()
 
-    def _ensure_index(self):
-        """Create index if it doesn't exist with the proper KNN settings and mappings."""
+    def _ensure_index(self, index: str):
+        """Create index if it doesn't exist with the proper KNN settings and mappings.
+
+        An existing index with an older mapping is rebuilt (see _rebuild_index).
+        """
         try:
-            if not self.client.indices.exists(index=self.index):
-                logger.info(f"Index '{self.index}' does not exist. Creating it...")
-                index_config = {
-                    "settings": {
-                        "index": {
-                            "knn": True
-                        }
-                    },
-                    "mappings": {
-                        "properties": {
-                            "name": {"type": "text"},
-                            "description": {"type": "text"},
-                            "props": {"type": "text"},
-                            "examples": {"type": "text"},
-                            "category": {"type": "keyword"},
-                            "tags": {"type": "text"},
-                            "embedding": {
-                                "type": "knn_vector",
-                                "dimension": 384  # for MiniLM
-                            }
-                        }
-                    }
-                }
-                self.client.indices.create(index=self.index, body=index_config)
-                logger.info(f"Index '{self.index}' created successfully.")
+            if not self.client.indices.exists(index=index):
+                logger.info(f"Index '{index}' does not exist. Creating it...")
+                versioned = self._versioned_name(index)
+                if self.client.indices.exists(index=versioned):
+                    # Left by an interrupted rebuild before its alias was switched
+                    self.client.indices.delete(index=versioned)
+                self._create_index(versioned, alias=index)
+                logger.info(f"Index '{versioned}' created successfully with alias '{index}'.")
+                return
+            concrete, mapping = next(iter(self.client.indices.get_mapping(index=index).items()))
+            properties = mapping.get("mappings", {}).get("properties", {})
+            method = properties.get("embedding", {}).get("method", {})
+            if ("metadata_json" in properties and method.get("engine") == EMBEDDING_MAPPING["method"]["engine"]
+                    and method.get("space_type") == EMBEDDING_MAPPING["method"]["space_type"]):
+                logger.debug(f"Index '{index}' already exists.")
             else:
-                logger.debug(f"Index '{self.index}' already exists.")
+                self._rebuild_index(index, concrete, properties)
         except exceptions.OpenSearchException as e:
             logger.error(f"Error checking/creating index: {str(e)}")
             raise
 
-    def _create_embedding(self, text: str) -> List[float]:
-        return self.embedding_model.encode(text).tolist()
-
-    def add_component(self, component_id: str, metadata: Dict[str, Any]):
-        text = f"{metadata['name']} {metadata['description']} {' '.join(metadata['tags'])}"
-        embedding = self._create_embedding(text)
-        document = {
-            "name": metadata["name"],
-            "description": metadata["description"],
-            "props": json.dumps(metadata["props"]),
-            "examples": json.dumps(metadata["examples"]),
-            "category": metadata.get("category", ""),
-            "tags": " ".join(metadata["tags"]),
-            "embedding": embedding
-        }
-        self.client.index(index=self.index, id=component_id, body=document)
-
-    def get_component(self, component_id: str) -> Dict[str, Any]:
-        res = self.client.get(index=self.index, id=component_id)
-        source = res["_source"]
-        return {
-            "id": res["_id"],
-            "metadata": {
-                "name": source["name"],
-                "description": source["description"],
-                "props": json.loads(source["props"]),
-                "examples": json.loads(source["examples"]),
-                "category": source["category"],
-                "tags": source["tags"].split()
-            },
-            "document": source
-        }
+    @staticmethod
+    def _versioned_name(index: str) -> str:
+        return f"{index}_{MAPPING_VERSION}"
 
-    def search_components(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        query_embedding = self._create_embedding(query)
-        search_query = {
-            "size": n_results,
-            "query": {
-                "knn": {
-                    "embedding": {
-                        "vector": query_embedding,
-                        "k": n_results
-                    }
+    def _create_index(self, index: str, alias: Optional[str] = None) -> None:
+        index_config = {
+            "settings": {
+                "index": {
+                    "knn": True
+                }
+            },
+            "mappings": {
+                "properties": {
+                    "component_name": {"type": "keyword"},
+                    "record_type": {"type": "keyword"},
+                    "category": {"type": "keyword"},
+                    # Stored metadata and document as returned by the other backends
+                    "metadata_json": {"type": "keyword", "index": False, "doc_values": False},
+                    "document": {"type": "keyword", "index": False, "doc_values": False},
+                    "embedding": EMBEDDING_MAPPING
                 }
             }
         }
-        res = self.client.search(index=self.index, body=search_query)
-        return [
-            {
-                "id": hit["_id"],
-                "metadata": hit["_source"],
-                "distance": hit["_score"]
-            }
-            for hit in res["hits"]["hits"]
-        ]
+        if alias:
+            index_config["aliases"] = {alias: {}}
+        self.client.indices.create(index=index, body=index_config)
+
+    def _rebuild_index(self, index: str, concrete: str, properties: Dict[str, Any]) -> None:
+        """Copy an index whose mapping predates the current one into a new versioned index.
+
+        The k-NN method of a field cannot be changed in place, so the records
+        are read (with a scroll, whatever the index size) and written with
+        their embeddings to "<index>_<MAPPING_VERSION>". Only once that index
+        holds every record is the name index switched to it, in one alias
+        update, and the old index deleted; a failed rebuild leaves it intact.
+
+        Records of the original mapping (name, description, props, examples,
+        category, tags) are converted to the stored metadata and document
+        every backend returns; the embedded text is unchanged, so nothing is
+        re-encoded.
+        """
+        versioned = self._versioned_name(index)
+        if concrete == versioned:
+            raise RuntimeError(f"Index '{versioned}' has an outdated mapping; bump MAPPING_VERSION to rebuild it")
+
+        ids, embeddings, metadatas, documents = [], [], [], []
+        for hit in helpers.scan(self.client, index=concrete, query={"query": {"match_all": {}}}):
+            source = hit["_source"]
+            if "metadata_json" in properties:
+                metadata, document = json.loads(source["metadata_json"]), source.get("document")
+            else:
+                _, _, metadata, document = self._prepare_component(hit["_id"], {
+                    "component_name": source["name"],
+                    "metadata": {
+                        "description": source.get("description", ""),
+                        "props": json.loads(source.get("props") or "{}"),
+                        "examples": json.loads(source.get("examples") or "[]"),
+                        "category": source.get("category", ""),
+                        "tags": (source.get("tags") or "").split()
+                    }
+                })
+            ids.append(hit["_id"])
+            embeddings.append(source["embedding"])
+            metadatas.append(metadata)
+            documents.append(document)
+
+        logger.warning(f"Index '{concrete}' has an outdated mapping; copying its {len(ids)} records to '{versioned}'")
+        if self.client.indices.exists(index=versioned):
+            # Left by an interrupted rebuild
+            self.client.indices.delete(index=versioned)
+        self._create_index(versioned)
+        # Layouts and icons written here are moved to their own indices by _migrate_partitions
+        for start in range(0, len(ids), DEFAULT_BULK_BATCH_SIZE):
+            end = start + DEFAULT_BULK_BATCH_SIZE
+            self._index_records(versioned, ids[start:end], embeddings[start:end],
+                                metadatas[start:end], documents[start:end])
+        self.client.indices.refresh(index=versioned)
+        stored = self.client.count(index=versioned)["count"]
+        if stored != len(ids):
+            raise RuntimeError(f"Rebuilding '{index}' stored {stored} of {len(ids)} records; kept '{concrete}'")
+
+        if concrete == index:
+            # A plain index is replaced by the alias of the same name
+            actions = [{"add": {"index": versioned, "alias": index}}, {"remove_index": {"index": concrete}}]
+        else:
+            actions = [{"remove": {"index": concrete, "alias": index}}, {"add": {"index": versioned, "alias": index}}]
+        self.client.indices.update_aliases(body={"actions": actions})
+        if concrete != index:
+            self.client.indices.delete(index=concrete)
+        logger.info(f"Index '{index}' now points to '{versioned}'")
+
+    def _index_records(self, index: str, ids: List[str], embeddings: List[List[float]],
+                       metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
+        body = []
+        for record_id, embedding, metadata, document in zip(ids, embeddings, metadatas, documents):
+            body.append({"index": {"_index": index, "_id": record_id}})
+            body.append({
+                "component_name": metadata.get("component_name"),
+                "record_type": metadata.get("record_type"),
+                "category": metadata.get("category", ""),
+                "metadata_json": json.dumps(metadata),
+                "document": document,
+                "embedding": embedding
+            })
+        # wait_for makes the records visible to the verification read that follows
+        response = self.client.bulk(body=body, refresh="wait_for")
+        if response.get("errors"):
+            failed = [item["index"]["_id"] for item in response["items"] if item["index"].get("error")]
+            raise RuntimeError(f"OpenSearch rejected {len(failed)} records: {failed}")
+
+    def _migrate_partitions(self) -> None:
+        """Move layouts and icons stored in the single "components" index into their own indices.
+
+        Embeddings are copied, so nothing is re-encoded; a no-op once migrated.
+        """
+        moves: Dict[str, List[str]] = {}
+        for hit in helpers.scan(self.client, index=self.index, query={"query": {"match_all": {}}},
+                                _source=["metadata_json"]):
+            partition = partition_of(json.loads(hit["_source"].get("metadata_json") or "{}"))
+            if partition != 'component':
+                moves.setdefault(partition, []).append(hit["_id"])
+
+        for partition, ids in moves.items():
+            docs = self.client.mget(index=self.index, body={"ids": ids},
+                                    _source=["metadata_json", "document", "embedding"])["docs"]
+            docs = [doc for doc in docs if doc.get("found")]
+            ids = [doc["_id"] for doc in docs]
+            sources = [doc["_source"] for doc in docs]
+            self._index_records(self.indices[partition], ids, [src["embedding"] for src in sources],
+                                [json.loads(src["metadata_json"]) for src in sources],
+                                [src.get("document") for src in sources])
+            self.client.delete_by_query(index=self.index, body={"query": {"ids": {"values": ids}}}, refresh=True)
+            logger.info(f"Moved {len(ids)} records to the {self.indices[partition]} index")
+
+    def _write(self, partition: str, ids: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
+        self._index_records(self.indices[partition], ids, embeddings, metadatas, documents)
+
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        response = self.client.search(
+            index=self._all_indices,
+            body={"size": len(ids), "query": {"ids": {"values": ids}}, "_source": False}
+        )
+        return {hit["_id"] for hit in response["hits"]["hits"]}
+
+    def _delete(self, ids: List[str]) -> None:
+        self.client.delete_by_query(index=self._all_indices, body={"query": {"ids": {"values": ids}}}, refresh=True)
+
+    def _record_from_source(self, record_id: str, source: Dict[str, Any]) -> CatalogRecord:
+        return CatalogRecord.from_stored(record_id, json.loads(source.get("metadata_json") or "{}"), source.get("document"))
+
+    def _fetch_records(self, ids: Optional[List[str]] = None) -> List[CatalogRecord]:
+        source_fields = ["metadata_json", "document"]
+        query = {"match_all": {}} if ids is None else {"ids": {"values": ids}}
+        response = self.client.search(
+            index=self._all_indices,
+            body={"size": MAX_CATALOG_SIZE if ids is None else len(ids), "query": query, "_source": source_fields}
+        )
+        return [self._record_from_source(hit["_id"], hit["_source"]) for hit in response["hits"]["hits"]]
+
+    def _nearest(self, partition: str, embeddings: List[List[float]], n_results: int,
+                 where: Optional[Dict[str, Any]]) -> Tuple[List[List[str]], List[List[float]]]:
+        # One msearch round trip for all queries
+        body = []
+        for embedding in embeddings:
+            knn = {"knn": {"embedding": {"vector": embedding, "k": n_results}}}
+            query = {"bool": {"must": [knn], "filter": [{"term": {k: v}} for k, v in where.items()]}} if where else knn
+            body.append({"index": self.indices[partition]})
+            body.append({"size": n_results, "_source": False, "query": query})
+        response = self.client.msearch(body=body)
+
+        result_ids, result_distances = [], []
+        for result in response["responses"]:
+            hits = result.get("hits", {}).get("hits", [])
+            result_ids.append([hit["_id"] for hit in hits])
+            # lucene cosinesimil scores are (1 + cosine) / 2; convert to cosine distance like the other backends
+            result_distances.append([2.0 - 2.0 * hit["_score"] for hit in hits])
+        return result_ids, result_distances
 
-    def delete_component(self, component_id: str):
-        self.client.delete(index=self.index, id=component_id)
+    def _clear(self) -> None:
+        self.client.delete_by_query(index=self._all_indices, body={"query": {"match_all": {}}}, refresh=True)
@@ -15,6 +15,55 @@ export const generateCode = async (imageData: string) => {
   }
 };
 
+export interface GenerateStreamHandlers {
+  onNode?: (node: string, data: any) => void;
+  onToken?: (content: string) => void;
+}
+
+// Streams /generate/stream (server-sent events) and resolves with the final state
+export const generateCodeStream = async (imageData: string, handlers: GenerateStreamHandlers = {}) => {
+  const response = await fetch(`${API_BASE_URL}/generate/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ image: imageData })
+  });
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to generate code');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: any = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      const payload = data ? JSON.parse(data) : {};
+
+      if (event === 'node') handlers.onNode?.(payload.node, payload);
+      else if (event === 'token') handlers.onToken?.(payload.content);
+      else if (event === 'result') result = payload;
+      else if (event === 'error') throw new Error(payload.detail || 'Failed to generate code');
+    }
+  }
+
+  return result;
+};
+
 export interface ChatMessage {
   id: string;
   content: string;
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("playwright")
+
+from app.utils.page_extraction import METADATA_FIELDS, extract_examples_page
+from app.utils.scraper import ComponentScraper
+
+USAGE_PAGE = """<html><body>
+<h1>Button</h1>
+<p>Buttons trigger actions.</p>
+<h2>Import</h2>
+<pre>import { Button } from "@salt-ds/core";</pre>
+<h2>Props</h2>
+<table>
+  <tr><th>Name</th><th>Type</th><th>Default</th><th>Description</th></tr>
+  <tr><td>variant</td><td>"primary" | "secondary"</td><td>"primary"</td><td>Visual style</td></tr>
+</table>
+<h2>When to use</h2>
+<ul><li>To submit a form</li><li>To open a dialog</li></ul>
+<h2>When not to use</h2>
+<ul><li>For navigation</li></ul>
+</body></html>"""
+
+EXAMPLES_PAGE = """<html><body>
+<div><h3>Primary</h3><p>The main action.</p><pre class="shiki"><code>&lt;Button /&gt;</code></pre></div>
+<div><h3>Disabled</h3><pre class="shiki"><code>&lt;Button disabled /&gt;</code></pre></div>
+</body></html>"""
+
+
+def page(body: str) -> str:
+    return f"<html><body>{body}</body></html>"
+
+
+@pytest.fixture
+def scraper() -> ComponentScraper:
+    return ComponentScraper()
+
+
+def test_extractors_agree_on_a_component_page(scraper):
+    lxml_fields = scraper._extract_fields(USAGE_PAGE, EXAMPLES_PAGE)
+    soup_fields = scraper._extract_fields_with_soup(USAGE_PAGE, EXAMPLES_PAGE)
+    for field in METADATA_FIELDS:
+        assert lxml_fields[field] == soup_fields[field], field
+    assert lxml_fields["description"] == "Buttons trigger actions."
+    assert [example["title"] for example in lxml_fields["examples"]] == ["Primary", "Disabled"]
+
+
+def test_block_inside_paragraph_closes_the_paragraph(scraper):
+    # libxml2 ends the <p> at the <div>, so the description stops there
+    usage = page("<h1>Button</h1><p>desc<div>block</div>more</p>")
+    examples = page("")
+    assert scraper._extract_fields(usage, examples)["description"] == "desc"
+    assert scraper._extract_fields_with_soup(usage, examples)["description"] == "desc"
+
+
+def test_paragraph_inside_heading_is_the_example_description(scraper):
+    examples = page('<div><h2>T<p>x</p></h2><pre class="shiki"><code>c</code></pre></div>')
+    expected = [{"title": "T", "description": "x", "jsx": "c"}]
+    assert extract_examples_page(examples) == expected
+    assert scraper._extract_fields_with_soup(page("<h1>Button</h1>"), examples)["examples"] == expected
@@ -0,0 +1,100 @@
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.utils.ui_validator import assess_ui_image
+
+
+def ui_mock() -> Image.Image:
+    """Header bar, tabs, a sidebar and a list of bordered rows with text-like strokes."""
+    img = Image.new("RGB", (800, 600), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, 800, 60], fill=(33, 66, 120))
+    for i in range(5):
+        draw.rectangle([20 + i * 110, 20, 110 + i * 110, 40], fill=(230, 230, 230))
+    draw.rectangle([0, 60, 180, 600], fill=(245, 245, 248))
+    for row in range(8):
+        y = 90 + row * 55
+        draw.rectangle([210, y, 770, y + 40], outline=(200, 200, 200))
+        for k in range(6):
+            draw.rectangle([225 + k * 60, y + 15, 270 + k * 60, y + 22], fill=(60, 60, 60))
+    draw.rectangle([620, 540, 770, 580], fill=(0, 120, 215))
+    return img
+
+
+def sparse_ui_mock() -> Image.Image:
+    """A login form: two inputs, a button and a label on a large white page."""
+    img = Image.new("RGB", (1280, 800), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([490, 250, 790, 280], outline=(180, 180, 180))
+    draw.rectangle([490, 310, 790, 340], outline=(180, 180, 180))
+    draw.rectangle([490, 370, 790, 400], fill=(0, 120, 215))
+    draw.rectangle([490, 220, 600, 232], fill=(40, 40, 40))
+    return img
+
+
+def photo_like() -> Image.Image:
+    """Smooth shading with sensor noise and blurred round shapes."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:600, 0:800]
+    base = np.stack([128 + 100 * np.sin(x / 90.0 + c) * np.cos(y / 70.0 - c) for c in (0, 1, 2)], -1)
+    img = Image.fromarray(np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(img)
+    for _ in range(25):
+        cx, cy, r = rng.integers(0, 800), rng.integers(0, 600), rng.integers(10, 80)
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=tuple(int(v) for v in rng.integers(0, 256, 3)))
+    return img.filter(ImageFilter.GaussianBlur(1.5))
+
+
+def noise() -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (600, 800, 3), dtype=np.uint8))
+
+
+def soft_gradient() -> Image.Image:
+    """Two colour fields blurred into each other: flat colours but no edges."""
+    img = Image.new("RGB", (800, 600), (240, 240, 250))
+    ImageDraw.Draw(img).rectangle([0, 0, 400, 600], fill=(30, 60, 140))
+    return img.filter(ImageFilter.GaussianBlur(60))
+
+
+def colour_gradient() -> Image.Image:
+    y, x = np.mgrid[0:600, 0:800]
+    arr = np.stack([x * 255 / 799, y * 255 / 599, np.full_like(x, 128)], -1).astype(np.uint8)
+    return Image.fromarray(arr).filter(ImageFilter.GaussianBlur(8))
+
+
+def blank() -> Image.Image:
+    return Image.new("RGB", (800, 600), (250, 250, 250))
+
+
+def test_ui_mock_is_accepted_locally():
+    for image in (ui_mock(), sparse_ui_mock()):
+        result = assess_ui_image(image)
+        assert result.is_valid_ui
+        assert not result.ambiguous
+
+
+def test_photo_and_noise_are_rejected_locally():
+    for image in (photo_like(), noise()):
+        result = assess_ui_image(image)
+        assert not result.is_valid_ui
+        assert not result.ambiguous
+
+
+def test_blank_image_is_rejected():
+    result = assess_ui_image(blank())
+    assert not result.is_valid_ui
+    assert not result.ambiguous
+    assert result.score == 0.0
+
+
+def test_gradients_are_never_accepted_without_the_llm():
+    for image in (soft_gradient(), colour_gradient()):
+        result = assess_ui_image(image)
+        assert result.ambiguous or not result.is_valid_ui
+
+
+def test_score_at_the_upper_bound_is_ambiguous():
+    score = assess_ui_image(soft_gradient()).score
+    assert assess_ui_image(soft_gradient(), ambiguous_low=0.0, ambiguous_high=score).ambiguous
+    assert not assess_ui_image(soft_gradient(), ambiguous_low=0.0, ambiguous_high=score - 0.01).ambiguous